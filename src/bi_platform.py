@@ -1,22 +1,295 @@
 #!/usr/bin/env python3
 """Business Intelligence Platform"""
+import logging
+import os
+import numpy as np
 import pandas as pd
 import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+# Measures calculate_kpis computes when none are given
+DEFAULT_KPI_MEASURES = {
+    'total_revenue': ('revenue', 'sum'),
+    'avg_revenue': ('revenue', 'mean')
+}
+
+# Mergeable partial statistics each measure function is finished from
+KPI_FUNCTION_STATS = {
+    'sum': ['sum'],
+    'count': ['count'],
+    'mean': ['count', 'sum'],
+    'min': ['min'],
+    'max': ['max'],
+    'var': ['count', 'sum', 'm2'],
+    'std': ['count', 'sum', 'm2']
+}
+
+# Partial aggregates kept before they are merged into one, bounding memory to ~groups x this
+MERGE_EVERY = 16
 
 class BusinessIntelligencePlatform:
-    def __init__(self):
+    """Entry point to the BI components
+
+    start() opens the warehouse once and keeps the KPI monitor, the
+    refreshed OLAP cubes with their result cache and the report generator
+    warm, so repeated requests skip the start-up cost of a CLI run. The
+    cube manager shares one connection and matplotlib is not thread-safe,
+    so cube and report calls are serialized; KPI calls run concurrently on
+    per-thread read connections.
+    """
+
+    def __init__(self, db_path=None, output_dir='output'):
         self.connection = None
-    
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.kpi_monitor = None
+        self.cube_manager = None
+        self.report_generator = None
+        self.started_at = None
+        self._cube_lock = threading.Lock()
+        self._report_lock = threading.Lock()
+
     def connect_database(self, db_path):
         self.connection = sqlite3.connect(db_path)
+        self.db_path = db_path
         return True
+
+    def calculate_kpis(self, data, measures=None, group_by=None, chunksize=100000, workers=1):
+        """Compute KPI measures over data that need not fit in memory
+        
+        data is a DataFrame, an iterable of DataFrame chunks, a .csv or
+        .parquet file path, or the name of a table in the connected
+        warehouse. measures maps each KPI to (column, function), function
+        being one of sum, count, mean, min, max, var or std; by default
+        total and average revenue.
+        
+        Every chunk is reduced to per-group partial statistics (count, sum,
+        min, max and squared deviations), which are merged as they arrive,
+        so memory grows with the number of groups rather than the rows.
+        With workers > 1 the chunks are aggregated in worker processes.
+        
+        Returns {kpi: value}, or a DataFrame with one row per group of the
+        group_by columns.
+        """
+        measures = DEFAULT_KPI_MEASURES if measures is None else measures
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        for kpi, (column, function) in measures.items():
+            if function not in KPI_FUNCTION_STATS:
+                raise ValueError(f"Unsupported function {function} for KPI {kpi}")
+        
+        stats = {}
+        for column, function in measures.values():
+            stats.setdefault(column, set()).update(KPI_FUNCTION_STATS[function])
+        columns = list(dict.fromkeys(group_by + list(stats)))
+        
+        chunks = self._kpi_chunks(data, columns, chunksize, workers)
+        partial = _aggregate_chunks(chunks, group_by, stats, workers)
+        if partial is None:
+            partial = _partial_aggregate(pd.DataFrame({column: pd.Series(dtype=float) for column in columns}),
+                                         group_by, stats)
+        result = _finish_kpis(partial, measures)
+        
+        if group_by:
+            return result.sort_index()
+        if result.empty:
+            result = result.reindex([0])
+            for kpi, (_, function) in measures.items():
+                if function in ('sum', 'count'):
+                    result[kpi] = 0
+        return {kpi: result[kpi].iloc[0] for kpi in result.columns}
+
+    def start(self):
+        """Open the warehouse and warm the KPI, cube and report components"""
+        if self.db_path is None:
+            raise ValueError("A data warehouse path is required to start the platform")
+
+        # Imported here so one-shot CLI modes do not pay for every component
+        from src.kpi.kpi_monitor import KPIMonitor
+        from src.olap.refresh_cubes import OLAPCubeManager
+        from src.reporting.generate_executive_reports import ExecutiveReportGenerator
+        from src.semantic.semantic_layer import DEFAULT_CACHE_DIR, SemanticLayer
+
+        started = time.perf_counter()
+        self.kpi_monitor = KPIMonitor(db_path=self.db_path, semantic_layer=SemanticLayer(cache_dir=DEFAULT_CACHE_DIR))
+        self.cube_manager = OLAPCubeManager(db_path=self.db_path)
+        self.report_generator = ExecutiveReportGenerator(
+            output_dir=os.path.join(self.output_dir, 'reports'), db_path=self.db_path, incremental=True
+        )
+        if not self.refresh_cubes():
+            logger.warning("Some cubes failed to refresh; their queries will fail until the next refresh")
+
+        self.started_at = time.time()
+        logger.info(f"Platform started in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+    def get_kpis(self, kpi_ids=None, as_of_date=None):
+        """Calculate KPIs on the calling thread's read connection"""
+        kpi_ids = list(self.kpi_monitor.kpis) if kpi_ids is None else list(kpi_ids)
+        unknown = [kpi_id for kpi_id in kpi_ids if kpi_id not in self.kpi_monitor.kpis]
+        if unknown:
+            logger.error(f"Unknown KPIs: {', '.join(unknown)}")
+            return None
+        return self.kpi_monitor.calculate_kpis(kpi_ids, as_of_date)
+
+    def query_cube(self, cube_id, measures, dimensions=None, filters=None):
+        """Query a warm cube; repeated queries are served from its result cache"""
+        with self._cube_lock:
+            return self.cube_manager.query(cube_id, measures, dimensions, filters)
+
+    def refresh_cubes(self):
+        """Refresh every cube, e.g. after an ETL load"""
+        with self._cube_lock:
+            return self.cube_manager.refresh_all_cubes()
+
+    def generate_report(self, report_id, as_of_date=None):
+        """Generate a report, reusing unchanged sections from earlier requests"""
+        with self._report_lock:
+            return self.report_generator.generate_report(report_id, as_of_date)
+
+    def _kpi_chunks(self, data, columns, chunksize, workers):
+        """Yield the KPI input columns of data in chunks"""
+        if isinstance(data, pd.DataFrame):
+            # Split only to spread the work over worker processes
+            step = chunksize if workers > 1 else max(len(data), 1)
+            for start in range(0, max(len(data), 1), step):
+                yield data.iloc[start:start + step][columns]
+        
+        elif isinstance(data, str) and data.endswith('.csv'):
+            yield from pd.read_csv(data, usecols=columns, chunksize=chunksize)
+        
+        elif isinstance(data, str) and data.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ValueError("Reading parquet files requires pyarrow")
+            for batch in pq.ParquetFile(data).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+        
+        elif isinstance(data, str):
+            if self.connection is None:
+                raise ValueError(f"Connect a database to read table {data}")
+            tables = {row[0] for row in self.connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if data not in tables:
+                raise ValueError(f"Table {data} not found")
+            quoted = ', '.join(f'"{column}"' for column in columns)
+            yield from pd.read_sql_query(f'SELECT {quoted} FROM "{data}"', self.connection, chunksize=chunksize)
+        
+        else:
+            for chunk in data:
+                yield chunk[columns]
+    
+    def close(self):
+        """Release the warehouse connections"""
+        if self.kpi_monitor is not None:
+            self.kpi_monitor.close()
+        if self.cube_manager is not None:
+            self.cube_manager.conn.close()
+        if self.connection is not None:
+            self.connection.close()
+
+def _aggregate_chunks(chunks, group_by, stats, workers):
+    """Reduce chunks to one merged partial aggregate, or None if there were none"""
+    partials = []
+    
+    def collect(partial):
+        partials.append(partial)
+        if len(partials) >= MERGE_EVERY:
+            partials[:] = [_merge_partials(partials, group_by, stats)]
+    
+    if workers <= 1:
+        for chunk in chunks:
+            collect(_partial_aggregate(chunk, group_by, stats))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for chunk in chunks:
+                # Bound the chunks in flight so reading never runs ahead of the workers
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(pool.submit(_partial_aggregate, chunk, group_by, stats))
+            for future in pending:
+                collect(future.result())
+    
+    if not partials:
+        return None
+    return _merge_partials(partials, group_by, stats) if len(partials) > 1 else partials[0]
+
+def _partial_aggregate(chunk, group_by, stats):
+    """Per-group partial statistics of one chunk, columns named <column>__<stat>"""
+    if not group_by:
+        chunk = chunk.assign(__all__=0)
+    keys = group_by or ['__all__']
+    grouped = chunk.groupby(keys, sort=False, dropna=False)
+    
+    parts = {}
+    for column, needed in stats.items():
+        values = grouped[column]
+        count = values.count()
+        if 'count' in needed:
+            parts[f'{column}__count'] = count
+        if 'sum' in needed:
+            parts[f'{column}__sum'] = values.sum()
+        if 'min' in needed:
+            parts[f'{column}__min'] = values.min()
+        if 'max' in needed:
+            parts[f'{column}__max'] = values.max()
+        if 'm2' in needed:
+            parts[f'{column}__m2'] = (values.var(ddof=0) * count).fillna(0.0)
+    return pd.DataFrame(parts)
+
+def _merge_partials(partials, group_by, stats):
+    """Merge partial aggregates of the same groups into one"""
+    combined = pd.concat(partials)
+    levels = list(range(combined.index.nlevels))
+    grouped = combined.groupby(level=levels, sort=False, dropna=False)
+    
+    merged = {}
+    for column, needed in stats.items():
+        if 'count' in needed:
+            merged[f'{column}__count'] = grouped[f'{column}__count'].sum()
+        if 'sum' in needed:
+            merged[f'{column}__sum'] = grouped[f'{column}__sum'].sum()
+        if 'min' in needed:
+            merged[f'{column}__min'] = grouped[f'{column}__min'].min()
+        if 'max' in needed:
+            merged[f'{column}__max'] = grouped[f'{column}__max'].max()
+        if 'm2' in needed:
+            # Chan et al.: M2 = sum(M2_i + n_i * (mean_i - mean)^2)
+            count = combined[f'{column}__count']
+            mean = combined[f'{column}__sum'] / count.where(count > 0)
+            total_mean = (grouped[f'{column}__sum'].transform('sum')
+                          / grouped[f'{column}__count'].transform('sum').where(lambda n: n > 0))
+            deviation = (count * (mean - total_mean) ** 2).fillna(0.0)
+            merged[f'{column}__m2'] = (combined[f'{column}__m2'] + deviation).groupby(
+                level=levels, sort=False, dropna=False
+            ).sum()
+    return pd.DataFrame(merged)
+
+def _finish_kpis(partial, measures):
+    """Finish each KPI from the merged partial statistics"""
+    result = {}
+    for kpi, (column, function) in measures.items():
+        if function in ('sum', 'count', 'min', 'max'):
+            result[kpi] = partial[f'{column}__{function}']
+            continue
+        
+        count = partial[f'{column}__count']
+        if function == 'mean':
+            result[kpi] = partial[f'{column}__sum'] / count.where(count > 0)
+        else:
+            variance = partial[f'{column}__m2'] / (count - 1).where(count > 1)
+            result[kpi] = np.sqrt(variance) if function == 'std' else variance
     
-    def calculate_kpis(self, data):
-        kpis = {
-            'total_revenue': data['revenue'].sum(),
-            'avg_revenue': data['revenue'].mean()
-        }
-        return kpis
+    result = pd.DataFrame(result, index=partial.index)
+    if '__all__' not in (partial.index.names or []):
+        return result
+    return result.reset_index(drop=True)
 
 if __name__ == "__main__":
     print("Business Intelligence Platform initialized")
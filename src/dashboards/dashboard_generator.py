@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Dashboard Data Generator"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.olap.refresh_cubes import OLAPCubeManager
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DashboardGenerator:
+    """Dashboard Generator publishing the data feeds behind the BI dashboards
+
+    Each dashboard is a list of visuals, each answered by one cube query.
+    The results are written as one JSON feed per dashboard for the
+    Tableau and Power BI workbooks to read.
+    """
+
+    def __init__(self, cube_manager=None, output_dir='dashboards', db_path=':memory:'):
+        self.cube_manager = cube_manager or OLAPCubeManager(db_path=db_path)
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+
+        self.dashboards = {
+            'executive': {
+                'name': 'Executive Dashboard',
+                'visuals': [
+                    {'title': 'Revenue by Quarter', 'cube': 'sales',
+                     'measures': ['SalesAmount', 'Profit'], 'dimensions': ['Quarter']},
+                    {'title': 'Revenue by Region', 'cube': 'sales',
+                     'measures': ['SalesAmount'], 'dimensions': ['Region']},
+                    {'title': 'Margin by Category', 'cube': 'finance',
+                     'measures': ['SalesAmount', 'Profit'], 'dimensions': ['ProductCategory']}
+                ]
+            },
+            'sales': {
+                'name': 'Sales Dashboard',
+                'visuals': [
+                    {'title': 'Sales by Month', 'cube': 'sales',
+                     'measures': ['SalesAmount', 'Quantity'], 'dimensions': ['Month']},
+                    {'title': 'Sales by Product', 'cube': 'sales',
+                     'measures': ['SalesAmount', 'Quantity'], 'dimensions': ['ProductCategory', 'ProductName']},
+                    {'title': 'Customers by Segment', 'cube': 'customer',
+                     'measures': ['SalesAmount', 'DistinctCustomers'], 'dimensions': ['CustomerSegment']}
+                ]
+            },
+            'finance': {
+                'name': 'Financial Dashboard',
+                'visuals': [
+                    {'title': 'Profit by Month', 'cube': 'finance',
+                     'measures': ['SalesAmount', 'Profit', 'Discount'], 'dimensions': ['Month']},
+                    {'title': 'Profit by Subcategory', 'cube': 'finance',
+                     'measures': ['Profit'], 'dimensions': ['ProductCategory', 'ProductSubcategory']}
+                ]
+            },
+            'operations': {
+                'name': 'Operations Dashboard',
+                'visuals': [
+                    {'title': 'Stock by Month', 'cube': 'inventory',
+                     'measures': ['QuantityOnHand', 'QuantityOnOrder'], 'dimensions': ['Month']},
+                    {'title': 'Stock by Product', 'cube': 'inventory',
+                     'measures': ['QuantityOnHand', 'QuantityOnOrder'], 'dimensions': ['ProductName']}
+                ]
+            }
+        }
+
+    def cubes(self, dashboard_id):
+        """Return the cubes a dashboard reads"""
+        return list(dict.fromkeys(visual['cube'] for visual in self.dashboards[dashboard_id]['visuals']))
+
+    def generate_dashboard(self, dashboard_id):
+        """Query every visual of a dashboard and write its data feed; returns the feed path"""
+        if dashboard_id not in self.dashboards:
+            logger.error(f"Dashboard {dashboard_id} not found")
+            return False
+
+        dashboard = self.dashboards[dashboard_id]
+        logger.info(f"Generating {dashboard['name']}")
+
+        visuals = []
+        for visual in dashboard['visuals']:
+            data = self.cube_manager.query(visual['cube'], visual['measures'], visual['dimensions'])
+            if data is None:
+                logger.error(f"Error querying {visual['title']} for dashboard {dashboard_id}")
+                return False
+
+            visuals.append({
+                'title': visual['title'],
+                'cube': visual['cube'],
+                'columns': list(data.columns),
+                'rows': json.loads(data.to_json(orient='values'))
+            })
+
+        feed_path = os.path.join(self.output_dir, f"{dashboard_id}.json")
+        temp_path = os.path.join(self.output_dir, f".{dashboard_id}.json.tmp-{os.getpid()}")
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'dashboard': dashboard_id,
+                    'name': dashboard['name'],
+                    'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'visuals': visuals
+                }, f)
+            os.replace(temp_path, feed_path)
+        finally:
+            # A failed dump must not leave a partial temporary file behind
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info(f"Dashboard feed written: {feed_path}")
+        return feed_path
+
+    def generate_all_dashboards(self):
+        """Generate every dashboard feed; returns {dashboard_id: path or False}"""
+        return {dashboard_id: self.generate_dashboard(dashboard_id) for dashboard_id in self.dashboards}
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Generate Dashboard Data Feeds')
+    parser.add_argument('--all', action='store_true', help='Generate all dashboards')
+    parser.add_argument('--dashboard', type=str, help='Specific dashboard to generate')
+    parser.add_argument('--db', type=str, default=':memory:', help='Path to the data warehouse database')
+    parser.add_argument('--output-dir', type=str, default='dashboards', help='Output directory for dashboard feeds')
+
+    args = parser.parse_args()
+
+    generator = DashboardGenerator(output_dir=args.output_dir, db_path=args.db)
+    dashboard_ids = list(generator.dashboards) if args.all else [args.dashboard] if args.dashboard else []
+    if not dashboard_ids:
+        logger.error("Either --all or --dashboard must be specified")
+        sys.exit(1)
+
+    cube_ids = {cube_id for dashboard_id in dashboard_ids if dashboard_id in generator.dashboards
+                for cube_id in generator.cubes(dashboard_id)}
+    for cube_id in sorted(cube_ids):
+        generator.cube_manager.refresh_cube(cube_id)
+
+    results = {dashboard_id: generator.generate_dashboard(dashboard_id) for dashboard_id in dashboard_ids}
+    sys.exit(0 if all(results.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ import requests
 import json
 from datetime import datetime, timedelta
 
+from src.telemetry.instrumentation import span
+
 logger = logging.getLogger(__name__)
 
 class DataExtractor:
@@ -88,11 +90,11 @@ class DataExtractor:
         
         for system in systems:
             if system in self.connection_strings:
-                data[system] = self.extract_from_database(system, table=system)
+                data[system] = self._timed_extract('database', system, self.extract_from_database, system, table=system)
             elif system in self.api_endpoints:
-                data[system] = self.extract_from_api(system)
+                data[system] = self._timed_extract('api', system, self.extract_from_api, system)
             elif system in self.file_paths:
-                data[system] = self.extract_from_file(system)
+                data[system] = self._timed_extract('file', system, self.extract_from_file, system)
             else:
                 logger.warning(f"Unknown system: {system}")
         
@@ -104,18 +106,26 @@ class DataExtractor:
         
         # Extract from databases
         for source in self.connection_strings:
-            data[source] = self.extract_from_database(source, table=source)
+            data[source] = self._timed_extract('database', source, self.extract_from_database, source, table=source)
         
         # Extract from APIs
         for endpoint in self.api_endpoints:
-            data[endpoint] = self.extract_from_api(endpoint)
+            data[endpoint] = self._timed_extract('api', endpoint, self.extract_from_api, endpoint)
         
         # Extract from files
         for source in self.file_paths:
-            data[source] = self.extract_from_file(source)
+            data[source] = self._timed_extract('file', source, self.extract_from_file, source)
         
         return data
     
+    def _timed_extract(self, kind, source, extract, *args, **kwargs):
+        """Run one extraction inside a span recording its rows and in-memory bytes"""
+        with span('etl.extract', kind=kind, source=source) as timing:
+            df = extract(*args, **kwargs)
+            timing.add('rows', len(df))
+            timing.add('bytes', int(df.memory_usage(deep=True).sum()))
+            return df
+    
     def _get_last_extraction_date(self, source, table):
         """Get the last extraction date for incremental loads"""
         # In a real implementation, this would retrieve from a metadata table
@@ -5,10 +5,14 @@ import logging
 import sys
 import os
 
-from extraction import DataExtractor
-from transformation import DataTransformer
-from loading import DataLoader
-from data_quality import DataQualityChecker
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.telemetry.instrumentation import span
+from src.etl.extraction import DataExtractor
+from src.etl.transformation import DataTransformer
+from src.etl.loading import DataLoader
+from src.etl.data_quality import DataQualityChecker
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,28 +34,32 @@ def run_etl_pipeline(full_load=False, source_systems=None, target_tables=None):
         
         # Extract data
         logger.info("Extracting data...")
-        if source_systems:
-            raw_data = extractor.extract_from_systems(source_systems)
-        else:
-            raw_data = extractor.extract_all()
+        with span('etl.stage', stage='extract'):
+            if source_systems:
+                raw_data = extractor.extract_from_systems(source_systems)
+            else:
+                raw_data = extractor.extract_all()
         
         # Transform data
         logger.info("Transforming data...")
-        transformed_data = transformer.transform(raw_data)
+        with span('etl.stage', stage='transform'):
+            transformed_data = transformer.transform(raw_data)
         
         # Check data quality
         logger.info("Checking data quality...")
-        quality_results = dq_checker.check_quality(transformed_data)
+        with span('etl.stage', stage='quality'):
+            quality_results = dq_checker.check_quality(transformed_data)
         if not quality_results['passed']:
             logger.error(f"Data quality check failed: {quality_results['issues']}")
             return False
         
         # Load data
         logger.info("Loading data...")
-        if target_tables:
-            load_result = loader.load_to_tables(transformed_data, target_tables, full_load)
-        else:
-            load_result = loader.load_all(transformed_data, full_load)
+        with span('etl.stage', stage='load'):
+            if target_tables:
+                load_result = loader.load_to_tables(transformed_data, target_tables, full_load)
+            else:
+                load_result = loader.load_all(transformed_data, full_load)
         
         logger.info("ETL pipeline completed successfully")
         return load_result
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Pre-aggregated Columnar Extracts for the Tableau and Power BI Workbooks"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pandas as pd
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.telemetry.instrumentation import span
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TABLEAU_WORKBOOKS = [os.path.join(PROJECT_ROOT, 'tableau_workbooks', 'executive_dashboard.twb')]
+
+# Bump when the extract or state layout changes so existing extracts are rebuilt
+EXTRACT_FORMAT = 1
+MANIFEST_FILE = 'manifest.json'
+STATE_DIR = '.state'
+
+# Tableau column-instance derivations an extract can pre-aggregate
+DERIVATIONS = {'Sum': 'sum', 'Avg': 'avg', 'Min': 'min', 'Max': 'max', 'Count': 'count'}
+
+# Partial statistics kept per month partition, from which each function is finished
+FUNCTION_STATS = {
+    'sum': ['sum'],
+    'count': ['count'],
+    'avg': ['sum', 'count'],
+    'min': ['min'],
+    'max': ['max']
+}
+
+# The Power BI report is checked in as a placeholder, so the aggregates behind
+# its pages are declared here. Expense Breakdown and Cash Flow Analysis have
+# no source in the warehouse and are not extracted.
+POWERBI_EXTRACTS = {
+    'powerbi_financial_revenue_by_month': {
+        'name': 'Financial Dashboard - Revenue Analysis',
+        'workbook': os.path.join(PROJECT_ROOT, 'powerbi_reports', 'financial_dashboard.pbix.txt'),
+        'fact_table': 'FactSales',
+        'joins': {'DimDate': [['DateKey', 'DateKey']]},
+        'dimensions': ['Year', 'Month'],
+        'measures': [['SalesAmount', 'sum'], ['Profit', 'sum'], ['Discount', 'sum'], ['Quantity', 'sum']]
+    },
+    'powerbi_financial_margin_by_category': {
+        'name': 'Financial Dashboard - Profit Margins',
+        'workbook': os.path.join(PROJECT_ROOT, 'powerbi_reports', 'financial_dashboard.pbix.txt'),
+        'fact_table': 'FactSales',
+        'joins': {'DimDate': [['DateKey', 'DateKey']], 'DimProduct': [['ProductKey', 'ProductKey']]},
+        'dimensions': ['Year', 'ProductCategory'],
+        'measures': [['SalesAmount', 'sum'], ['Profit', 'sum'], ['SalesAmount', 'avg']]
+    }
+}
+
+
+def parse_tableau_workbook(workbook_path):
+    """Return {extract_id: spec} for the worksheets of a Tableau workbook
+
+    Each worksheet's dimensions (column instances without a derivation)
+    and aggregated measures over its data source's tables and join
+    clauses become one extract spec.
+    """
+    root = ET.parse(workbook_path).getroot()
+    sources = {}
+    for datasource in root.iter('datasource'):
+        tables = [_unquote(relation.get('table').split('.')[-1])
+                  for relation in datasource.iter('relation') if relation.get('type') == 'table']
+        if not tables:
+            continue
+
+        joins = {}
+        for clause in datasource.iter('clause'):
+            for expression in clause.iter('expression'):
+                operands = [_split_column(child.get('op')) for child in expression.findall('expression')]
+                if expression.get('op') != '=' or len(operands) != 2:
+                    continue
+                # Key the join by the dimension table, fact column first
+                (left_table, left_column), (right_table, right_column) = operands
+                if left_table == tables[0]:
+                    joins.setdefault(right_table, []).append([left_column, right_column])
+                else:
+                    joins.setdefault(left_table, []).append([right_column, left_column])
+        sources[datasource.get('name')] = {'fact_table': tables[0], 'joins': joins}
+
+    workbook_name = os.path.splitext(os.path.basename(workbook_path))[0]
+    extracts = {}
+    for worksheet in root.iter('worksheet'):
+        dependencies = worksheet.find('.//datasource-dependencies')
+        if dependencies is None or dependencies.get('datasource') not in sources:
+            continue
+
+        dimensions, measures = [], []
+        for instance in dependencies.findall('column-instance'):
+            column, derivation = _unquote(instance.get('column')), instance.get('derivation')
+            if derivation == 'None':
+                dimensions.append(column)
+            elif derivation in DERIVATIONS:
+                measures.append([column, DERIVATIONS[derivation]])
+            else:
+                raise ValueError(f"Unsupported derivation {derivation} in worksheet {worksheet.get('name')}")
+
+        extract_id = f"tableau_{_slug(workbook_name)}_{_slug(worksheet.get('name'))}"
+        extracts[extract_id] = dict(
+            sources[dependencies.get('datasource')],
+            name=f"{worksheet.get('name')} ({os.path.basename(workbook_path)})",
+            workbook=workbook_path,
+            dimensions=dimensions,
+            measures=measures
+        )
+    return extracts
+
+
+def default_extracts():
+    """Return the extract specs of the checked-in Tableau and Power BI workbooks"""
+    extracts = {}
+    for workbook_path in TABLEAU_WORKBOOKS:
+        extracts.update(parse_tableau_workbook(workbook_path))
+    extracts.update(POWERBI_EXTRACTS)
+    return extracts
+
+
+class ExtractPublisher:
+    """Publish the aggregates the BI workbooks query as compressed columnar files
+
+    Each extract is written as <output_dir>/<extract_id>.parquet (zstd),
+    or .csv.gz when pyarrow is not installed, with rows sorted by the
+    extract's dimensions, so the workbooks refresh from files instead of
+    querying the warehouse live. Files are written to a temporary name and
+    renamed into place, so a refreshing workbook never reads a partial
+    extract.
+
+    Refreshes are incremental: per-month partial aggregates are kept under
+    <output_dir>/.state, and only the months whose fact rows changed since
+    the last publish, per fingerprint, are re-aggregated from the
+    warehouse. A change to a joined dimension table or to the spec forces
+    a full rebuild.
+    """
+
+    def __init__(self, db_path, output_dir='extracts', extracts=None, file_format=None):
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.extracts = default_extracts() if extracts is None else extracts
+        if file_format is None:
+            file_format = 'parquet' if _has_pyarrow() else 'csv'
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported extract format: {file_format}")
+        self.file_format = file_format
+        # Extracts may publish on concurrent pipeline threads; they share the manifest
+        self._manifest_lock = threading.Lock()
+        os.makedirs(os.path.join(output_dir, STATE_DIR), exist_ok=True)
+
+    def source_tables(self, extract_id):
+        """Return the warehouse tables an extract reads"""
+        spec = self.extracts[extract_id]
+        return [spec['fact_table']] + list(spec['joins'])
+
+    def publish_extract(self, extract_id, force_full=False):
+        """Refresh an extract; returns its path, or False on failure"""
+        if extract_id not in self.extracts:
+            logger.error(f"Extract {extract_id} not found")
+            return False
+
+        spec = self.extracts[extract_id]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with span('extract.publish', extract=extract_id) as timing:
+                path, refresh = self._refresh(conn, extract_id, spec, force_full)
+                timing.add('partitions', refresh['partitions'])
+                timing.add('rows', refresh['rows'])
+            logger.info(f"Extract {extract_id}: {refresh['mode']} refresh of {refresh['partitions']} partition(s), "
+                        f"{refresh['rows']} rows")
+            return path
+        except Exception as e:
+            logger.error(f"Error publishing extract {extract_id}: {str(e)}")
+            return False
+        finally:
+            conn.close()
+
+    def publish_all_extracts(self, force_full=False):
+        """Refresh every extract; returns {extract_id: path or False}"""
+        return {extract_id: self.publish_extract(extract_id, force_full) for extract_id in self.extracts}
+
+    def read_extract(self, extract_id):
+        """Read a published extract back as a DataFrame"""
+        entry = self.manifest().get(extract_id)
+        if entry is None:
+            return None
+        path = os.path.join(self.output_dir, entry['file'])
+        return pd.read_parquet(path) if entry['format'] == 'parquet' else pd.read_csv(path, compression='gzip')
+
+    def manifest(self):
+        """Return {extract_id: entry} describing the published extracts"""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _refresh(self, conn, extract_id, spec, force_full):
+        """Bring an extract up to date; returns (path, refresh summary)"""
+        columns = self._resolve_columns(conn, spec)
+        definition = [EXTRACT_FORMAT, self.file_format] + [spec[key] for key in ('fact_table', 'joins', 'dimensions', 'measures')]
+        spec_hash = hashlib.sha1(json.dumps(definition, sort_keys=True).encode()).hexdigest()
+        dimension_fingerprint = self._dimension_fingerprint(conn, spec, columns)
+        fingerprints = self._partition_fingerprints(conn, spec, columns)
+
+        entry = self.manifest().get(extract_id)
+        state_path = os.path.join(self.output_dir, STATE_DIR, f"{extract_id}.pkl")
+        partials = None
+        if (not force_full and entry is not None and entry['spec_hash'] == spec_hash
+                and entry['dimension_fingerprint'] == dimension_fingerprint
+                and os.path.exists(os.path.join(self.output_dir, entry['file'])) and os.path.exists(state_path)):
+            partials = pd.read_pickle(state_path)
+            previous = {int(partition): tuple(fingerprint) for partition, fingerprint in entry['fingerprints'].items()}
+            changed = sorted(partition for partition, fingerprint in fingerprints.items()
+                             if previous.get(partition) != fingerprint)
+            removed = set(previous) - set(fingerprints)
+            if not changed and not removed:
+                entry['last_refresh'] = {'mode': 'unchanged', 'partitions': 0, 'at': datetime.now().isoformat()}
+                self._update_manifest(extract_id, entry)
+                return os.path.join(self.output_dir, entry['file']), dict(entry['last_refresh'], rows=entry['rows'])
+            partials = partials[~partials['__partition'].isin(set(changed) | removed)]
+            mode = 'incremental'
+        else:
+            changed = sorted(fingerprints)
+            mode = 'full'
+
+        fresh = self._partial_aggregates(conn, spec, columns, changed)
+        partials = fresh if partials is None else pd.concat([partials, fresh], ignore_index=True)
+        extract = self._finish(partials, spec)
+
+        extension = 'parquet' if self.file_format == 'parquet' else 'csv.gz'
+        file_name = f"{extract_id}.{extension}"
+        self._write_extract(extract, os.path.join(self.output_dir, file_name))
+        _write_atomic(state_path, lambda path: partials.to_pickle(path))
+
+        refresh = {'mode': mode, 'partitions': len(changed), 'at': datetime.now().isoformat()}
+        self._update_manifest(extract_id, {
+            'name': spec['name'],
+            'workbook': os.path.relpath(spec['workbook'], PROJECT_ROOT),
+            'file': file_name,
+            'format': self.file_format,
+            'rows': len(extract),
+            'columns': list(extract.columns),
+            'sort_order': list(spec['dimensions']),
+            'spec_hash': spec_hash,
+            'dimension_fingerprint': dimension_fingerprint,
+            'fingerprints': {str(partition): list(fingerprint) for partition, fingerprint in fingerprints.items()},
+            'last_refresh': refresh
+        })
+        return os.path.join(self.output_dir, file_name), dict(refresh, rows=len(extract))
+
+    def _resolve_columns(self, conn, spec):
+        """Map each dimension and measure column to its qualified SQL column"""
+        aliases = {spec['fact_table']: 'f'}
+        for index, table in enumerate(spec['joins'], 1):
+            aliases[table] = f"d{index}"
+        table_columns = {
+            table: {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')} for table in aliases
+        }
+
+        def qualify(column, tables):
+            for table in tables:
+                if column in table_columns[table]:
+                    return f'{aliases[table]}."{column}"'
+            raise ValueError(f"Column {column} not found in {', '.join(tables)}")
+
+        # Dimensions come from the joined tables first, measures from the fact table
+        dimension_tables = list(spec['joins']) + [spec['fact_table']]
+        columns = {column: qualify(column, dimension_tables) for column in spec['dimensions']}
+        for column, _ in spec['measures']:
+            columns.setdefault(column, qualify(column, [spec['fact_table']]))
+        return columns
+
+    def _from_clause(self, spec):
+        """Build the fact table and its inner joins, as the workbook data sources join them"""
+        clause = f'"{spec["fact_table"]}" f'
+        for index, (table, keys) in enumerate(spec['joins'].items(), 1):
+            on = ' AND '.join(f'f."{fact_key}" = d{index}."{key}"' for fact_key, key in keys)
+            clause += f' JOIN "{table}" d{index} ON {on}'
+        return clause
+
+    def _partition_fingerprints(self, conn, spec, columns):
+        """Return {Month: fingerprint} summarizing the fact rows of each partition
+
+        Besides the measures, the fact-side join keys and dimension columns
+        are summed plain and weighted by rowid, so a correction that only
+        moves a row to another member changes the fingerprint.
+        """
+        measure_columns = list(dict.fromkeys(column for column, _ in spec['measures']))
+        sums = ''.join(f', TOTAL(f."{column}")' for column in measure_columns)
+        keys = [fact_key for keys in spec['joins'].values() for fact_key, _ in keys]
+        keys += [sql.split('.', 1)[1].strip('"') for sql in columns.values() if sql.startswith('f.')]
+        keys = [key for key in dict.fromkeys(keys) if key not in measure_columns]
+        sums += ''.join(f', TOTAL(f."{key}"), TOTAL(f.rowid * f."{key}")' for key in keys)
+        query = (f'SELECT f.DateKey / 100, COUNT(*), TOTAL(f.rowid){sums} '
+                 f'FROM "{spec["fact_table"]}" f GROUP BY f.DateKey / 100')
+        return {row[0]: tuple(row[1:]) for row in conn.execute(query)}
+
+    def _dimension_fingerprint(self, conn, spec, columns):
+        """Hash the joined dimension rows so attribute changes force a full rebuild"""
+        digest = hashlib.sha1()
+        for index, (table, keys) in enumerate(spec['joins'].items(), 1):
+            alias = f"d{index}"
+            used = [key for _, key in keys] + [sql.split('.', 1)[1].strip('"')
+                                               for sql in columns.values() if sql.startswith(f"{alias}.")]
+            selected = ', '.join(f'"{column}"' for column in dict.fromkeys(used))
+            for row in conn.execute(f'SELECT {selected} FROM "{table}" ORDER BY 1'):
+                digest.update(repr(row).encode())
+        return digest.hexdigest()
+
+    def _partial_aggregates(self, conn, spec, columns, partitions):
+        """Aggregate the given Month partitions to partial statistics per dimension member"""
+        stats = {}
+        for column, function in spec['measures']:
+            stats.setdefault(column, set()).update(FUNCTION_STATS[function])
+
+        select = ['f.DateKey / 100 AS "__partition"']
+        select += [f'{columns[column]} AS "{column}"' for column in spec['dimensions']]
+        for column, needed in stats.items():
+            for stat in sorted(needed):
+                select.append(f'{stat.upper()}({columns[column]}) AS "{column}__{stat}"')
+        group_by = ', '.join(str(position) for position in range(1, len(spec['dimensions']) + 2))
+
+        frames = []
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(partitions), 500):
+            batch = partitions[start:start + 500]
+            query = (f"SELECT {', '.join(select)} FROM {self._from_clause(spec)} "
+                     f"WHERE f.DateKey / 100 IN ({', '.join('?' * len(batch))}) GROUP BY {group_by}")
+            frames.append(pd.read_sql_query(query, conn, params=batch))
+        if not frames:
+            names = ['__partition'] + list(spec['dimensions'])
+            names += [f"{column}__{stat}" for column, needed in stats.items() for stat in sorted(needed)]
+            return pd.DataFrame(columns=names)
+        return pd.concat(frames, ignore_index=True)
+
+    def _finish(self, partials, spec):
+        """Roll the partition partials up to the extract grain, sorted by its dimensions"""
+        dimensions = list(spec['dimensions'])
+        if dimensions:
+            grouped = partials.groupby(dimensions, sort=True, dropna=False)
+        else:
+            grouped = partials.assign(__all__=0).groupby('__all__')
+
+        extract = {}
+        for column, function in spec['measures']:
+            name = f"{function}_{column}"
+            if function == 'sum':
+                extract[name] = grouped[f"{column}__sum"].sum(min_count=1)
+            elif function == 'count':
+                extract[name] = grouped[f"{column}__count"].sum()
+            elif function == 'avg':
+                count = grouped[f"{column}__count"].sum()
+                extract[name] = grouped[f"{column}__sum"].sum(min_count=1) / count.where(count > 0)
+            else:
+                extract[name] = getattr(grouped[f"{column}__{function}"], function)()
+
+        extract = pd.DataFrame(extract)
+        return extract.reset_index() if dimensions else extract.reset_index(drop=True)
+
+    def _write_extract(self, extract, path):
+        """Write an extract atomically in the publisher's format"""
+        if self.file_format == 'parquet':
+            _write_atomic(path, lambda temp_path: extract.to_parquet(
+                temp_path, engine='pyarrow', compression='zstd', index=False
+            ))
+        else:
+            _write_atomic(path, lambda temp_path: extract.to_csv(temp_path, compression='gzip', index=False))
+
+    def _update_manifest(self, extract_id, entry):
+        """Record an extract in the manifest, replacing the file atomically"""
+        with self._manifest_lock:
+            manifest = self.manifest()
+            manifest[extract_id] = entry
+            path = os.path.join(self.output_dir, MANIFEST_FILE)
+            _write_atomic(path, lambda temp_path: _write_json(temp_path, manifest))
+
+
+def _write_atomic(path, write):
+    """Call write(temp_path) and rename the result over path"""
+    temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp-{os.getpid()}")
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _unquote(name):
+    return name.strip('[]')
+
+
+def _split_column(reference):
+    """Split a '[Table].[Column]' reference into (table, column)"""
+    table, column = reference.split('].[', 1)
+    return _unquote(table), _unquote(column)
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Publish pre-aggregated workbook extracts')
+    parser.add_argument('--db', type=str, required=True, help='Path to the data warehouse database')
+    parser.add_argument('--output-dir', type=str, default='extracts', help='Directory the extracts are published to')
+    parser.add_argument('--extract', type=str, help='Specific extract to publish')
+    parser.add_argument('--format', type=str, choices=['parquet', 'csv'], help='Extract file format')
+    parser.add_argument('--full', action='store_true', help='Rebuild instead of refreshing incrementally')
+
+    args = parser.parse_args()
+
+    publisher = ExtractPublisher(args.db, args.output_dir, file_format=args.format)
+    if args.extract:
+        success = bool(publisher.publish_extract(args.extract, args.full))
+    else:
+        success = all(publisher.publish_all_extracts(args.full).values())
+
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
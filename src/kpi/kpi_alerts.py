@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""KPI Alert Dispatch Pipeline"""
+import json
+import logging
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from collections import deque
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+# Notifications allowed per minute for each alert_level; alerts above the limit are suppressed
+DEFAULT_RATE_LIMITS = {
+    'high': 30,
+    'medium': 10,
+    'low': 5
+}
+
+
+class LogNotifier:
+    """Write alerts to the application log"""
+
+    def send(self, alert_level, alerts):
+        logger.warning(f"ALERTS ({alert_level}): {len(alerts)} KPIs require attention")
+        for alert in alerts:
+            logger.warning(f"⚠️ {alert['name']} is {alert['status'].upper()}: {_format_value(alert['value'])} "
+                           f"vs threshold {alert['threshold']} {alert['comparison']}")
+
+
+class EmailNotifier:
+    """Send one email per alert batch through an SMTP server"""
+
+    def __init__(self, host, port=25, sender='bi-alerts@localhost', recipients=None, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients or [])
+        self.timeout = timeout
+
+    def send(self, alert_level, alerts):
+        message = EmailMessage()
+        message['Subject'] = f"[{alert_level.upper()}] {len(alerts)} KPI alert(s)"
+        message['From'] = self.sender
+        message['To'] = ', '.join(self.recipients)
+        message.set_content('\n'.join(
+            f"{alert['name']} is {alert['status'].upper()}: {_format_value(alert['value'])} "
+            f"vs threshold {alert['threshold']} {alert['comparison']} (as of {alert['as_of_date']})"
+            for alert in alerts
+        ))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            smtp.send_message(message)
+
+
+class WebhookNotifier:
+    """POST alert batches as JSON to an HTTP endpoint"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert_level, alerts):
+        body = json.dumps({'alert_level': alert_level, 'alerts': alerts}, default=str).encode()
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class AlertDispatcher:
+    """Deliver KPI alerts from background workers so evaluation never waits on notifications
+
+    submit() drops repeats of the same KPI status within dedup_seconds and
+    enqueues the rest on a bounded queue. Workers drain the queue in batches
+    of up to batch_size alerts collected over batch_window seconds, send one
+    notification per alert_level and batch, and apply per-level rate limits
+    (notifications per minute).
+    """
+
+    def __init__(self, notifiers=None, workers=2, max_queue=1000, dedup_seconds=900, rate_limits=None,
+                 batch_size=50, batch_window=0.5, latency_window=1000):
+        # notifiers is a list used for every level or a {alert_level: [notifier, ...]} mapping
+        self.notifiers = notifiers if notifiers is not None else [LogNotifier()]
+        self.dedup_seconds = dedup_seconds
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.counters = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'dropped': 0,
+            'rate_limited': 0,
+            'dispatched': 0,
+            'batches': 0,
+            'failures': 0
+        }
+        self.max_queue_depth = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._last_sent = {}
+        self._sent_times = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._workers = [
+            threading.Thread(target=self._work, name=f'kpi-alerts-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, alert, alert_level='medium'):
+        """Queue an alert without blocking; returns False if it was deduplicated or dropped"""
+        now = time.monotonic()
+        key = alert['kpi_id']
+
+        with self._lock:
+            self.counters['submitted'] += 1
+            last = self._last_sent.get(key)
+            if last and last[0] == alert['status'] and now - last[1] < self.dedup_seconds:
+                self.counters['deduplicated'] += 1
+                return False
+            self._last_sent[key] = (alert['status'], now)
+
+        try:
+            self._queue.put_nowait((alert_level, alert, now))
+        except queue.Full:
+            with self._lock:
+                self.counters['dropped'] += 1
+            self._forget(alert, now)
+            logger.warning(f"Alert queue full; dropped alert for {alert['kpi_id']}")
+            return False
+
+        with self._lock:
+            self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    def resolve(self, kpi_id):
+        """Forget the last alerted status of a KPI so its next alert is sent immediately"""
+        with self._lock:
+            self._last_sent.pop(kpi_id, None)
+
+    def flush(self):
+        """Block until every queued alert has been dispatched"""
+        self._queue.join()
+
+    def close(self):
+        """Dispatch queued alerts and stop the workers"""
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+    def metrics(self):
+        """Return queue depth, counters and dispatch latency percentiles"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            report = dict(self.counters)
+            report['queue_depth'] = self._queue.qsize()
+            report['max_queue_depth'] = self.max_queue_depth
+
+        report['latency_p50_ms'] = latencies[len(latencies) // 2] if latencies else 0.0
+        report['latency_p95_ms'] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        report['latency_max_ms'] = latencies[-1] if latencies else 0.0
+        return report
+
+    def _work(self):
+        """Collect alert batches from the queue and dispatch them"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._dispatch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _dispatch(self, batch):
+        """Send one notification per alert_level in a batch"""
+        levels = {}
+        for alert_level, alert, submitted_at in batch:
+            levels.setdefault(alert_level, []).append((alert, submitted_at))
+
+        for alert_level, items in levels.items():
+            if not self._acquire(alert_level):
+                with self._lock:
+                    self.counters['rate_limited'] += len(items)
+                for alert, submitted_at in items:
+                    self._forget(alert, submitted_at)
+                logger.warning(f"Rate limit reached for {alert_level} alerts; suppressed {len(items)}")
+                continue
+
+            alerts = [alert for alert, _ in items]
+            notifiers = self.notifiers.get(alert_level, []) if isinstance(self.notifiers, dict) else self.notifiers
+            failed = False
+            for notifier in notifiers:
+                try:
+                    notifier.send(alert_level, alerts)
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Error sending {alert_level} alerts with {type(notifier).__name__}: {str(e)}")
+
+            # A failed send is retried when the alert is next submitted
+            if failed:
+                for alert, submitted_at in items:
+                    self._forget(alert, submitted_at)
+
+            finished = time.monotonic()
+            with self._lock:
+                self.counters['batches'] += 1
+                self.counters['failures' if failed else 'dispatched'] += len(alerts)
+                self._latencies.extend((finished - submitted_at) * 1000 for _, submitted_at in items)
+
+    def _forget(self, alert, submitted_at):
+        """Clear the dedup marker of an alert that was never sent, unless a newer alert replaced it"""
+        with self._lock:
+            if self._last_sent.get(alert['kpi_id']) == (alert['status'], submitted_at):
+                del self._last_sent[alert['kpi_id']]
+
+    def _acquire(self, alert_level):
+        """Take a notification slot from the alert level's one-minute window"""
+        limit = self.rate_limits.get(alert_level)
+        if limit is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            sent = self._sent_times.setdefault(alert_level, deque())
+            while sent and now - sent[0] >= 60:
+                sent.popleft()
+            if len(sent) >= limit:
+                return False
+            sent.append(now)
+            return True
+
+
+def _format_value(value):
+    return 'n/a' if value is None else f"{value:.2f}"
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Incremental KPI Engine"""
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Running aggregate components kept for each aggregate function
+COMPONENTS = {
+    'SUM': ['sum'],
+    'COUNT': ['count'],
+    'AVG': ['sum', 'count'],
+    'MIN': ['min'],
+    'MAX': ['max']
+}
+
+
+class IncrementalKPIEngine:
+    """Stateful KPI engine keeping running aggregates per KPI input and period
+
+    Fact tables are treated as append-only and their rowid as the load
+    sequence: each tick only aggregates rows above the table's watermark and
+    merges them into the running state. When a KPI period rolls over (day,
+    week or month boundary) the inputs for the new period are computed once
+    from scratch and the old period's state is dropped. Dimension tables are
+    updated in place, which a rowid watermark cannot see, so their inputs
+    are recomputed on every tick.
+    """
+
+    def __init__(self, monitor, kpi_ids=None):
+        self.monitor = monitor
+        self.kpi_ids = list(kpi_ids or monitor.kpis)
+        # table -> highest rowid merged into the state
+        self.watermarks = {}
+        # input key (table, function, column, period_start) -> running components
+        self.state = {}
+        self.last_tick = {}
+
+    def tick(self, as_of_date=None):
+        """Apply newly loaded rows and return KPI results like calculate_all_kpis"""
+        if as_of_date is None:
+            as_of_date = datetime.now()
+
+        started = time.perf_counter()
+        results = {}
+        period_starts = self.monitor._period_starts(self.kpi_ids, as_of_date, results)
+
+        required = {}
+        for kpi_id, period_start in period_starts.items():
+            for spec in self.monitor.kpis[kpi_id]['inputs'].values():
+                key = self.monitor._input_key(spec, period_start)
+                required.setdefault(spec['table'], {})[key] = spec
+
+        # Roll over: state of periods that are no longer current is discarded
+        needed = {key for inputs in required.values() for key in inputs}
+        for key in [key for key in self.state if key not in needed]:
+            del self.state[key]
+
+        rows_applied = 0
+        recomputed = 0
+        failed_tables = set()
+
+        # Every table advances to the same data version, even while loads are running
+        with self.monitor.snapshot() as conn:
+            for table, inputs in required.items():
+                try:
+                    applied, rebuilt = self._advance_table(conn, table, list(inputs))
+                    rows_applied += applied
+                    recomputed += rebuilt
+                except Exception as e:
+                    logger.error(f"Error updating KPI inputs from {table}: {str(e)}")
+                    failed_tables.add(table)
+
+        for kpi_id, period_start in period_starts.items():
+            kpi = self.monitor.kpis[kpi_id]
+            if any(spec['table'] in failed_tables for spec in kpi['inputs'].values()):
+                results[kpi_id] = None
+                continue
+
+            inputs = {
+                name: self._value(spec['function'], self.state[self.monitor._input_key(spec, period_start)])
+                for name, spec in kpi['inputs'].items()
+            }
+            results[kpi_id] = self.monitor._build_result(kpi_id, inputs, period_start, as_of_date)
+
+        self.last_tick = {
+            'rows_applied': rows_applied,
+            'recomputed_inputs': recomputed,
+            'duration_ms': (time.perf_counter() - started) * 1000
+        }
+        logger.debug(f"KPI tick applied {rows_applied} new rows, recomputed {recomputed} inputs")
+
+        return results
+
+    def _advance_table(self, conn, table, keys):
+        """Bring the inputs of one table up to its current load sequence"""
+        high = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+        low = self.watermarks.get(table)
+
+        if not table.lower().startswith('fact'):
+            _, components = self._aggregate(conn, table, keys, None, high, self._earliest_period(keys))
+            self.state.update(zip(keys, components))
+            self.watermarks[table] = high
+            return 0, len(keys)
+
+        if low is not None and high < low:
+            # The table was truncated or reloaded: start over
+            logger.info(f"{table} load sequence moved backwards; recomputing its KPI inputs")
+            for key in [key for key in self.state if key[0] == table]:
+                del self.state[key]
+            low = None
+
+        recomputed = 0
+        new_keys = [key for key in keys if key not in self.state]
+        if low is None:
+            low = high
+            new_keys = keys
+
+        if new_keys:
+            # New inputs only need the rows of their period, e.g. today's after a rollover
+            _, components = self._aggregate(conn, table, new_keys, None, low, self._earliest_period(new_keys))
+            self.state.update(zip(new_keys, components))
+            recomputed = len(new_keys)
+
+        applied = 0
+        if high > low:
+            applied, deltas = self._aggregate(conn, table, keys, low, high)
+            for key, delta in zip(keys, deltas):
+                self.state[key] = self._merge(self.state[key], delta)
+
+        self.watermarks[table] = high
+        return applied, recomputed
+
+    def _earliest_period(self, keys):
+        """Return the earliest period start of the inputs, or None if any input is unbounded"""
+        period_starts = [key[3] for key in keys]
+        return None if None in period_starts else min(period_starts)
+
+    def _aggregate(self, conn, table, keys, low, high, period_start=None):
+        """Aggregate the components of several inputs over a rowid range in one query
+
+        With a period_start, only rows dated on or after it are scanned.
+        """
+        date_column, date_format = self.monitor.period_columns.get(table, (None, None))
+        columns = ['COUNT(*)']
+        params = []
+        layout = []
+
+        for (_, function, column, period_start) in keys:
+            value = '1' if column == '*' else column
+            if period_start is not None:
+                value = f"CASE WHEN {date_column} >= ? THEN {value} END"
+
+            names = COMPONENTS[function]
+            for name in names:
+                sql_function = {'sum': 'SUM', 'count': 'COUNT', 'min': 'MIN', 'max': 'MAX'}[name]
+                columns.append(f"{sql_function}({value})")
+                if period_start is not None:
+                    params.append(self.monitor._format_period_start(period_start, date_format))
+            layout.append(names)
+
+        sql = f"SELECT {', '.join(columns)} FROM {table} WHERE rowid <= ?"
+        params.append(high)
+        if low is not None:
+            sql += " AND rowid > ?"
+            params.append(low)
+        if period_start is not None and date_column:
+            sql += f" AND {date_column} >= ?"
+            params.append(self.monitor._format_period_start(period_start, date_format))
+
+        row = conn.execute(sql, params).fetchone()
+        values = iter(row[1:])
+        components = [{name: next(values) for name in names} for names in layout]
+        return row[0], components
+
+    def _merge(self, state, delta):
+        """Merge the components of newly applied rows into a running state"""
+        merged = {}
+        for name, value in state.items():
+            other = delta[name]
+            if name in ('sum', 'count'):
+                merged[name] = (value or 0) + (other or 0)
+            elif value is None or other is None:
+                merged[name] = other if value is None else value
+            else:
+                merged[name] = min(value, other) if name == 'min' else max(value, other)
+        return merged
+
+    def _value(self, function, components):
+        """Read the aggregate value from running components"""
+        if function == 'AVG':
+            return components['sum'] / components['count'] if components['count'] else None
+        return components[COMPONENTS[function][0]]
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""KPI History Store"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Rollup tiers: table suffix -> bucket width in seconds
+ROLLUPS = {
+    'hourly': 3600,
+    'daily': 86400
+}
+
+# Default retention in days per resolution
+DEFAULT_RETENTION = {
+    'raw': 7,
+    'hourly': 90,
+    'daily': 1825
+}
+
+
+def _bucket_start(ts, width):
+    """Return the epoch second starting the local-time bucket of the given width that contains ts"""
+    local = time.localtime(ts)
+    if width >= 86400:
+        # Local midnight, which DST days place 23 or 25 hours apart
+        return int(time.mktime((local.tm_year, local.tm_mon, local.tm_mday, 0, 0, 0, 0, 0, -1)))
+    return ts - (ts + local.tm_gmtoff) % width
+
+
+class KPIHistoryStore:
+    """Append-optimized KPI history in SQLite with hourly/daily rollups and retention
+
+    record() only enqueues the value; a background writer thread batches
+    rows into one transaction per flush and maintains the rollup tables
+    incrementally, so the monitoring loop never waits on disk I/O.
+    Values are stored at epoch seconds; naive datetimes in and out are
+    local time, and rollup buckets follow local hours and days.
+    """
+
+    def __init__(self, db_path='kpi_history.db', retention=None, flush_interval=1.0,
+                 batch_size=1000, max_queue=100000, retention_interval=3600):
+        self.db_path = db_path
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retention_interval = retention_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._write_conn = self._connect()
+        self._create_tables()
+        self._read_conn = self._connect()
+        self._read_lock = threading.Lock()
+        self._last_retention = 0.0
+        self._writer = threading.Thread(target=self._write_loop, name='kpi-history-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, kpi_id, value, timestamp=None):
+        """Queue a KPI value for writing without blocking the caller"""
+        if value is None:
+            return
+
+        if timestamp is None:
+            timestamp = time.time()
+        elif isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+
+        try:
+            self._queue.put_nowait(('value', (kpi_id, int(timestamp), float(value))))
+        except queue.Full:
+            self.dropped += 1
+
+    def record_results(self, results):
+        """Queue every result of calculate_all_kpis"""
+        for kpi_id, result in results.items():
+            if result:
+                self.record(kpi_id, result['value'], datetime.strptime(result['as_of_date'], '%Y-%m-%d %H:%M:%S'))
+
+    def flush(self):
+        """Block until every queued value has been written"""
+        self._queue.put(('flush', None))
+        self._queue.join()
+
+    def close(self):
+        """Flush pending values and stop the writer thread"""
+        self._queue.put(('stop', None))
+        self._writer.join()
+        self._write_conn.close()
+        self._read_conn.close()
+
+    def query(self, kpi_id, start, end, resolution='auto'):
+        """Return KPI history between start and end (datetimes or epoch seconds)
+
+        resolution is 'raw', 'hourly', 'daily' or 'auto', which picks the
+        finest tier whose retention still covers start and that returns a
+        reasonable number of points.
+        """
+        start = start.timestamp() if isinstance(start, datetime) else start
+        end = end.timestamp() if isinstance(end, datetime) else end
+
+        if resolution == 'auto':
+            resolution = self._pick_resolution(start, end)
+
+        if resolution == 'raw':
+            sql = ("SELECT ts, value FROM kpi_history_raw "
+                   "WHERE kpi_id = ? AND ts >= ? AND ts < ? ORDER BY ts")
+            columns = ['timestamp', 'value']
+            bounds = (int(start), int(end))
+        elif resolution in ROLLUPS:
+            width = ROLLUPS[resolution]
+            sql = (f"SELECT bucket, sum / count, min, max, count, last FROM kpi_history_{resolution} "
+                   "WHERE kpi_id = ? AND bucket >= ? AND bucket < ? ORDER BY bucket")
+            columns = ['timestamp', 'value', 'min', 'max', 'count', 'last']
+            bounds = (_bucket_start(int(start), width), int(end))
+        else:
+            raise ValueError(f"Unknown resolution: {resolution}")
+
+        with self._read_lock:
+            rows = self._read_conn.execute(sql, (kpi_id,) + bounds).fetchall()
+
+        # Imported here so recording history does not load pandas
+        import pandas as pd
+        history = pd.DataFrame(rows, columns=columns)
+        history['timestamp'] = pd.to_datetime(history['timestamp'].map(datetime.fromtimestamp))
+        return history
+
+    def apply_retention(self, now=None):
+        """Delete history older than each tier's retention"""
+        self._queue.put(('retention', now or time.time()))
+        self._queue.join()
+
+    def _pick_resolution(self, start, end):
+        age_days = (time.time() - start) / 86400
+        span_hours = (end - start) / 3600
+
+        if age_days <= self.retention['raw'] and span_hours <= 48:
+            return 'raw'
+        if age_days <= self.retention['hourly'] and span_hours <= 24 * 60:
+            return 'hourly'
+        return 'daily'
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_tables(self):
+        conn = self._write_conn
+        # Raw values are not unique per second: every recorded value is kept, as the rollups count them all.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS kpi_history_raw (
+                kpi_id TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                value REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS kpi_history_raw_kpi_ts ON kpi_history_raw (kpi_id, ts)")
+        for resolution in ROLLUPS:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS kpi_history_{resolution} (
+                    kpi_id TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    sum REAL NOT NULL,
+                    min REAL NOT NULL,
+                    max REAL NOT NULL,
+                    last_ts INTEGER NOT NULL,
+                    last REAL NOT NULL,
+                    PRIMARY KEY (kpi_id, bucket)
+                ) WITHOUT ROWID
+            """)
+        conn.commit()
+
+    def _write_loop(self):
+        """Batch queued values into transactions until a stop message arrives"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                kind, payload = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                kind, payload = 'tick', None
+
+            if kind == 'value':
+                batch.append(payload)
+
+            # Control messages force pending values out so flush() and close() see them
+            if batch and (kind != 'value' or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+
+            if kind == 'retention' or time.time() - self._last_retention >= self.retention_interval:
+                self._delete_expired(payload if kind == 'retention' else time.time())
+
+            if kind not in ('value', 'tick'):
+                self._queue.task_done()
+            if kind == 'stop':
+                return
+
+    def _write_batch(self, batch):
+        """Write raw values and fold them into the rollups in one transaction"""
+        rollups = {resolution: {} for resolution in ROLLUPS}
+        for kpi_id, ts, value in batch:
+            for resolution, width in ROLLUPS.items():
+                key = (kpi_id, _bucket_start(ts, width))
+                bucket = rollups[resolution].get(key)
+                if bucket is None:
+                    rollups[resolution][key] = [1, value, value, value, ts, value]
+                else:
+                    bucket[0] += 1
+                    bucket[1] += value
+                    bucket[2] = min(bucket[2], value)
+                    bucket[3] = max(bucket[3], value)
+                    if ts >= bucket[4]:
+                        bucket[4], bucket[5] = ts, value
+
+        try:
+            with self._write_conn:
+                self._write_conn.executemany(
+                    "INSERT INTO kpi_history_raw (kpi_id, ts, value) VALUES (?, ?, ?)", batch
+                )
+                for resolution, buckets in rollups.items():
+                    self._write_conn.executemany(f"""
+                        INSERT INTO kpi_history_{resolution} (kpi_id, bucket, count, sum, min, max, last_ts, last)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (kpi_id, bucket) DO UPDATE SET
+                            count = count + excluded.count,
+                            sum = sum + excluded.sum,
+                            min = MIN(min, excluded.min),
+                            max = MAX(max, excluded.max),
+                            last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.last ELSE last END,
+                            last_ts = MAX(last_ts, excluded.last_ts)
+                    """, [key + tuple(values) for key, values in buckets.items()])
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} KPI history values: {str(e)}")
+
+    def _delete_expired(self, now):
+        """Apply retention to every tier"""
+        self._last_retention = time.time()
+        try:
+            with self._write_conn:
+                self._write_conn.execute(
+                    "DELETE FROM kpi_history_raw WHERE ts < ?", (int(now - self.retention['raw'] * 86400),)
+                )
+                for resolution in ROLLUPS:
+                    self._write_conn.execute(
+                        f"DELETE FROM kpi_history_{resolution} WHERE bucket < ?",
+                        (int(now - self.retention[resolution] * 86400),)
+                    )
+        except Exception as e:
+            logger.error(f"Error applying KPI history retention: {str(e)}")
@@ -4,26 +4,72 @@ import argparse
 import logging
 import sys
 import time
-import pandas as pd
 import sqlite3
+import os
+import threading
+import urllib.request
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.kpi.kpi_alerts import AlertDispatcher
+from src.kpi.kpi_history import KPIHistoryStore
+from src.semantic.semantic_layer import SemanticLayer
+from src.telemetry.instrumentation import span
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Business names of the date items restricting each query subject to a KPI period
+PERIOD_ITEMS = ('Date Key', 'Inventory Date Key', 'Start Date')
+
+# How each model data type stores a date
+DATE_FORMATS = {'integer': '%Y%m%d', 'date': '%Y-%m-%d'}
+
+# Statuses that raise an alert
+ALERT_STATUSES = ('warning', 'critical')
+
 class KPIMonitor:
     """KPI Monitor for tracking and alerting on business KPIs"""
     
-    def __init__(self, db_path=':memory:'):
+    def __init__(self, db_path=':memory:', history_path=None, alerts=None, semantic_layer=None, enable_wal=False):
+        if db_path != ':memory:' and not os.path.exists(db_path):
+            raise FileNotFoundError(f"Warehouse database not found: {db_path}")
+        
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Serializes snapshots on the one connection all threads share for :memory:
+        self._shared_lock = threading.RLock()
+        # WAL is persistent and changes how every writer of the warehouse journals, so it is opt-in
+        if enable_wal:
+            self._enable_wal()
+        # Read connection of the creating thread; other threads get their own from connection()
+        self.conn = self.connection()
+        self.history = KPIHistoryStore(history_path) if history_path else None
+        # Alert dispatcher; a log-only dispatcher is started on the first alert if none is given
+        self.alerts = alerts
+        # KPI inputs and period columns are named in the semantic model and resolved to warehouse columns
+        self.semantic_layer = semantic_layer or SemanticLayer()
+        self.period_columns = {}
+        for name in PERIOD_ITEMS:
+            source = self.semantic_layer.source(name)
+            self.period_columns[source['table']] = (source['column'], DATE_FORMATS[source['data_type'].lower()])
+        # Each KPI is a formula, a function of its named aggregate inputs. Inputs are
+        # evaluated in batches: one query per source table covers every KPI reading it.
         self.kpis = {
             'revenue': {
                 'name': 'Total Revenue',
-                'query': 'SELECT SUM(SalesAmount) FROM FactSales WHERE DateKey >= ?',
+                'inputs': {
+                    'sales': {'measure': 'Sales Amount'}
+                },
+                'formula': lambda v: v['sales'],
                 'threshold': 100000,
                 'comparison': '>',
                 'period': 'daily',
@@ -31,7 +77,10 @@ class KPIMonitor:
             },
             'new_customers': {
                 'name': 'New Customers',
-                'query': 'SELECT COUNT(*) FROM DimCustomer WHERE StartDate >= ?',
+                'inputs': {
+                    'customers': {'measure': 'Customer Count'}
+                },
+                'formula': lambda v: v['customers'],
                 'threshold': 50,
                 'comparison': '>',
                 'period': 'daily',
@@ -39,12 +88,11 @@ class KPIMonitor:
             },
             'inventory_turnover': {
                 'name': 'Inventory Turnover',
-                'query': '''
-                    SELECT SUM(s.Quantity) / AVG(i.QuantityOnHand)
-                    FROM FactSales s
-                    JOIN FactInventory i ON s.ProductKey = i.ProductKey
-                    WHERE s.DateKey >= ?
-                ''',
+                'inputs': {
+                    'units_sold': {'measure': 'Quantity'},
+                    'avg_on_hand': {'measure': 'Quantity On Hand', 'period_filter': False}
+                },
+                'formula': lambda v: v['units_sold'] / v['avg_on_hand'],
                 'threshold': 2.0,
                 'comparison': '>',
                 'period': 'monthly',
@@ -52,17 +100,93 @@ class KPIMonitor:
             },
             'profit_margin': {
                 'name': 'Profit Margin',
-                'query': '''
-                    SELECT SUM(Profit) / SUM(SalesAmount) * 100
-                    FROM FactSales
-                    WHERE DateKey >= ?
-                ''',
+                'inputs': {
+                    'profit': {'measure': 'Profit'},
+                    'sales': {'measure': 'Sales Amount'}
+                },
+                'formula': lambda v: v['profit'] / v['sales'] * 100,
                 'threshold': 15.0,
                 'comparison': '>',
                 'period': 'weekly',
                 'alert_level': 'high'
             }
         }
+        for kpi in self.kpis.values():
+            for spec in kpi['inputs'].values():
+                self.compile_input(spec)
+    
+    def compile_input(self, spec):
+        """Resolve an input's business-named measure to its table, column and aggregate"""
+        source = self.semantic_layer.source(spec['measure'])
+        if source['function'] is None:
+            raise ValueError(f"{spec['measure']} is not a measure")
+        spec.update(table=source['table'], column=source['column'], function=source['function'])
+        return spec
+    
+    def connection(self):
+        """Return the read-only warehouse connection of the calling thread"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            with self._connections_lock:
+                if self.db_path == ':memory:' and self._connections:
+                    # Every :memory: connection is its own empty database, so all threads share the first
+                    conn = self._connections[0]
+                else:
+                    conn = self.open_read_connection()
+                    self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+    
+    def open_read_connection(self):
+        """Open a new read-only connection to the warehouse
+        
+        File databases are opened with mode=ro so KPI evaluation can never
+        take write locks; with enable_wal readers do not block the ETL loader
+        and are not blocked by it.
+        """
+        if self.db_path == ':memory:':
+            return sqlite3.connect(self.db_path, check_same_thread=False)
+        
+        uri = f"file:{urllib.request.pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    
+    @contextmanager
+    def snapshot(self, conn=None):
+        """Run every read inside one transaction so they all see the same data version"""
+        conn = conn or self.connection()
+        with self._shared_lock if self.db_path == ':memory:' else nullcontext():
+            if conn.in_transaction:
+                yield conn
+                return
+            
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.rollback()
+    
+    def close(self):
+        """Close every pooled read connection"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def _enable_wal(self):
+        """Switch a file warehouse to WAL so loads and KPI reads run concurrently"""
+        if self.db_path == ':memory:':
+            return
+        
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                # The journal mode is stored in the database file and applies to the loader too
+                conn.execute("PRAGMA journal_mode=WAL")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL mode on {self.db_path}: {str(e)}")
     
     def calculate_kpi(self, kpi_id, as_of_date=None):
         """Calculate a specific KPI value"""
@@ -70,89 +194,286 @@ class KPIMonitor:
             logger.error(f"KPI {kpi_id} not found")
             return None
         
-        kpi = self.kpis[kpi_id]
-        
+        return self.calculate_kpis([kpi_id], as_of_date)[kpi_id]
+    
+    def calculate_all_kpis(self, as_of_date=None):
+        """Calculate all KPIs"""
+        return self.calculate_kpis(list(self.kpis), as_of_date)
+    
+    def calculate_kpis(self, kpi_ids, as_of_date=None, conn=None):
+        """Calculate several KPIs with one aggregate query per source table"""
         if as_of_date is None:
             as_of_date = datetime.now()
         
-        # Calculate period start date
+        results = {}
+        period_starts = self._period_starts(kpi_ids, as_of_date, results)
+        plans = self.plan_kpi_batch(period_starts)
+        values = {}
+        failed_tables = set()
+        
+        with span('kpi.calculate') as timing, self.snapshot(conn) as conn:
+            timing.add('kpis', len(period_starts))
+            timing.add('scans', len(plans))
+            for plan in plans:
+                try:
+                    row = conn.execute(plan['sql'], plan['params']).fetchone()
+                    values.update(zip(plan['aliases'], row))
+                except Exception as e:
+                    logger.error(f"Error evaluating KPI inputs from {plan['table']}: {str(e)}")
+                    failed_tables.add(plan['table'])
+        
+        logger.debug(f"Evaluated {len(period_starts)} KPIs with {len(plans)} table scans")
+        
+        for kpi_id, period_start in period_starts.items():
+            kpi = self.kpis[kpi_id]
+            if any(spec['table'] in failed_tables for spec in kpi['inputs'].values()):
+                results[kpi_id] = None
+                continue
+            
+            inputs = {
+                name: values[self._input_key(spec, period_start)]
+                for name, spec in kpi['inputs'].items()
+            }
+            results[kpi_id] = self._build_result(kpi_id, inputs, period_start, as_of_date)
+        
+        return results
+    
+    def plan_kpi_batch(self, period_starts):
+        """Group the inputs of several KPIs into one aggregate query per source table
+        
+        period_starts maps KPI ids to their period start. Identical inputs are
+        computed once; inputs with different periods share the scan through
+        conditional aggregation. Returns a list of {'table', 'sql', 'params',
+        'aliases'} plans, where aliases are the input keys of each result column.
+        """
+        tables = {}
+        for kpi_id, period_start in period_starts.items():
+            for spec in self.kpis[kpi_id]['inputs'].values():
+                key = self._input_key(spec, period_start)
+                tables.setdefault(spec['table'], {}).setdefault(key, spec)
+        
+        plans = []
+        for table, inputs in tables.items():
+            starts = {key[3] for key in inputs}
+            shared_start = starts.pop() if len(starts) == 1 else None
+            date_column, date_format = self.period_columns.get(table, (None, None))
+            columns = []
+            params = []
+            
+            for (_, function, column, start) in inputs:
+                if start is None or shared_start is not None:
+                    columns.append(f"{function}({column})")
+                else:
+                    value = '1' if column == '*' else column
+                    columns.append(f"{function}(CASE WHEN {date_column} >= ? THEN {value} END)")
+                    params.append(self._format_period_start(start, date_format))
+            
+            sql = f"SELECT {', '.join(columns)} FROM {table}"
+            if shared_start is not None:
+                sql += f" WHERE {date_column} >= ?"
+                params.append(self._format_period_start(shared_start, date_format))
+            elif None not in {key[3] for key in inputs}:
+                # Every input is period filtered: skip rows older than the longest period
+                sql += f" WHERE {date_column} >= ?"
+                params.append(self._format_period_start(min(key[3] for key in inputs), date_format))
+            
+            plans.append({'table': table, 'sql': sql, 'params': params, 'aliases': list(inputs)})
+        
+        return plans
+    
+    def backfill_kpi(self, kpi_id, start_date, end_date, store=False):
+        """Compute a KPI for every day from start_date to end_date in one pass
+        
+        Each source table is scanned once, grouped by its date column; the
+        period-to-date value of every as-of day is then derived with
+        cumulative sums that reset at each daily, weekly or monthly period
+        start. Rows dated after an as-of day are not counted for it. Returns
+        a DataFrame with as_of_date, period_start, value and status columns,
+        optionally recorded in the KPI history.
+        """
+        # Imported here so single KPI checks start without pandas
+        import numpy as np
+        import pandas as pd
+        
+        if kpi_id not in self.kpis:
+            logger.error(f"KPI {kpi_id} not found")
+            return None
+        
+        kpi = self.kpis[kpi_id]
+        first_start = self._period_start(kpi['period'], start_date)
+        if first_start is None:
+            logger.error(f"Unknown period type: {kpi['period']}")
+            return None
+        
+        days = pd.date_range(first_start, end_date.replace(hour=0, minute=0, second=0, microsecond=0), freq='D')
         if kpi['period'] == 'daily':
-            period_start = as_of_date.replace(hour=0, minute=0, second=0, microsecond=0)
+            period_starts = days
         elif kpi['period'] == 'weekly':
-            period_start = as_of_date - timedelta(days=as_of_date.weekday())
-            period_start = period_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif kpi['period'] == 'monthly':
-            period_start = as_of_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            period_starts = days - pd.to_timedelta(days.weekday, unit='D')
         else:
-            logger.error(f"Unknown period type: {kpi['period']}")
-            return None
+            period_starts = days.to_period('M').to_timestamp()
+        segments = period_starts.asi8
         
+        inputs = {}
         try:
-            # In a real implementation, this would connect to the actual data warehouse
-            # For this example, we'll simulate the result
-            # cursor = self.conn.cursor()
-            # cursor.execute(kpi['query'], (period_start.strftime('%Y%m%d'),))
-            # value = cursor.fetchone()[0]
-            
-            # Simulate KPI values
-            import random
-            if kpi_id == 'revenue':
-                value = random.uniform(90000, 110000)
-            elif kpi_id == 'new_customers':
-                value = random.randint(40, 60)
-            elif kpi_id == 'inventory_turnover':
-                value = random.uniform(1.8, 2.2)
-            elif kpi_id == 'profit_margin':
-                value = random.uniform(14.0, 16.0)
-            else:
-                value = 0
-            
-            return {
-                'kpi_id': kpi_id,
-                'name': kpi['name'],
-                'value': value,
-                'threshold': kpi['threshold'],
-                'comparison': kpi['comparison'],
-                'period': kpi['period'],
-                'period_start': period_start.strftime('%Y-%m-%d'),
-                'as_of_date': as_of_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'status': self._evaluate_status(value, kpi['threshold'], kpi['comparison'])
-            }
-        
+            with self.snapshot() as conn:
+                for name, spec in kpi['inputs'].items():
+                    if self._input_key(spec, first_start)[3] is None:
+                        row = conn.execute(f"SELECT {spec['function']}({spec['column']}) FROM {spec['table']}").fetchone()
+                        inputs[name] = 0 if row[0] is None else row[0]
+                    else:
+                        inputs[name] = self._backfill_input(conn, spec, days, segments)
         except Exception as e:
-            logger.error(f"Error calculating KPI {kpi_id}: {str(e)}")
+            logger.error(f"Error backfilling KPI {kpi_id}: {str(e)}")
             return None
+        
+        # Float arrays make a zero divisor yield inf/nan (reported as None) even for whole-table inputs
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = self._evaluate_formula(kpi['formula'], {
+                name: np.asarray(value, dtype=float) for name, value in inputs.items()
+            })
+        values = np.broadcast_to(np.asarray(np.nan if values is None else values, dtype=float), len(days))
+        
+        keep = days >= start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        values = [float(value) if np.isfinite(value) else None for value in values[keep]]
+        backfill = pd.DataFrame({
+            'as_of_date': days[keep],
+            'period_start': period_starts[keep],
+            'value': values,
+            'status': [self._evaluate_status(value, kpi['threshold'], kpi['comparison']) for value in values]
+        })
+        
+        if store and self.history:
+            for as_of_date, value in zip(backfill['as_of_date'], backfill['value']):
+                if pd.notna(value):
+                    self.history.record(kpi_id, value, as_of_date.to_pydatetime())
+        
+        return backfill
     
-    def calculate_all_kpis(self, as_of_date=None):
-        """Calculate all KPIs"""
-        results = {}
+    def _backfill_input(self, conn, spec, days, segments):
+        """Return an input's period-to-date value for each day from one grouped scan"""
+        import numpy as np
+        import pandas as pd
         
-        for kpi_id in self.kpis:
-            results[kpi_id] = self.calculate_kpi(kpi_id, as_of_date)
+        date_column, date_format = self.period_columns[spec['table']]
+        column = '1' if spec['column'] == '*' else spec['column']
+        daily = pd.read_sql_query(
+            f"SELECT {date_column} AS day, TOTAL({column}) AS total, COUNT({column}) AS count, "
+            f"MIN({column}) AS min, MAX({column}) AS max FROM {spec['table']} "
+            f"WHERE {date_column} >= ? AND {date_column} < ? GROUP BY 1",
+            conn,
+            params=[self._format_period_start(days[0], date_format),
+                    self._format_period_start(days[-1] + timedelta(days=1), date_format)]
+        )
+        daily['day'] = pd.to_datetime(daily['day'].astype(str).str[:10], format=date_format)
+        daily = daily.groupby('day').agg({'total': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'})
+        daily = daily.reindex(days)
         
-        return results
+        function = spec['function']
+        if function in ('MIN', 'MAX'):
+            column_name = function.lower()
+            running = daily[column_name].groupby(segments)
+            running = running.cummin() if function == 'MIN' else running.cummax()
+            # Days without rows keep the period's value so far
+            return running.groupby(segments).ffill().fillna(0).to_numpy(dtype=float)
+        
+        # Cumulative sums that restart at every period start
+        starts = np.r_[True, segments[1:] != segments[:-1]]
+        
+        def period_to_date(values):
+            totals = np.cumsum(np.nan_to_num(values.to_numpy(dtype=float)))
+            offsets = np.maximum.accumulate(np.where(starts, np.arange(len(totals)), 0))
+            return totals - np.r_[0.0, totals][offsets]
+        
+        if function == 'SUM':
+            return period_to_date(daily['total'])
+        if function == 'COUNT':
+            return period_to_date(daily['count'])
+        counts = period_to_date(daily['count'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts > 0, period_to_date(daily['total']) / counts, 0.0)
+    
+    def _period_starts(self, kpi_ids, as_of_date, results):
+        """Return {kpi_id: period start}, recording None results for invalid KPIs"""
+        period_starts = {}
+        for kpi_id in kpi_ids:
+            if kpi_id not in self.kpis:
+                logger.error(f"KPI {kpi_id} not found")
+                results[kpi_id] = None
+                continue
+            
+            period_start = self._period_start(self.kpis[kpi_id]['period'], as_of_date)
+            if period_start is None:
+                logger.error(f"Unknown period type: {self.kpis[kpi_id]['period']}")
+                results[kpi_id] = None
+                continue
+            period_starts[kpi_id] = period_start
+        
+        return period_starts
+    
+    def _build_result(self, kpi_id, inputs, period_start, as_of_date):
+        """Evaluate a KPI formula over its input values and describe the result"""
+        kpi = self.kpis[kpi_id]
+        value = self._evaluate_formula(kpi['formula'], inputs)
+        
+        return {
+            'kpi_id': kpi_id,
+            'name': kpi['name'],
+            'value': value,
+            'threshold': kpi['threshold'],
+            'comparison': kpi['comparison'],
+            'period': kpi['period'],
+            'period_start': period_start.strftime('%Y-%m-%d'),
+            'as_of_date': as_of_date.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': self._evaluate_status(value, kpi['threshold'], kpi['comparison'])
+        }
+    
+    def _input_key(self, spec, period_start):
+        """Identify an aggregate input so KPIs sharing it compute it once"""
+        filtered = spec.get('period_filter', True) and spec['table'] in self.period_columns
+        return (spec['table'], spec['function'], spec['column'], period_start if filtered else None)
+    
+    def _format_period_start(self, period_start, date_format):
+        """Format a period start the way the table stores dates"""
+        value = period_start.strftime(date_format)
+        return int(value) if value.isdigit() else value
+    
+    def _period_start(self, period, as_of_date):
+        """Return the start of the period containing as_of_date"""
+        if period == 'daily':
+            return as_of_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        elif period == 'weekly':
+            period_start = as_of_date - timedelta(days=as_of_date.weekday())
+            return period_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        elif period == 'monthly':
+            return as_of_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        return None
+    
+    def _evaluate_formula(self, formula, inputs):
+        """Evaluate a KPI formula over its aggregate inputs"""
+        try:
+            return formula({name: 0 if value is None else value for name, value in inputs.items()})
+        except ZeroDivisionError:
+            return None
     
     def monitor_kpis_real_time(self, interval_seconds=60):
         """Monitor KPIs in real-time with specified interval"""
+        from src.kpi.kpi_engine import IncrementalKPIEngine
+        
         logger.info(f"Starting real-time KPI monitoring (interval: {interval_seconds}s)")
+        engine = IncrementalKPIEngine(self)
         
         try:
             while True:
                 logger.info("Calculating KPIs...")
-                kpi_results = self.calculate_all_kpis()
-                
-                # Check for alerts
-                alerts = []
-                for kpi_id, result in kpi_results.items():
-                    if result and result['status'] != 'normal':
-                        alerts.append(result)
+                # Only fact rows loaded since the previous tick are aggregated
+                kpi_results = engine.tick()
                 
                 # Display results
                 self._display_kpi_results(kpi_results)
                 
-                # Handle alerts
-                if alerts:
-                    self._handle_alerts(alerts)
+                # Handle alerts; notifications are sent in the background
+                self._handle_alerts(kpi_results)
                 
                 # Store results
                 self._store_kpi_results(kpi_results)
@@ -165,9 +486,37 @@ class KPIMonitor:
         except Exception as e:
             logger.error(f"Error in KPI monitoring: {str(e)}")
     
+    def monitor_kpis_scheduled(self, max_workers=4):
+        """Monitor KPIs concurrently, each on its own cadence"""
+        import asyncio
+        from src.kpi.kpi_scheduler import KPIScheduler
+        
+        scheduler = KPIScheduler(self, max_workers=max_workers, on_result=self._handle_scheduled_result)
+        for kpi_id in scheduler.kpi_ids:
+            logger.info(f"Scheduling {kpi_id} every {scheduler.cadence(kpi_id)}s "
+                        f"(timeout {scheduler.timeout(kpi_id)}s)")
+        
+        try:
+            asyncio.run(scheduler.run())
+        except KeyboardInterrupt:
+            logger.info("KPI monitoring stopped by user")
+        
+        for kpi_id, stats in scheduler.latency_stats().items():
+            logger.info(f"{kpi_id}: {stats['evaluations']} evaluations, p50 {stats['p50_ms']:.1f}ms, "
+                        f"{stats['skipped']} skipped, {stats['timeouts']} timeouts")
+    
+    def _handle_scheduled_result(self, result):
+        """Display, alert and store a single KPI result from the scheduler"""
+        results = {result['kpi_id']: result}
+        self._display_kpi_results(results)
+        self._handle_alerts(results)
+        self._store_kpi_results(results)
+    
     def _evaluate_status(self, value, threshold, comparison):
         """Evaluate KPI status based on threshold and comparison"""
-        if comparison == '>':
+        if value is None:
+            return 'unknown'
+        elif comparison == '>':
             if value > threshold * 1.1:
                 return 'excellent'
             elif value > threshold:
@@ -203,24 +552,37 @@ class KPIMonitor:
                     'unknown': '⚪'
                 }.get(result['status'], '⚪')
                 
-                logger.info(f"{status_indicator} {result['name']}: {result['value']:.2f} (Threshold: {result['threshold']} {result['comparison']})")
+                logger.info(f"{status_indicator} {result['name']}: {self._format_value(result['value'])} (Threshold: {result['threshold']} {result['comparison']})")
         
         logger.info("-" * 80)
     
-    def _handle_alerts(self, alerts):
-        """Handle KPI alerts"""
-        logger.warning(f"ALERTS: {len(alerts)} KPIs require attention")
-        
-        for alert in alerts:
-            logger.warning(f"⚠️ {alert['name']} is {alert['status'].upper()}: {alert['value']:.2f} vs threshold {alert['threshold']} {alert['comparison']}")
+    def _format_value(self, value):
+        """Format a KPI value for display"""
+        return 'n/a' if value is None else f"{value:.2f}"
+    
+    def _handle_alerts(self, results):
+        """Queue alerts for KPIs in an alerting status and clear recovered ones"""
+        for kpi_id, result in results.items():
+            if not result:
+                continue
+            if result['status'] not in ALERT_STATUSES:
+                if self.alerts:
+                    self.alerts.resolve(kpi_id)
+                continue
             
-            # In a real implementation, this would send emails, SMS, or other notifications
-            # based on the alert_level of the KPI
+            if self.alerts is None:
+                self.alerts = AlertDispatcher()
+            self.alerts.submit(result, self.kpis[kpi_id].get('alert_level', 'medium'))
     
     def _store_kpi_results(self, results):
         """Store KPI results for historical tracking"""
-        # In a real implementation, this would store to a database
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if self.history is None:
+            logger.info(f"KPI history not configured; results at {timestamp} not stored")
+            return
+        
+        # Queued for the background writer so the monitoring loop never waits on disk
+        self.history.record_results(results)
         logger.info(f"Stored KPI results at {timestamp}")
 
 def main():
@@ -228,14 +590,33 @@ def main():
     parser = argparse.ArgumentParser(description='Monitor Business KPIs')
     parser.add_argument('--real-time', action='store_true', help='Monitor KPIs in real-time')
     parser.add_argument('--interval', type=int, default=60, help='Interval in seconds for real-time monitoring')
+    parser.add_argument('--scheduled', action='store_true', help='Monitor KPIs concurrently on per-KPI cadences')
+    parser.add_argument('--workers', type=int, default=4, help='Database worker threads for scheduled monitoring')
     parser.add_argument('--kpi', type=str, help='Specific KPI to calculate')
+    parser.add_argument('--db', type=str, default=':memory:', help='Path to the data warehouse database')
+    parser.add_argument('--history', type=str, help='Path to the KPI history database')
+    parser.add_argument('--wal', action='store_true',
+                        help='Switch the warehouse to WAL journaling so loads and KPI reads run concurrently')
+    parser.add_argument('--backfill', nargs=2, metavar=('FROM', 'TO'),
+                        help='Backfill --kpi for every day between two YYYY-MM-DD dates')
     
     args = parser.parse_args()
     
-    monitor = KPIMonitor()
+    monitor = KPIMonitor(db_path=args.db, history_path=args.history, enable_wal=args.wal)
     
-    if args.real_time:
+    if args.scheduled:
+        monitor.monitor_kpis_scheduled(args.workers)
+    elif args.real_time:
         monitor.monitor_kpis_real_time(args.interval)
+    elif args.backfill:
+        if not args.kpi:
+            parser.error('--backfill requires --kpi')
+        start_date, end_date = (datetime.strptime(value, '%Y-%m-%d') for value in args.backfill)
+        backfill = monitor.backfill_kpi(args.kpi, start_date, end_date, store=True)
+        if backfill is None:
+            print(f"Error backfilling KPI: {args.kpi}")
+            sys.exit(1)
+        print(backfill.to_string(index=False))
     elif args.kpi:
         result = monitor.calculate_kpi(args.kpi)
         if result:
@@ -249,6 +630,12 @@ def main():
             if result:
                 print(f"{result['name']}: {result['value']}")
     
+    if monitor.alerts:
+        monitor.alerts.close()
+    if monitor.history:
+        monitor.history.close()
+    monitor.close()
+    
     sys.exit(0)
 
 if __name__ == "__main__":
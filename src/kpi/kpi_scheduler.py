@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Asyncio KPI Scheduler"""
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Default evaluation cadence (seconds) by KPI period; override with 'cadence_seconds'
+DEFAULT_CADENCES = {
+    'daily': 60,
+    'weekly': 300,
+    'monthly': 900
+}
+
+
+class KPIScheduler:
+    """Evaluate each KPI on its own cadence from a single event loop
+
+    Database work runs on a bounded thread pool; each worker thread reads
+    through its own connection from the monitor's pool. Ticks are scheduled on a fixed grid so
+    they do not drift, and a tick is skipped while the previous evaluation
+    of the same KPI is still running.
+    """
+
+    def __init__(self, monitor, kpi_ids=None, max_workers=4, on_result=None, latency_window=100):
+        self.monitor = monitor
+        self.kpi_ids = list(kpi_ids or monitor.kpis)
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self.stats = {
+            kpi_id: {
+                'evaluations': 0,
+                'skipped': 0,
+                'timeouts': 0,
+                'errors': 0,
+                'last_latency_ms': None,
+                'max_latency_ms': 0.0,
+                'latencies': deque(maxlen=latency_window)
+            }
+            for kpi_id in self.kpi_ids
+        }
+        self._pending = set()
+        self._stop_event = None
+
+    def cadence(self, kpi_id):
+        """Seconds between evaluations of a KPI"""
+        kpi = self.monitor.kpis[kpi_id]
+        return kpi.get('cadence_seconds', DEFAULT_CADENCES.get(kpi['period'], 60))
+
+    def timeout(self, kpi_id):
+        """Seconds an evaluation may take before it is reported as timed out"""
+        return self.monitor.kpis[kpi_id].get('timeout_seconds', self.cadence(kpi_id))
+
+    async def run(self, duration=None):
+        """Run the scheduler until stop() is called or duration seconds elapse"""
+        self._stop_event = asyncio.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kpi-worker')
+        tasks = [asyncio.create_task(self._schedule(kpi_id, executor)) for kpi_id in self.kpi_ids]
+
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    def stop(self):
+        """Ask a running scheduler to stop"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def latency_stats(self):
+        """Return evaluation counters and latency percentiles per KPI"""
+        report = {}
+        for kpi_id, stats in self.stats.items():
+            latencies = sorted(stats['latencies'])
+            report[kpi_id] = {
+                'evaluations': stats['evaluations'],
+                'skipped': stats['skipped'],
+                'timeouts': stats['timeouts'],
+                'errors': stats['errors'],
+                'last_latency_ms': stats['last_latency_ms'],
+                'max_latency_ms': stats['max_latency_ms'],
+                'p50_ms': latencies[len(latencies) // 2] if latencies else 0.0,
+                'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+            }
+        return report
+
+    async def _schedule(self, kpi_id, executor):
+        """Start evaluations of one KPI on a fixed cadence grid"""
+        loop = asyncio.get_running_loop()
+        cadence = self.cadence(kpi_id)
+        next_run = loop.time()
+        in_flight = None
+
+        while True:
+            delay = next_run - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if in_flight is not None and not in_flight.done():
+                self.stats[kpi_id]['skipped'] += 1
+            else:
+                in_flight = loop.run_in_executor(executor, self._evaluate, kpi_id)
+                collector = asyncio.create_task(self._collect(kpi_id, in_flight))
+                self._pending.add(collector)
+                collector.add_done_callback(self._pending.discard)
+
+            next_run += cadence
+            behind = loop.time() - next_run
+            if behind > 0:
+                # The loop fell behind; skip missed ticks instead of bursting
+                missed = int(behind // cadence) + 1
+                self.stats[kpi_id]['skipped'] += missed
+                next_run += missed * cadence
+
+    async def _collect(self, kpi_id, future):
+        """Wait for an evaluation within the KPI timeout and record its outcome"""
+        stats = self.stats[kpi_id]
+        try:
+            result, latency_ms = await asyncio.wait_for(asyncio.shield(future), self.timeout(kpi_id))
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            logger.warning(f"KPI {kpi_id} evaluation exceeded {self.timeout(kpi_id)}s")
+            return
+        except Exception as e:
+            stats['errors'] += 1
+            logger.error(f"Error evaluating KPI {kpi_id}: {str(e)}")
+            return
+
+        stats['evaluations'] += 1
+        stats['last_latency_ms'] = latency_ms
+        stats['max_latency_ms'] = max(stats['max_latency_ms'], latency_ms)
+        stats['latencies'].append(latency_ms)
+
+        if result is None:
+            stats['errors'] += 1
+        elif self.on_result:
+            self.on_result(result)
+
+    def _evaluate(self, kpi_id):
+        """Evaluate one KPI on a worker thread"""
+        started = time.perf_counter()
+        # Each worker thread reads through its own pooled monitor connection
+        result = self.monitor.calculate_kpis([kpi_id], conn=self.monitor.connection())[kpi_id]
+        return result, (time.perf_counter() - started) * 1000
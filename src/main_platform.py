@@ -16,26 +16,27 @@ from datetime import datetime
 # Add src directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import platform components
-from src.bi_platform import BusinessIntelligencePlatform
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('bi_platform.log')
-    ]
-)
+# Platform components are imported by the mode that uses them, so short
+# commands do not pay for pandas, matplotlib and every component at start-up
 logger = logging.getLogger(__name__)
 
+def configure_logging(log_file='bi_platform.log'):
+    """Log to the console and to log_file, which is opened on the first record"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler(log_file, delay=True)
+        ]
+    )
+
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Business Intelligence Platform')
     
     parser.add_argument('--mode', type=str, default='interactive',
-                        choices=['interactive', 'etl', 'olap', 'dashboard', 'report'],
+                        choices=['interactive', 'etl', 'olap', 'dashboard', 'report', 'pipeline', 'serve', 'kpi', 'extract'],
                         help='Operation mode')
     
     parser.add_argument('--etl', type=str, 
@@ -54,12 +55,33 @@ def parse_arguments():
                         choices=['ceo', 'cfo', 'sales', 'operations'],
                         help='Report to generate')
     
+    parser.add_argument('--kpi', type=str,
+                        help='KPI to check in kpi mode (all KPIs if omitted)')
+    
     parser.add_argument('--output-dir', type=str, default='output',
                         help='Output directory for reports and dashboards')
     
+    parser.add_argument('--db', type=str,
+                        help='Path to the data warehouse database')
+    
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent pipeline tasks')
+    
+    parser.add_argument('--host', type=str, default='127.0.0.1',
+                        help='Address the serve mode API listens on')
+    
+    parser.add_argument('--port', type=int, default=8050,
+                        help='Port the serve mode API listens on')
+    
+    parser.add_argument('--max-concurrency', type=int, default=8,
+                        help='Requests the serve mode API processes at once')
+    
+    parser.add_argument('--profile', action='store_true',
+                        help='Write cProfile, tracemalloc and span metrics of the run to <output-dir>/profile')
+    
     return parser.parse_args()
 
-def run_interactive_mode():
+def run_interactive_mode(db_path=None, output_dir='output'):
     """Run the platform in interactive mode"""
     print("\n===== Business Intelligence Platform =====\n")
     print("1. Run ETL Process")
@@ -80,21 +102,21 @@ def run_interactive_mode():
     elif choice == '2':
         cube = input("Cube to process (sales/inventory/finance/customer/all): ").lower()
         if cube in ['sales', 'inventory', 'finance', 'customer', 'all']:
-            process_olap_cubes(cube)
+            process_olap_cubes(cube, db_path or ':memory:')
         else:
             print("Invalid cube selection.")
     
     elif choice == '3':
         dashboard = input("Dashboard to generate (executive/sales/finance/operations/all): ").lower()
         if dashboard in ['executive', 'sales', 'finance', 'operations', 'all']:
-            generate_dashboards(dashboard)
+            generate_dashboards(dashboard, db_path or ':memory:', output_dir)
         else:
             print("Invalid dashboard selection.")
     
     elif choice == '4':
         report = input("Report to generate (ceo/cfo/sales/operations/all): ").lower()
         if report in ['ceo', 'cfo', 'sales', 'operations', 'all']:
-            generate_reports(report)
+            generate_reports(report, db_path, output_dir)
         else:
             print("Invalid report selection.")
     
@@ -105,20 +127,30 @@ def run_interactive_mode():
     else:
         print("Invalid choice. Please enter a number between 1 and 5.")
 
+def etl_unavailable():
+    """Return why the ETL modules or their source system drivers cannot be imported, or None"""
+    try:
+        # Imported lazily: extraction needs the source system drivers
+        import src.etl.run_etl_pipeline  # noqa: F401
+    except ImportError as e:
+        return str(e)
+    return None
+
 def run_etl_process(etl_type):
     """Run the ETL process"""
     logger.info(f"Starting ETL process ({etl_type})...")
     
+    reason = etl_unavailable()
+    if reason:
+        logger.error(f"ETL is unavailable: {reason}")
+        print(f"ETL is unavailable: {reason}")
+        return False
+    
     try:
-        # In a real implementation, this would import and use the ETL module
-        # from src.etl.run_etl_pipeline import run_etl_pipeline
-        # success = run_etl_pipeline(full_load=(etl_type == 'full'))
+        from src.etl.run_etl_pipeline import run_etl_pipeline
         
-        # Simulate ETL process
         print(f"Running {etl_type} ETL process...")
-        import time
-        time.sleep(2)  # Simulate processing time
-        success = True
+        success = run_etl_pipeline(full_load=(etl_type == 'full'))
         
         if success:
             logger.info("ETL process completed successfully.")
@@ -126,30 +158,26 @@ def run_etl_process(etl_type):
         else:
             logger.error("ETL process failed.")
             print("ETL process failed. Check logs for details.")
+        return bool(success)
     
     except Exception as e:
         logger.exception(f"Error in ETL process: {str(e)}")
         print(f"Error in ETL process: {str(e)}")
+        return False
 
-def process_olap_cubes(cube):
+def process_olap_cubes(cube, db_path=':memory:'):
     """Process OLAP cubes"""
     logger.info(f"Processing OLAP cubes ({cube})...")
     
     try:
-        # In a real implementation, this would import and use the OLAP module
-        # from src.olap.refresh_cubes import OLAPCubeManager
-        # cube_manager = OLAPCubeManager()
-        # 
-        # if cube == 'all':
-        #     success = cube_manager.refresh_all_cubes()
-        # else:
-        #     success = cube_manager.refresh_cube(cube)
+        from src.olap.refresh_cubes import OLAPCubeManager
+        cube_manager = OLAPCubeManager(db_path=db_path)
         
-        # Simulate OLAP processing
         print(f"Processing OLAP cube(s): {cube}...")
-        import time
-        time.sleep(2)  # Simulate processing time
-        success = True
+        if cube == 'all':
+            success = cube_manager.refresh_all_cubes()
+        else:
+            success = cube_manager.refresh_cube(cube)
         
         if success:
             logger.info("OLAP processing completed successfully.")
@@ -157,30 +185,25 @@ def process_olap_cubes(cube):
         else:
             logger.error("OLAP processing failed.")
             print("OLAP processing failed. Check logs for details.")
+        return bool(success)
     
     except Exception as e:
         logger.exception(f"Error in OLAP processing: {str(e)}")
         print(f"Error in OLAP processing: {str(e)}")
+        return False
 
-def generate_dashboards(dashboard):
-    """Generate dashboards"""
+def generate_dashboards(dashboard, db_path=':memory:', output_dir='output'):
+    """Generate dashboards, refreshing the cubes they read first"""
     logger.info(f"Generating dashboards ({dashboard})...")
     
     try:
-        # In a real implementation, this would import and use the dashboard module
-        # from src.dashboards.dashboard_generator import DashboardGenerator
-        # generator = DashboardGenerator()
-        # 
-        # if dashboard == 'all':
-        #     success = generator.generate_all_dashboards()
-        # else:
-        #     success = generator.generate_dashboard(dashboard)
+        from src.pipeline.bi_pipeline import build_bi_pipeline
         
-        # Simulate dashboard generation
         print(f"Generating dashboard(s): {dashboard}...")
-        import time
-        time.sleep(2)  # Simulate processing time
-        success = True
+        dashboards = ['executive', 'sales', 'finance', 'operations'] if dashboard == 'all' else [dashboard]
+        orchestrator, _ = build_bi_pipeline(db_path, output_dir, dashboards=dashboards, reports=[])
+        results = orchestrator.run()
+        success = all(result['status'] == 'succeeded' for result in results.values())
         
         if success:
             logger.info("Dashboard generation completed successfully.")
@@ -188,31 +211,27 @@ def generate_dashboards(dashboard):
         else:
             logger.error("Dashboard generation failed.")
             print("Dashboard generation failed. Check logs for details.")
+        return success
     
     except Exception as e:
         logger.exception(f"Error in dashboard generation: {str(e)}")
         print(f"Error in dashboard generation: {str(e)}")
+        return False
 
-def generate_reports(report):
+def generate_reports(report, db_path=None, output_dir='output'):
     """Generate reports"""
     logger.info(f"Generating reports ({report})...")
     
     try:
-        # In a real implementation, this would import and use the reporting module
-        # from src.reporting.generate_executive_reports import ExecutiveReportGenerator
-        # generator = ExecutiveReportGenerator()
-        # 
-        # if report == 'all':
-        #     results = generator.generate_all_reports()
-        #     success = all(results.values())
-        # else:
-        #     success = generator.generate_report(report)
+        from src.reporting.generate_executive_reports import ExecutiveReportGenerator
+        generator = ExecutiveReportGenerator(output_dir=os.path.join(output_dir, 'reports'), db_path=db_path)
         
-        # Simulate report generation
         print(f"Generating report(s): {report}...")
-        import time
-        time.sleep(2)  # Simulate processing time
-        success = True
+        if report == 'all':
+            results = generator.generate_all_reports()
+            success = all(results.values())
+        else:
+            success = bool(generator.generate_report(report))
         
         if success:
             logger.info("Report generation completed successfully.")
@@ -220,26 +239,151 @@ def generate_reports(report):
         else:
             logger.error("Report generation failed.")
             print("Report generation failed. Check logs for details.")
+        return success
     
     except Exception as e:
         logger.exception(f"Error in report generation: {str(e)}")
         print(f"Error in report generation: {str(e)}")
+        return False
+
+def run_pipeline(db_path, output_dir, etl_type=None, workers=4):
+    """Run ETL, cube refresh, dashboards and reports as one pipeline
+    
+    Items flow through independently, so each report is published as soon
+    as its own inputs are ready. Logs the extract-to-published-report
+    latency of every report and the timings of every stage.
+    """
+    logger.info(f"Starting BI pipeline (ETL: {etl_type or 'none'})...")
+    
+    # Fail before refreshing anything rather than skip every item behind an ETL task that cannot start
+    reason = etl_unavailable() if etl_type else None
+    if reason:
+        logger.error(f"ETL is unavailable: {reason}")
+        print(f"ETL is unavailable: {reason}")
+        return False
+    
+    try:
+        from src.pipeline.bi_pipeline import build_bi_pipeline, stage_timings
+        
+        orchestrator, _ = build_bi_pipeline(db_path, output_dir, etl_type=etl_type, max_workers=workers)
+        results = orchestrator.run()
+        
+        for stage, timing in stage_timings(orchestrator).items():
+            logger.info(f"Stage {stage}: {timing['succeeded']}/{timing['tasks']} tasks succeeded, "
+                        f"busy {timing['busy_ms']:.0f}ms, span {timing['span_ms']:.0f}ms")
+        
+        for name, result in results.items():
+            if result['stage'] != 'report':
+                continue
+            latency = orchestrator.end_to_end_latency(name)
+            if latency is None:
+                logger.error(f"{name}: {result['status']} ({result['error'] or 'no output'})")
+                print(f"{name}: {result['status']}")
+            else:
+                logger.info(f"{name}: published {result['result']} {latency * 1000:.0f}ms after pipeline start")
+                print(f"{name}: published in {latency:.2f}s")
+        
+        success = all(result['status'] == 'succeeded' for result in results.values())
+        if success:
+            logger.info("BI pipeline completed successfully.")
+            print("BI pipeline completed successfully.")
+        else:
+            logger.error("BI pipeline failed.")
+            print("BI pipeline failed. Check logs for details.")
+        return success
+    
+    except Exception as e:
+        logger.exception(f"Error in BI pipeline: {str(e)}")
+        print(f"Error in BI pipeline: {str(e)}")
+        return False
+
+def publish_extracts(db_path, output_dir='output'):
+    """Publish the Tableau and Power BI workbook extracts, refreshing them incrementally"""
+    logger.info("Publishing workbook extracts...")
+    
+    try:
+        from src.extracts.extract_publisher import ExtractPublisher
+        publisher = ExtractPublisher(db_path, output_dir=os.path.join(output_dir, 'extracts'))
+        
+        print("Publishing workbook extracts...")
+        results = publisher.publish_all_extracts()
+        success = all(results.values())
+        
+        if success:
+            logger.info("Extract publishing completed successfully.")
+            print("Extract publishing completed successfully.")
+        else:
+            logger.error("Extract publishing failed.")
+            print("Extract publishing failed. Check logs for details.")
+        return success
+    
+    except Exception as e:
+        logger.exception(f"Error publishing extracts: {str(e)}")
+        print(f"Error publishing extracts: {str(e)}")
+        return False
+
+def check_kpis(kpi_id=None, db_path=':memory:'):
+    """Calculate one KPI, or all of them, and print its value and status"""
+    try:
+        from src.kpi.kpi_monitor import KPIMonitor
+        from src.semantic.semantic_layer import DEFAULT_CACHE_DIR, SemanticLayer
+        monitor = KPIMonitor(db_path=db_path, semantic_layer=SemanticLayer(cache_dir=DEFAULT_CACHE_DIR))
+        
+        try:
+            if kpi_id:
+                results = {kpi_id: monitor.calculate_kpi(kpi_id)}
+            else:
+                results = monitor.calculate_all_kpis()
+        finally:
+            monitor.close()
+        
+        success = True
+        for kpi, result in results.items():
+            if result:
+                print(f"{result['name']}: {result['value']} ({result['status']})")
+            else:
+                print(f"Error calculating KPI: {kpi}")
+                success = False
+        return success
+    
+    except Exception as e:
+        logger.exception(f"Error checking KPIs: {str(e)}")
+        print(f"Error checking KPIs: {str(e)}")
+        return False
+
+def run_service(db_path, output_dir, host, port, max_concurrency):
+    """Keep the platform warm and serve KPI, cube and report requests until interrupted"""
+    from src.bi_platform import BusinessIntelligencePlatform
+    from src.service.api_server import BIService
+    
+    platform = BusinessIntelligencePlatform(db_path=db_path, output_dir=output_dir)
+    platform.start()
+    try:
+        BIService(platform, host=host, port=port, max_concurrency=max_concurrency).run()
+    finally:
+        platform.close()
 
 def main():
     """Main function"""
-    logger.info("Starting Business Intelligence Platform")
-    
     args = parse_arguments()
     
-    # Create platform instance
-    platform = BusinessIntelligencePlatform()
+    configure_logging()
+    logger.info(f"Starting Business Intelligence Platform ({args.mode} mode)")
     
     # Create output directory if it doesn't exist
     os.makedirs(args.output_dir, exist_ok=True)
     
-    # Run in specified mode
+    if args.profile:
+        from src.telemetry.profiling import profile_run
+        with profile_run(os.path.join(args.output_dir, 'profile')):
+            run_mode(args)
+    else:
+        run_mode(args)
+
+def run_mode(args):
+    """Run the platform in the mode selected on the command line"""
     if args.mode == 'interactive':
-        run_interactive_mode()
+        run_interactive_mode(args.db, args.output_dir)
     elif args.mode == 'etl':
         if args.etl:
             run_etl_process(args.etl)
@@ -248,22 +392,45 @@ def main():
             sys.exit(1)
     elif args.mode == 'olap':
         if args.cube:
-            process_olap_cubes(args.cube)
+            process_olap_cubes(args.cube, args.db or ':memory:')
         else:
             logger.error("Cube must be specified with --cube")
             sys.exit(1)
     elif args.mode == 'dashboard':
         if args.dashboard:
-            generate_dashboards(args.dashboard)
+            generate_dashboards(args.dashboard, args.db or ':memory:', args.output_dir)
         else:
             logger.error("Dashboard must be specified with --dashboard")
             sys.exit(1)
     elif args.mode == 'report':
         if args.report:
-            generate_reports(args.report)
+            generate_reports(args.report, args.db, args.output_dir)
         else:
             logger.error("Report must be specified with --report")
             sys.exit(1)
+    elif args.mode == 'pipeline':
+        if args.db:
+            success = run_pipeline(args.db, args.output_dir, args.etl, args.workers)
+            sys.exit(0 if success else 1)
+        else:
+            logger.error("Data warehouse must be specified with --db")
+            sys.exit(1)
+    elif args.mode == 'serve':
+        if args.db:
+            run_service(args.db, args.output_dir, args.host, args.port, args.max_concurrency)
+        else:
+            logger.error("Data warehouse must be specified with --db")
+            sys.exit(1)
+    elif args.mode == 'extract':
+        if args.db:
+            success = publish_extracts(args.db, args.output_dir)
+            sys.exit(0 if success else 1)
+        else:
+            logger.error("Data warehouse must be specified with --db")
+            sys.exit(1)
+    elif args.mode == 'kpi':
+        success = check_kpis(args.kpi, args.db or ':memory:')
+        sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""OLAP Cube Query Result Cache"""
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(cube_id, measures, dimensions=None, filters=None, exact=False):
+    """Build a hashable cache key that ignores measure, dimension and filter ordering"""
+    normalized_filters = []
+    for level, values in (filters or {}).items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        normalized_filters.append((level, tuple(sorted(values, key=str))))
+
+    return (
+        cube_id,
+        tuple(sorted(measures)),
+        tuple(sorted(dimensions or [])),
+        tuple(sorted(normalized_filters)),
+        exact
+    )
+
+
+class CubeResultCache:
+    """Bounded LRU cache for cube query results"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return a cached result or None, updating hit/miss counters"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a result, evicting the least recently used entries if full"""
+        if self.max_entries <= 0:
+            return
+
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key matches the predicate"""
+        stale_keys = [key for key in self.entries if predicate(key)]
+
+        for key in stale_keys:
+            del self.entries[key]
+
+        self.invalidations += len(stale_keys)
+        return len(stale_keys)
+
+    def clear(self):
+        """Drop all entries"""
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def stats(self):
+        """Return cache counters for sizing"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Persistent, memory-mapped OLAP cube files
+
+Layout of a cube directory (the cube's configured 'path'):
+
+    CURRENT                 name of the active version, replaced atomically
+    v00000001/
+        manifest.json       format version, partitions, fingerprints, views
+        columns/<i>.npy     one array per manifest column, rows sorted by partition
+        dictionaries.json   sorted members of dictionary-encoded (string) columns
+        views/<n>/<i>.npy   precomputed aggregate views
+
+Arrays are opened with numpy memory mapping, so opening a cube only reads
+the manifest and worker processes share the page cache.
+"""
+import json
+import logging
+import os
+import shutil
+from collections.abc import Mapping
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CURRENT_FILE = 'CURRENT'
+
+
+def read_current_version(directory):
+    """Return the name of the active version of a cube directory, or None"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def current_version_stamp(directory):
+    """Return an identity of the CURRENT pointer file that changes whenever it is replaced, or None"""
+    try:
+        stat = os.stat(os.path.join(directory, CURRENT_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def write_cube_version(directory, cube_id, state, keep_versions=2):
+    """Write the cube state as a new version and atomically make it current"""
+    os.makedirs(directory, exist_ok=True)
+    current = read_current_version(directory)
+    version = f"v{(int(current[1:]) + 1) if current else 1:08d}"
+    staging_dir = os.path.join(directory, f".{version}.tmp-{os.getpid()}")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+
+    partitions = state['partitions']
+    ordered = sorted(partitions)
+    frames = [partitions[partition] for partition in ordered]
+    data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=state['columns'])
+
+    ranges = {}
+    offset = 0
+    for partition, frame in zip(ordered, frames):
+        ranges[str(partition)] = [offset, offset + len(frame)]
+        offset += len(frame)
+
+    dictionaries = {}
+    _write_columns(os.path.join(staging_dir, 'columns'), data[state['columns']], dictionaries, 'columns')
+
+    views = []
+    for index, (view, frame) in enumerate(state['views'].items()):
+        view_dir = os.path.join(staging_dir, 'views', str(index))
+        _write_columns(view_dir, frame, dictionaries, f"views/{index}")
+        views.append({'depths': list(view), 'rows': len(frame), 'columns': list(frame.columns)})
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'cube_id': cube_id,
+        'version': version,
+        'created_at': datetime.now().isoformat(),
+        'rows': len(data),
+        'columns': state['columns'],
+        'partitions': ranges,
+        'fingerprints': {str(p): list(fp) for p, fp in state['fingerprints'].items()},
+        'dimension_fingerprint': state['dimension_fingerprint'],
+        'selected_views': [list(view) for view in state['selected_views']],
+        'views': views
+    }
+    _write_json(os.path.join(staging_dir, 'dictionaries.json'), dictionaries)
+    _write_json(os.path.join(staging_dir, 'manifest.json'), manifest)
+
+    os.rename(staging_dir, os.path.join(directory, version))
+
+    pointer = os.path.join(directory, f".{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(pointer, 'w') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+
+    _prune_versions(directory, keep_versions)
+    logger.info(f"Wrote cube {cube_id} version {version} ({len(data)} rows) to {directory}")
+    return version
+
+
+def open_cube_version(directory, version=None):
+    """Open a cube version (the current one by default) as a cube state dict"""
+    version = version or read_current_version(directory)
+    if version is None:
+        return None
+
+    version_dir = os.path.join(directory, version)
+    with open(os.path.join(version_dir, 'manifest.json')) as f:
+        manifest = json.load(f)
+
+    if manifest['format_version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cube format version {manifest['format_version']} in {version_dir}")
+
+    with open(os.path.join(version_dir, 'dictionaries.json')) as f:
+        dictionaries = json.load(f)
+
+    columns = _open_columns(os.path.join(version_dir, 'columns'), manifest['columns'], dictionaries, 'columns')
+    ranges = {int(p): tuple(bounds) for p, bounds in manifest['partitions'].items()}
+
+    views = {}
+    for index, view in enumerate(manifest['views']):
+        view_columns = _open_columns(
+            os.path.join(version_dir, 'views', str(index)), view['columns'], dictionaries, f"views/{index}"
+        )
+        views[tuple(view['depths'])] = _frame_from_columns(view_columns, 0, view['rows'])
+
+    return {
+        'partitions': MappedPartitions(columns, ranges),
+        'fingerprints': {int(p): tuple(fp) for p, fp in manifest['fingerprints'].items()},
+        'dimension_fingerprint': manifest['dimension_fingerprint'],
+        'columns': manifest['columns'],
+        'selected_views': [tuple(view) for view in manifest['selected_views']],
+        'views': views,
+        'refreshed_at': datetime.fromisoformat(manifest['created_at']),
+        'version': version
+    }
+
+
+class MappedPartitions(Mapping):
+    """Read-only {partition: DataFrame} mapping backed by memory-mapped columns
+
+    Frames are only built for the partitions a query actually touches.
+    """
+
+    def __init__(self, columns, ranges):
+        self.columns = columns
+        self.ranges = ranges
+        self._frames = {}
+
+    def __getitem__(self, partition):
+        if partition not in self._frames:
+            start, stop = self.ranges[partition]
+            self._frames[partition] = _frame_from_columns(self.columns, start, stop)
+        return self._frames[partition]
+
+    def __iter__(self):
+        return iter(self.ranges)
+
+    def __len__(self):
+        return len(self.ranges)
+
+
+def _write_columns(directory, frame, dictionaries, prefix):
+    """Write each column as an .npy array, dictionary-encoding non-numeric ones"""
+    os.makedirs(directory, exist_ok=True)
+
+    for position, column in enumerate(frame.columns):
+        values = frame[column]
+        path = os.path.join(directory, f"{position}.npy")
+
+        if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(path, values.to_numpy())
+        else:
+            codes, members = pd.factorize(values, sort=True)
+            np.save(path, codes.astype(np.int32))
+            dictionaries[f"{prefix}/{column}"] = [
+                member.item() if hasattr(member, 'item') else member for member in members
+            ]
+
+
+def _open_columns(directory, names, dictionaries, prefix):
+    """Memory-map the column arrays written by _write_columns"""
+    columns = {}
+    for position, name in enumerate(names):
+        array = np.load(os.path.join(directory, f"{position}.npy"), mmap_mode='r')
+        columns[name] = (array, dictionaries.get(f"{prefix}/{name}"))
+    return columns
+
+
+def _frame_from_columns(columns, start, stop):
+    """Build a DataFrame over a row range of memory-mapped columns"""
+    data = {}
+    for name, (array, members) in columns.items():
+        if members is None:
+            data[name] = array[start:stop]
+        else:
+            data[name] = pd.Categorical.from_codes(np.asarray(array[start:stop]), categories=members)
+    return pd.DataFrame(data, copy=False)
+
+
+def _write_json(path, payload):
+    """Write a JSON file and flush it to disk"""
+    with open(path, 'w') as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _prune_versions(directory, keep_versions):
+    """Remove all but the most recent versions; open mappings stay valid after unlink"""
+    versions = sorted(name for name in os.listdir(directory) if name.startswith('v') and name[1:].isdigit())
+    for name in versions[:-keep_versions]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Greedy selection of aggregate views to materialize (Harinarayan-Rajaraman-Ullman)
+
+A view is a tuple of depths, one per cube hierarchy: depth 0 means the
+hierarchy is rolled up completely, depth n means the view groups by the
+first n levels of that hierarchy. A view answers every query whose depths
+are all less than or equal to its own.
+"""
+import itertools
+import math
+
+
+def build_lattice(max_depths):
+    """Return every view of the lattice for hierarchies with the given level counts"""
+    return list(itertools.product(*(range(depth + 1) for depth in max_depths)))
+
+
+def answers(view, query_view):
+    """Check whether a view can answer queries at another lattice point"""
+    return all(v >= q for v, q in zip(view, query_view))
+
+
+def estimate_view_size(view, level_cardinalities, base_rows):
+    """Estimate the number of rows of a view with Cardenas' formula
+
+    level_cardinalities holds, per hierarchy, the distinct member counts of
+    each level from coarsest to finest.
+    """
+    cells = 1
+    for depth, cardinalities in zip(view, level_cardinalities):
+        if depth:
+            cells *= max(cardinalities[depth - 1], 1)
+
+    if cells <= 1 or base_rows == 0:
+        return min(cells, base_rows) or 1
+
+    # Expected distinct cells hit when base_rows rows fall into cells buckets
+    return max(1, round(cells * -math.expm1(-base_rows / cells)))
+
+
+def view_cost(query_view, selected, sizes, base_rows):
+    """Rows scanned to answer a query from the cheapest selected view or the base data"""
+    cost = base_rows
+    for view in selected:
+        if sizes[view] < cost and answers(view, query_view):
+            cost = sizes[view]
+    return cost
+
+
+def select_views_greedy(sizes, base_rows, storage_budget, weights=None):
+    """Pick views by benefit per unit of space until the storage budget is spent
+
+    sizes maps each lattice view to its estimated row count, weights maps
+    query views to their frequency (uniform over the lattice when omitted).
+    Returns the chosen views in selection order with their benefit.
+    """
+    if weights is None:
+        weights = {view: 1 for view in sizes}
+
+    selected = []
+    chosen = []
+    remaining = storage_budget
+    costs = {query_view: base_rows for query_view in weights}
+
+    while True:
+        best = None
+        best_ratio = 0.0
+
+        for view, size in sizes.items():
+            if view in selected or size > remaining:
+                continue
+
+            benefit = sum(
+                weight * (costs[query_view] - size)
+                for query_view, weight in weights.items()
+                if costs[query_view] > size and answers(view, query_view)
+            )
+            ratio = benefit / size
+            if ratio > best_ratio:
+                best, best_ratio = view, ratio
+
+        if best is None:
+            break
+
+        size = sizes[best]
+        selected.append(best)
+        chosen.append({'view': best, 'estimated_rows': size, 'benefit': best_ratio * size})
+        remaining -= size
+
+        for query_view in costs:
+            if answers(best, query_view) and size < costs[query_view]:
+                costs[query_view] = size
+
+    return chosen
+
+
+def expected_speedup(weights, selected, sizes, base_rows):
+    """Ratio of rows scanned by the workload before and after materialization"""
+    total_weight = sum(weights.values())
+    if not total_weight:
+        return 1.0
+
+    before = base_rows * total_weight
+    after = sum(
+        weight * view_cost(query_view, selected, sizes, base_rows)
+        for query_view, weight in weights.items()
+    )
+    return before / after if after else 1.0
@@ -4,41 +4,146 @@ import argparse
 import logging
 import sys
 import os
+import hashlib
+import sqlite3
+import time
+from collections import Counter
 from datetime import datetime
 
+import pandas as pd
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.olap.cube_cache import CubeResultCache, normalize_query
+from src.olap.cube_storage import current_version_stamp, open_cube_version, read_current_version, write_cube_version
+from src.olap.sketches import create_sketch, merge_sketches
+from src.olap.materialization import (
+    answers, build_lattice, estimate_view_size, expected_speedup, select_views_greedy
+)
+from src.telemetry.instrumentation import current_span, increment, span, traced
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
+# Dimension hierarchies available to the cubes, ordered from coarsest to finest level.
+# The date hierarchy is derived from the fact DateKey (YYYYMMDD) so cubes do not
+# depend on DimDate being populated; Month (YYYYMM) is also the partition key.
+HIERARCHIES = {
+    'date': {
+        'levels': [
+            ('Year', 'f.DateKey / 10000'),
+            ('Quarter', '(f.DateKey / 10000) * 10 + ((f.DateKey / 100) % 100 + 2) / 3'),
+            ('Month', 'f.DateKey / 100'),
+            ('DateKey', 'f.DateKey')
+        ]
+    },
+    'product': {
+        'table': 'DimProduct',
+        'alias': 'p',
+        'key': 'ProductKey',
+        'levels': [
+            ('ProductCategory', 'p.ProductCategory'),
+            ('ProductSubcategory', 'p.ProductSubcategory'),
+            ('ProductName', 'p.ProductName')
+        ]
+    },
+    'customer': {
+        'table': 'DimCustomer',
+        'alias': 'c',
+        'key': 'CustomerKey',
+        'levels': [
+            ('Region', 'c.Region'),
+            ('Country', 'c.Country'),
+            ('City', 'c.City')
+        ]
+    },
+    'segment': {
+        'table': 'DimCustomer',
+        'alias': 'c',
+        'key': 'CustomerKey',
+        'levels': [
+            ('CustomerSegment', 'c.CustomerSegment')
+        ]
+    }
+}
+
+PARTITION_LEVEL = 'Month'
+
 class OLAPCubeManager:
     """OLAP Cube Manager for refreshing and managing OLAP cubes"""
     
-    def __init__(self):
+    def __init__(self, db_path=':memory:', cache_size=256, storage_dir=None):
+        self.db_path = db_path
+        # Root under which each cube's 'path' is persisted; None keeps cubes in memory only
+        self.storage_dir = storage_dir
+        # Usable from pipeline and service worker threads; callers serialize access
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.cache = CubeResultCache(max_entries=cache_size)
         self.cubes = {
             'sales': {
                 'name': 'Sales Analysis',
                 'path': '/ssas/Sales.cube',
-                'processing_type': 'full'
+                'processing_type': 'full',
+                'fact_table': 'FactSales',
+                'hierarchies': ['date', 'product', 'customer'],
+                'measures': ['SalesAmount', 'Quantity', 'Profit'],
+                'storage_budget': 100000
             },
             'inventory': {
                 'name': 'Inventory Analysis',
                 'path': '/ssas/Inventory.cube',
-                'processing_type': 'incremental'
+                'processing_type': 'incremental',
+                'fact_table': 'FactInventory',
+                'hierarchies': ['date', 'product'],
+                'measures': ['QuantityOnHand', 'QuantityOnOrder'],
+                'storage_budget': 100000
             },
             'finance': {
                 'name': 'Financial Analysis',
                 'path': '/ssas/Finance.cube',
-                'processing_type': 'full'
+                'processing_type': 'full',
+                'fact_table': 'FactSales',
+                'hierarchies': ['date', 'product'],
+                'measures': ['SalesAmount', 'Profit', 'Discount'],
+                'storage_budget': 100000
             },
             'customer': {
                 'name': 'Customer Analysis',
                 'path': '/ssas/Customer.cube',
-                'processing_type': 'incremental'
+                'processing_type': 'incremental',
+                'fact_table': 'FactSales',
+                'hierarchies': ['date', 'customer', 'segment'],
+                'measures': ['SalesAmount', 'Quantity'],
+                'storage_budget': 100000,
+                # Non-additive measures kept as mergeable sketches per cell of sketch_grain
+                'sketch_measures': {
+                    'DistinctCustomers': {
+                        'type': 'distinct',
+                        'column': 'CustomerKey',
+                        'relative_error': 0.02
+                    },
+                    'SpendPercentiles': {
+                        'type': 'quantile',
+                        'column': 'SalesAmount',
+                        'rank_error': 0.01,
+                        'quantiles': [0.25, 0.5, 0.75, 0.9, 0.99]
+                    }
+                },
+                'sketch_grain': ['Month', 'Region', 'CustomerSegment']
             }
         }
+        # Processed cube data: partitions (Month -> DataFrame) and their fingerprints
+        self._cube_state = {}
+        # Stat identity of each cube's CURRENT pointer when it was last read
+        self._current_stamps = {}
+        # Recorded query workload per cube: lattice view -> number of queries
+        self._workload = {}
     
+    @traced('olap.refresh_cube', cube='cube_id')
     def refresh_cube(self, cube_id, force_full=False):
         """Refresh a specific OLAP cube"""
         if cube_id not in self.cubes:
@@ -51,15 +156,68 @@ class OLAPCubeManager:
         logger.info(f"Refreshing cube: {cube['name']} ({processing_type} processing)")
         
         try:
-            # In a real implementation, this would use ADOMD.NET or similar
-            # to connect to SSAS and process the cube
             logger.info(f"Processing {cube['path']} with {processing_type} processing")
             
-            # Simulate processing time
-            import time
-            time.sleep(2)
+            state = self._cube_state.get(cube_id)
+            fingerprints = self._partition_fingerprints(cube)
+            dimension_fingerprint = self._dimension_fingerprint(cube)
+            dimensions_changed = state is None or state['dimension_fingerprint'] != dimension_fingerprint
+            previous_fingerprints = state['fingerprints'] if state else {}
+            
+            # Partitions whose contents differ from the last refresh (added, removed or modified)
+            if dimensions_changed:
+                changed = set(fingerprints) | set(previous_fingerprints)
+            else:
+                changed = {
+                    partition for partition in set(fingerprints) | set(previous_fingerprints)
+                    if fingerprints.get(partition) != previous_fingerprints.get(partition)
+                }
+            
+            if processing_type == 'full' or dimensions_changed:
+                partitions = {}
+                to_load = set(fingerprints)
+            else:
+                partitions = {
+                    partition: frame for partition, frame in state['partitions'].items()
+                    if partition in fingerprints and partition not in changed
+                }
+                to_load = changed & set(fingerprints)
+            
+            if to_load:
+                frame = self._load_partitions(cube, sorted(to_load))
+                current_span().add('rows', len(frame))
+                current_span().add('partitions', len(to_load))
+                for partition, partition_frame in frame.groupby(PARTITION_LEVEL, sort=False):
+                    partitions[int(partition)] = partition_frame.reset_index(drop=True)
             
-            logger.info(f"Cube {cube['name']} refreshed successfully")
+            selected_views = state['selected_views'] if state else []
+            sketches = {
+                partition: cells for partition, cells in (state or {}).get('sketches', {}).items()
+                if partition not in changed
+            }
+            self._cube_state[cube_id] = {
+                'partitions': partitions,
+                'fingerprints': fingerprints,
+                'dimension_fingerprint': dimension_fingerprint,
+                'columns': self._cube_levels(cube) + self._source_columns(cube),
+                'selected_views': selected_views,
+                'sketches': sketches,
+                'views': state['views'] if state and not changed else {},
+                'refreshed_at': datetime.now(),
+                'version': state.get('version') if state and not changed else None
+            }
+            
+            if selected_views and changed:
+                self._build_views(cube_id)
+            
+            if self.storage_dir and self._cube_state[cube_id]['version'] is None:
+                self._persist_cube(cube_id)
+            
+            invalidated = self._invalidate_cached_results(cube_id, changed)
+            
+            logger.info(f"Cube {cube['name']} refreshed successfully "
+                        f"({len(to_load)} partitions loaded, {len(changed)} changed, "
+                        f"{invalidated} cached results invalidated)")
             
             # Update last refresh time
             self._update_refresh_metadata(cube_id, processing_type)
@@ -84,6 +242,580 @@ class OLAPCubeManager:
         
         return all(results.values())
     
+    def query(self, cube_id, measures, dimensions=None, filters=None, exact=False):
+        """Aggregate cube measures grouped by dimension levels
+        
+        filters maps a level name to a member or list of members, e.g.
+        {'Year': 2024, 'Region': ['Europe', 'Asia']}. Results are served from
+        the LRU result cache when the same normalized query was seen before.
+        
+        Sketch measures (e.g. DistinctCustomers) are estimated by merging the
+        per-cell sketches; quantile sketches return one column per configured
+        quantile (SpendPercentiles_p50, ...). exact=True computes them from
+        the base data instead, for validation.
+        """
+        if cube_id not in self.cubes:
+            logger.error(f"Cube {cube_id} not found")
+            return None
+        
+        if self.storage_dir:
+            self.open_cube(cube_id)
+        
+        if cube_id not in self._cube_state:
+            logger.error(f"Cube {cube_id} has not been refreshed")
+            return None
+        
+        cube = self.cubes[cube_id]
+        dimensions = list(dimensions or [])
+        filters = filters or {}
+        levels = self._cube_levels(cube)
+        
+        sketch_measures = cube.get('sketch_measures', {})
+        unknown = [m for m in measures if m not in cube['measures'] and m not in sketch_measures]
+        unknown += [level for level in list(dimensions) + list(filters) if level not in levels]
+        if unknown:
+            logger.error(f"Unknown measures or levels for cube {cube_id}: {', '.join(unknown)}")
+            return None
+        
+        if any(m in sketch_measures for m in measures) and not exact and not answers(
+            self._query_view(cube, cube['sketch_grain']), self._query_view(cube, dimensions + list(filters))
+        ):
+            logger.error(f"Sketch measures of cube {cube_id} are only kept down to "
+                         f"{', '.join(cube['sketch_grain'])}")
+            return None
+        
+        self._workload.setdefault(cube_id, Counter())[
+            self._query_view(cube, dimensions + list(filters))
+        ] += 1
+        
+        key = normalize_query(cube_id, measures, dimensions, filters, exact)
+        result = self.cache.get(key)
+        increment('olap.query_cache', result='miss' if result is None else 'hit', cube=cube_id)
+        
+        if result is None:
+            with span('olap.query', cube=cube_id) as timing:
+                result = self._execute_query(cube_id, key)
+                timing.add('rows', len(result))
+            self.cache.put(key, result)
+        
+        return result[dimensions + self._measure_columns(cube, measures)].copy()
+    
+    def drill_down(self, cube_id, query, hierarchy, member=None):
+        """Return a query one level further down the hierarchy
+        
+        If member is given, the current level is sliced to that member
+        (e.g. drill from Year into the quarters of 2024).
+        """
+        levels = self._hierarchy_levels(cube_id, hierarchy)
+        dimensions = list(query.get('dimensions') or [])
+        filters = dict(query.get('filters') or {})
+        current = [level for level in dimensions if level in levels]
+        
+        if not current:
+            dimensions.append(levels[0])
+        else:
+            position = levels.index(current[-1])
+            if position + 1 >= len(levels):
+                logger.warning(f"{current[-1]} is already the lowest level of {hierarchy}")
+            else:
+                if member is not None:
+                    filters[current[-1]] = member
+                dimensions[dimensions.index(current[-1])] = levels[position + 1]
+        
+        return {'measures': list(query['measures']), 'dimensions': dimensions, 'filters': filters}
+    
+    def roll_up(self, cube_id, query, hierarchy):
+        """Return a query one level further up the hierarchy"""
+        levels = self._hierarchy_levels(cube_id, hierarchy)
+        dimensions = list(query.get('dimensions') or [])
+        filters = dict(query.get('filters') or {})
+        current = [level for level in dimensions if level in levels]
+        
+        if current:
+            position = levels.index(current[-1])
+            if position == 0:
+                dimensions.remove(current[-1])
+            else:
+                parent = levels[position - 1]
+                dimensions[dimensions.index(current[-1])] = parent
+                filters.pop(parent, None)
+        
+        return {'measures': list(query['measures']), 'dimensions': dimensions, 'filters': filters}
+    
+    def materialize_views(self, cube_id, storage_budget=None, use_workload=True):
+        """Materialize the aggregate views with the best benefit per row of storage
+        
+        Views are chosen greedily from the cube's dimension lattice (HRU) using
+        estimated view sizes and, if available, the recorded query workload.
+        storage_budget is expressed in rows and defaults to the cube's
+        'storage_budget'. Returns a report with the chosen views and the
+        expected vs. measured speedup of the workload.
+        """
+        if cube_id not in self.cubes:
+            logger.error(f"Cube {cube_id} not found")
+            return None
+        
+        if cube_id not in self._cube_state:
+            logger.error(f"Cube {cube_id} has not been refreshed")
+            return None
+        
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        if storage_budget is None:
+            storage_budget = cube['storage_budget']
+        
+        base = self._base_frame(state)
+        base_rows = len(base)
+        hierarchy_levels = [self._hierarchy_levels(cube_id, h) for h in cube['hierarchies']]
+        cardinalities = [
+            [base[level].nunique(dropna=False) for level in levels]
+            for levels in hierarchy_levels
+        ]
+        lattice = build_lattice([len(levels) for levels in hierarchy_levels])
+        sizes = {view: estimate_view_size(view, cardinalities, base_rows) for view in lattice}
+        
+        workload = self._workload.get(cube_id)
+        weights = dict(workload) if use_workload and workload else None
+        
+        chosen = select_views_greedy(sizes, base_rows, storage_budget, weights)
+        state['selected_views'] = [choice['view'] for choice in chosen]
+        self._build_views(cube_id)
+        if self.storage_dir:
+            self._persist_cube(cube_id)
+        
+        if weights is None:
+            weights = {view: 1 for view in lattice}
+        
+        report = {
+            'cube_id': cube_id,
+            'storage_budget': storage_budget,
+            'base_rows': base_rows,
+            'workload_queries': sum(workload.values()) if use_workload and workload else 0,
+            'views': [
+                {
+                    'levels': self._view_name(cube, choice['view']),
+                    'estimated_rows': choice['estimated_rows'],
+                    'actual_rows': len(state['views'][choice['view']]),
+                    'benefit': choice['benefit']
+                }
+                for choice in chosen
+            ],
+            'storage_used': sum(len(frame) for frame in state['views'].values()),
+            'expected_speedup': expected_speedup(weights, state['selected_views'], sizes, base_rows),
+            'measured_speedup': self._measure_speedup(cube_id, weights)
+        }
+        
+        logger.info(f"Materialized {len(chosen)} views for {cube['name']} "
+                    f"({report['storage_used']}/{storage_budget} rows): "
+                    f"expected speedup {report['expected_speedup']:.1f}x, "
+                    f"measured {report['measured_speedup']:.1f}x")
+        
+        return report
+    
+    def open_cube(self, cube_id):
+        """Open the current on-disk version of a cube, switching if a newer one was written
+        
+        Only the manifest is read; column arrays are memory mapped and paged
+        in on demand. Cached results are invalidated for the partitions that
+        differ from the previously open version. The CURRENT pointer is only
+        re-read when its file has been replaced since the last call.
+        """
+        if not self.storage_dir:
+            logger.error("No storage directory configured for cube files")
+            return False
+        
+        directory = self._cube_directory(self.cubes[cube_id])
+        stamp = current_version_stamp(directory)
+        state = self._cube_state.get(cube_id)
+        
+        if state and stamp is not None and self._current_stamps.get(cube_id) == stamp:
+            return True
+        
+        version = read_current_version(directory)
+        if version is None:
+            return state is not None
+        if state and state.get('version') == version:
+            self._current_stamps[cube_id] = stamp
+            return True
+        
+        try:
+            new_state = open_cube_version(directory, version)
+        except Exception as e:
+            logger.error(f"Error opening cube {cube_id} version {version}: {str(e)}")
+            return False
+        
+        if state is None or state['dimension_fingerprint'] != new_state['dimension_fingerprint']:
+            changed = set(new_state['fingerprints']) | set(state['fingerprints'] if state else {})
+        else:
+            changed = {
+                partition for partition in set(new_state['fingerprints']) | set(state['fingerprints'])
+                if new_state['fingerprints'].get(partition) != state['fingerprints'].get(partition)
+            }
+        
+        self._cube_state[cube_id] = new_state
+        self._current_stamps[cube_id] = stamp
+        self._invalidate_cached_results(cube_id, changed)
+        logger.info(f"Opened cube {cube_id} version {version}")
+        return True
+    
+    def source_tables(self, cube_id):
+        """Return the warehouse tables a cube is built from, fact table first"""
+        cube = self.cubes[cube_id]
+        return [cube['fact_table']] + list(dict.fromkeys(
+            definition['table'] for definition in self._dimension_tables(cube).values()
+        ))
+    
+    def cache_stats(self):
+        """Return query result cache counters"""
+        return self.cache.stats()
+    
+    def _execute_query(self, cube_id, key):
+        """Scan the partitions matching the query filters and aggregate"""
+        _, measures, dimensions, filters, exact = key
+        filters = dict(filters)
+        dimensions = list(dimensions)
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        additive = [m for m in measures if m in cube['measures']]
+        sketched = [m for m in measures if m not in cube['measures']]
+        results = []
+        
+        if additive:
+            data = self._best_view(state, self._query_view(cube, dimensions + list(filters)))
+            if data is None:
+                data = self._base_frame(state, filters)
+            
+            for level, members in filters.items():
+                data = data[data[level].isin(members)]
+            
+            results.append(self._aggregate(data, dimensions, additive))
+        
+        if sketched and exact:
+            results.append(self._exact_sketch_measures(cube, state, sketched, dimensions, filters))
+        elif sketched:
+            results.append(self._estimate_sketch_measures(cube_id, sketched, dimensions, filters))
+        
+        result = results[0]
+        for other in results[1:]:
+            if dimensions:
+                result = result.merge(other, on=dimensions, how='outer')
+            else:
+                result = pd.concat([result, other], axis=1)
+        return result
+    
+    def _estimate_sketch_measures(self, cube_id, measures, dimensions, filters):
+        """Roll up per-cell sketches to the requested levels and read their estimates"""
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        cells = self._sketch_cells(cube_id, filters)
+        
+        for level, members in filters.items():
+            cells = cells[cells[level].isin(members)]
+        
+        if dimensions:
+            groups = cells.groupby(dimensions, sort=True, dropna=False, observed=True)
+        else:
+            groups = [((), cells)]
+        
+        rows = []
+        for keys, group in groups:
+            row = dict(zip(dimensions, keys if isinstance(keys, tuple) else (keys,)))
+            for measure in measures:
+                spec = cube['sketch_measures'][measure]
+                sketch = merge_sketches(group[measure]) or create_sketch(spec)
+                if spec['type'] == 'distinct':
+                    row[measure] = sketch.estimate()
+                else:
+                    row.update(zip(self._measure_columns(cube, [measure]), sketch.quantiles(spec['quantiles'])))
+            rows.append(row)
+        
+        return pd.DataFrame(rows, columns=dimensions + self._measure_columns(cube, measures))
+    
+    def _exact_sketch_measures(self, cube, state, measures, dimensions, filters):
+        """Compute sketch measures exactly from the base data"""
+        data = self._base_frame(state, filters)
+        for level, members in filters.items():
+            data = data[data[level].isin(members)]
+        
+        grouped = data.groupby(dimensions, sort=True, dropna=False, observed=True) if dimensions else None
+        columns = {}
+        for measure in measures:
+            spec = cube['sketch_measures'][measure]
+            values = grouped[spec['column']] if grouped is not None else data[spec['column']]
+            if spec['type'] == 'distinct':
+                columns[measure] = values.nunique()
+            else:
+                quantiles = values.quantile(spec['quantiles'])
+                if grouped is not None:
+                    quantiles = quantiles.unstack()
+                for name, fraction in zip(self._measure_columns(cube, [measure]), spec['quantiles']):
+                    columns[name] = quantiles[fraction]
+        
+        if grouped is not None:
+            return pd.DataFrame(columns).reset_index()
+        return pd.DataFrame({name: [value] for name, value in columns.items()})
+    
+    def _sketch_cells(self, cube_id, filters):
+        """Return the sketch cells of the partitions matching the filters, building missing ones"""
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        sketches = state.setdefault('sketches', {})
+        grain_levels = self._view_levels(cube, self._query_view(cube, cube['sketch_grain']))
+        frames = []
+        
+        for partition in state['partitions']:
+            if not self._partition_matches(partition, filters):
+                continue
+            
+            if partition not in sketches:
+                rows = []
+                data = state['partitions'][partition]
+                for keys, group in data.groupby(grain_levels, sort=False, dropna=False, observed=True):
+                    row = dict(zip(grain_levels, keys))
+                    for measure, spec in cube['sketch_measures'].items():
+                        row[measure] = create_sketch(spec)
+                        row[measure].update(group[spec['column']].to_numpy())
+                    rows.append(row)
+                sketches[partition] = pd.DataFrame(rows, columns=grain_levels + list(cube['sketch_measures']))
+            
+            frames.append(sketches[partition])
+        
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        return pd.DataFrame(columns=grain_levels + list(cube['sketch_measures']))
+    
+    def _measure_columns(self, cube, measures):
+        """Expand quantile sketch measures into one result column per quantile"""
+        columns = []
+        for measure in measures:
+            spec = cube.get('sketch_measures', {}).get(measure)
+            if spec and spec['type'] == 'quantile':
+                columns += [f"{measure}_p{fraction * 100:g}" for fraction in spec['quantiles']]
+            else:
+                columns.append(measure)
+        return columns
+    
+    def _source_columns(self, cube):
+        """Return the fact columns loaded into the cube: measures plus sketch inputs"""
+        columns = list(cube['measures'])
+        for spec in cube.get('sketch_measures', {}).values():
+            if spec['column'] not in columns:
+                columns.append(spec['column'])
+        return columns
+    
+    def _aggregate(self, data, levels, measures):
+        """Sum measures grouped by the given levels"""
+        if levels:
+            return data.groupby(levels, sort=True, dropna=False, observed=True)[measures].sum().reset_index()
+        
+        return data[measures].sum().to_frame().T.reset_index(drop=True)
+    
+    def _base_frame(self, state, filters=None):
+        """Concatenate the partitions that can hold rows passing the date filters"""
+        partitions = state['partitions']
+        frames = [
+            partitions[partition] for partition in partitions
+            if not filters or self._partition_matches(partition, filters)
+        ]
+        if frames:
+            return pd.concat(frames, ignore_index=True)
+        
+        return pd.DataFrame(columns=state['columns'])
+    
+    def _build_views(self, cube_id):
+        """(Re)build the selected aggregate views, finest first so coarser views reuse them"""
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        base = self._base_frame(state)
+        views = {}
+        
+        for view in sorted(state['selected_views'], key=sum, reverse=True):
+            source = min(
+                (frame for built, frame in views.items() if answers(built, view)),
+                key=len, default=base
+            )
+            views[view] = self._aggregate(source, self._view_levels(cube, view), cube['measures'])
+        
+        state['views'] = views
+    
+    def _best_view(self, state, query_view):
+        """Return the smallest materialized view able to answer a query, if any"""
+        candidates = [
+            frame for view, frame in state['views'].items() if answers(view, query_view)
+        ]
+        return min(candidates, key=len) if candidates else None
+    
+    def _measure_speedup(self, cube_id, weights):
+        """Time the workload against the base data and against the materialized views"""
+        cube = self.cubes[cube_id]
+        state = self._cube_state[cube_id]
+        base = self._base_frame(state)
+        base_time = view_time = 0.0
+        
+        for query_view, weight in weights.items():
+            levels = self._view_levels(cube, query_view)
+            
+            start = time.perf_counter()
+            self._aggregate(base, levels, cube['measures'])
+            base_time += weight * (time.perf_counter() - start)
+            
+            source = self._best_view(state, query_view)
+            start = time.perf_counter()
+            self._aggregate(base if source is None else source, levels, cube['measures'])
+            view_time += weight * (time.perf_counter() - start)
+        
+        return base_time / view_time if view_time else 1.0
+    
+    def _query_view(self, cube, levels):
+        """Return the lattice point (depth per hierarchy) needed to evaluate the given levels"""
+        depths = []
+        for hierarchy in cube['hierarchies']:
+            hierarchy_levels = [level for level, _ in HIERARCHIES[hierarchy]['levels']]
+            used = [hierarchy_levels.index(level) + 1 for level in levels if level in hierarchy_levels]
+            depths.append(max(used, default=0))
+        return tuple(depths)
+    
+    def _view_levels(self, cube, view):
+        """Return the level columns grouped by a lattice view"""
+        return [
+            level
+            for hierarchy, depth in zip(cube['hierarchies'], view)
+            for level, _ in HIERARCHIES[hierarchy]['levels'][:depth]
+        ]
+    
+    def _view_name(self, cube, view):
+        """Describe a lattice view by its finest level per hierarchy"""
+        names = [
+            HIERARCHIES[hierarchy]['levels'][depth - 1][0]
+            for hierarchy, depth in zip(cube['hierarchies'], view) if depth
+        ]
+        return ' x '.join(names) or 'ALL'
+    
+    def _persist_cube(self, cube_id):
+        """Write the cube state as a new on-disk version"""
+        state = self._cube_state[cube_id]
+        state['version'] = write_cube_version(
+            self._cube_directory(self.cubes[cube_id]), cube_id, state
+        )
+    
+    def _cube_directory(self, cube):
+        """Resolve the cube's configured path under the storage directory"""
+        return os.path.join(self.storage_dir, cube['path'].lstrip('/'))
+    
+    def _invalidate_cached_results(self, cube_id, changed_partitions):
+        """Drop cached results of this cube that read any changed partition"""
+        if not changed_partitions:
+            return 0
+        
+        return self.cache.invalidate(
+            lambda key: key[0] == cube_id and any(
+                self._partition_matches(partition, dict(key[3])) for partition in changed_partitions
+            )
+        )
+    
+    def _partition_matches(self, partition, filters):
+        """Check whether a Month partition can hold rows passing the date filters"""
+        year = partition // 100
+        derived = {
+            'Year': year,
+            'Quarter': year * 10 + (partition % 100 + 2) // 3,
+            'Month': partition
+        }
+        
+        for level, members in filters.items():
+            if level == 'DateKey':
+                if not any(int(member) // 100 == partition for member in members):
+                    return False
+            elif level in derived and derived[level] not in members:
+                return False
+        
+        return True
+    
+    def _hierarchy_levels(self, cube_id, hierarchy):
+        """Return the level names of a hierarchy used by a cube"""
+        if hierarchy not in self.cubes[cube_id]['hierarchies']:
+            raise ValueError(f"Hierarchy {hierarchy} is not part of cube {cube_id}")
+        
+        return [level for level, _ in HIERARCHIES[hierarchy]['levels']]
+    
+    def _cube_levels(self, cube):
+        """Return all dimension level columns of a cube"""
+        return [
+            level for hierarchy in cube['hierarchies']
+            for level, _ in HIERARCHIES[hierarchy]['levels']
+        ]
+    
+    def _dimension_tables(self, cube):
+        """Return {alias: hierarchy definition} for the dimension tables joined by a cube"""
+        tables = {}
+        for hierarchy in cube['hierarchies']:
+            definition = HIERARCHIES[hierarchy]
+            if 'table' in definition:
+                tables.setdefault(definition['alias'], definition)
+        return tables
+    
+    def _build_source_query(self, cube, partitions=None):
+        """Build the star-join query feeding the cube"""
+        columns = [
+            f"{expression} AS {level}"
+            for hierarchy in cube['hierarchies']
+            for level, expression in HIERARCHIES[hierarchy]['levels']
+        ]
+        columns += [f"f.{column} AS {column}" for column in self._source_columns(cube)]
+        
+        query = f"SELECT {', '.join(columns)} FROM {cube['fact_table']} f"
+        for alias, definition in self._dimension_tables(cube).items():
+            query += (f" LEFT JOIN {definition['table']} {alias}"
+                      f" ON {alias}.{definition['key']} = f.{definition['key']}")
+        
+        params = []
+        if partitions is not None:
+            query += f" WHERE f.DateKey / 100 IN ({', '.join('?' * len(partitions))})"
+            params = list(partitions)
+        
+        return query, params
+    
+    def _load_partitions(self, cube, partitions):
+        """Load the given Month partitions from the warehouse"""
+        frames = []
+        # Stay well below SQLite's host parameter limit
+        for start in range(0, len(partitions), 500):
+            query, params = self._build_source_query(cube, partitions[start:start + 500])
+            frames.append(pd.read_sql_query(query, self.conn, params=params))
+        
+        return pd.concat(frames, ignore_index=True)
+    
+    def _partition_fingerprints(self, cube):
+        """Return {Month: fingerprint} summarizing the fact rows of each partition
+        
+        Besides the measures, the foreign keys are summed plain and weighted
+        by rowid, so a correction that only moves a row to another member
+        changes the fingerprint.
+        """
+        sums = ', '.join(f"TOTAL(f.{measure})" for measure in cube['measures'])
+        keys = ['DateKey'] + [definition['key'] for definition in self._dimension_tables(cube).values()]
+        key_sums = ', '.join(f"TOTAL(f.{key}), TOTAL(f.rowid * f.{key})" for key in dict.fromkeys(keys))
+        query = (f"SELECT f.DateKey / 100, COUNT(*), TOTAL(f.rowid), {sums}, {key_sums} "
+                 f"FROM {cube['fact_table']} f GROUP BY f.DateKey / 100")
+        
+        return {row[0]: tuple(row[1:]) for row in self.conn.execute(query)}
+    
+    def _dimension_fingerprint(self, cube):
+        """Hash the dimension attributes joined by a cube so attribute changes are detected"""
+        digest = hashlib.sha1()
+        for hierarchy in cube['hierarchies']:
+            definition = HIERARCHIES[hierarchy]
+            if 'table' not in definition:
+                continue
+            
+            columns = [expression.split('.', 1)[1] for _, expression in definition['levels']]
+            query = (f"SELECT {definition['key']}, {', '.join(columns)} "
+                     f"FROM {definition['table']} ORDER BY {definition['key']}")
+            for row in self.conn.execute(query):
+                digest.update(repr(row).encode())
+        
+        return digest.hexdigest()
+    
     def _update_refresh_metadata(self, cube_id, processing_type):
         """Update metadata about cube refresh"""
         # In a real implementation, this would update a metadata table
@@ -96,19 +828,32 @@ def main():
     parser.add_argument('--all', action='store_true', help='Refresh all cubes')
     parser.add_argument('--cube', type=str, help='Specific cube to refresh')
     parser.add_argument('--full', action='store_true', help='Force full processing')
+    parser.add_argument('--db', type=str, default=':memory:', help='Path to the data warehouse database')
+    parser.add_argument('--materialize', action='store_true', help='Materialize aggregate views after refresh')
+    parser.add_argument('--storage-dir', type=str, help='Directory to persist cube files under')
+    parser.add_argument('--storage-budget', type=int, help='Row budget for materialized views')
     
     args = parser.parse_args()
     
-    cube_manager = OLAPCubeManager()
+    cube_manager = OLAPCubeManager(db_path=args.db, storage_dir=args.storage_dir)
     
     if args.all:
         success = cube_manager.refresh_all_cubes(force_full=args.full)
+        cube_ids = list(cube_manager.cubes)
     elif args.cube:
         success = cube_manager.refresh_cube(args.cube, force_full=args.full)
+        cube_ids = [args.cube]
     else:
         logger.error("Either --all or --cube must be specified")
         sys.exit(1)
     
+    if success and args.materialize:
+        for cube_id in cube_ids:
+            report = cube_manager.materialize_views(cube_id, storage_budget=args.storage_budget)
+            for view in report['views']:
+                logger.info(f"  {view['levels']}: {view['actual_rows']} rows "
+                            f"(estimated {view['estimated_rows']})")
+    
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Mergeable sketch measures for non-additive cube aggregates
+
+HyperLogLog estimates distinct counts and KLL estimates quantiles. Both
+can be built per cube cell and merged when cells are rolled up, so
+distinct customers or spend percentiles never require rescanning facts.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count sketch
+
+    relative_error is the standard error of the estimate (about 1.04 / sqrt(m)
+    for m registers).
+    """
+
+    def __init__(self, relative_error=0.02):
+        self.relative_error = relative_error
+        self.precision = min(18, max(4, math.ceil(2 * math.log2(1.04 / relative_error))))
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array of values to the sketch"""
+        values = np.asarray(values)
+        if not len(values):
+            return
+
+        hashes = pd.util.hash_array(values)
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << width) - 1)
+        # Position of the leftmost 1-bit within the remaining width bits
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (width - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Merge another sketch with the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self):
+        """Return an independent copy of the sketch"""
+        sketch = HyperLogLog.__new__(HyperLogLog)
+        sketch.relative_error = self.relative_error
+        sketch.precision = self.precision
+        sketch.registers = self.registers.copy()
+        return sketch
+
+    def estimate(self):
+        """Return the estimated number of distinct values"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return float(estimate)
+
+
+class KLLSketch:
+    """KLL quantile sketch
+
+    Items are kept in compactors of decreasing capacity; an item at level h
+    stands for 2**h inputs. rank_error is the target normalized rank error.
+    """
+
+    def __init__(self, rank_error=0.01, seed=None):
+        self.rank_error = rank_error
+        self.k = max(8, math.ceil(1.7 / rank_error))
+        self.compactors = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add an array of values to the sketch"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self.count += len(values)
+        self._compress()
+
+    def merge(self, other):
+        """Merge another sketch into this one"""
+        for level, items in enumerate(other.compactors):
+            if level == len(self.compactors):
+                self.compactors.append(np.empty(0))
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def copy(self):
+        """Return an independent copy of the sketch"""
+        sketch = KLLSketch(self.rank_error)
+        sketch.compactors = [items.copy() for items in self.compactors]
+        sketch.count = self.count
+        return sketch
+
+    def quantiles(self, fractions):
+        """Return the estimated values at the given quantile fractions"""
+        if not self.count:
+            return [float('nan')] * len(fractions)
+
+        items = np.concatenate(self.compactors)
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=np.float64)
+            for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(fractions, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, targets), len(items) - 1)
+        return items[order][positions].tolist()
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.compactors):
+            if len(self.compactors[level]) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+
+                items = np.sort(self.compactors[level])
+                leftover = items[len(items) - len(items) % 2:]
+                promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                self.compactors[level] = leftover
+            level += 1
+
+
+def create_sketch(spec):
+    """Create an empty sketch for a sketch measure definition"""
+    if spec['type'] == 'distinct':
+        return HyperLogLog(spec.get('relative_error', 0.02))
+    if spec['type'] == 'quantile':
+        return KLLSketch(spec.get('rank_error', 0.01))
+    raise ValueError(f"Unknown sketch type: {spec['type']}")
+
+
+def merge_sketches(sketches):
+    """Merge an iterable of sketches into a new sketch"""
+    merged = None
+    for sketch in sketches:
+        if merged is None:
+            merged = sketch.copy()
+        else:
+            merged.merge(sketch)
+    return merged
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""End-to-End BI Pipeline: ETL -> OLAP Cubes -> Dashboards -> Reports, and Workbook Extracts"""
+import logging
+import os
+
+from src.dashboards.dashboard_generator import DashboardGenerator
+from src.extracts.extract_publisher import ExtractPublisher
+from src.olap.refresh_cubes import OLAPCubeManager
+from src.pipeline.orchestrator import PipelineOrchestrator
+from src.reporting.generate_executive_reports import ExecutiveReportGenerator
+
+logger = logging.getLogger(__name__)
+
+# Source systems feeding each warehouse table
+ETL_TABLE_SOURCES = {
+    'DimCustomer': ['customers'],
+    'DimProduct': ['products'],
+    'FactSales': ['sales', 'orders'],
+    'FactInventory': ['inventory']
+}
+
+# Dashboard each executive report is published from
+REPORT_DASHBOARDS = {
+    'ceo': 'executive',
+    'cfo': 'finance',
+    'sales': 'sales',
+    'operations': 'operations'
+}
+
+STAGES = ['etl', 'olap', 'dashboard', 'report', 'extract']
+
+
+def build_bi_pipeline(db_path, output_dir, etl_type=None, cubes=None, dashboards=None, reports=None,
+                      extracts=None, as_of_date=None, max_workers=4):
+    """Build the BI pipeline as a task graph and return (orchestrator, components)
+
+    Every item is its own task: a table load, a cube refresh, a dashboard
+    feed or a report. A cube refreshes as soon as the tables it reads are
+    loaded, a dashboard as soon as its cubes are refreshed and a report as
+    soon as its dashboard is published. Without etl_type the pipeline runs
+    from the data already in the warehouse.
+
+    The Tableau and Power BI workbook extracts refresh incrementally as
+    soon as the tables they read are loaded; by default every extract is
+    published after an ETL run and none without one.
+
+    The cube manager shares one connection, so cube refreshes and
+    dashboard queries hold the 'olap' lock; matplotlib is not thread-safe,
+    so reports hold the 'render' lock.
+    """
+    reports = list(REPORT_DASHBOARDS) if reports is None else list(reports)
+    dashboards = (list(dict.fromkeys(REPORT_DASHBOARDS[report_id] for report_id in reports))
+                  if dashboards is None else list(dashboards))
+
+    cube_manager = OLAPCubeManager(db_path=db_path)
+    dashboard_generator = DashboardGenerator(cube_manager=cube_manager,
+                                             output_dir=os.path.join(output_dir, 'dashboards'))
+    report_generator = ExecutiveReportGenerator(output_dir=os.path.join(output_dir, 'reports'), db_path=db_path)
+    extract_publisher = ExtractPublisher(db_path, output_dir=os.path.join(output_dir, 'extracts'))
+    if extracts is None:
+        extracts = list(extract_publisher.extracts) if etl_type else []
+
+    if cubes is None:
+        cubes = list(dict.fromkeys(
+            cube_id for dashboard_id in dashboards for cube_id in dashboard_generator.cubes(dashboard_id)
+        ))
+
+    orchestrator = PipelineOrchestrator(max_workers=max_workers)
+
+    def existing(*names):
+        return [name for name in names if name in orchestrator.tasks]
+
+    if etl_type:
+        tables = dict.fromkeys(
+            [table for cube_id in cubes for table in cube_manager.source_tables(cube_id)]
+            + [table for extract_id in extracts for table in extract_publisher.source_tables(extract_id)
+               if table in ETL_TABLE_SOURCES]
+        )
+        for table in tables:
+            orchestrator.add_task(f"etl:{table}", _etl_task(table, etl_type == 'full'), stage='etl')
+
+    for cube_id in cubes:
+        deps = existing(*(f"etl:{table}" for table in cube_manager.source_tables(cube_id)))
+        orchestrator.add_task(f"cube:{cube_id}", _cube_task(cube_manager, cube_id),
+                              deps=deps, stage='olap', lock='olap')
+
+    for dashboard_id in dashboards:
+        deps = existing(*(f"cube:{cube_id}" for cube_id in dashboard_generator.cubes(dashboard_id)))
+        orchestrator.add_task(f"dashboard:{dashboard_id}",
+                              lambda dashboard_id=dashboard_id: dashboard_generator.generate_dashboard(dashboard_id),
+                              deps=deps, stage='dashboard', lock='olap')
+
+    for report_id in reports:
+        deps = existing(f"dashboard:{REPORT_DASHBOARDS[report_id]}")
+        orchestrator.add_task(f"report:{report_id}",
+                              lambda report_id=report_id: report_generator.generate_report(report_id, as_of_date),
+                              deps=deps, stage='report', lock='render')
+
+    # Each extract publishes on its own warehouse connection, so extracts need no lock
+    for extract_id in extracts:
+        deps = existing(*(f"etl:{table}" for table in extract_publisher.source_tables(extract_id)))
+        orchestrator.add_task(f"extract:{extract_id}",
+                              lambda extract_id=extract_id: extract_publisher.publish_extract(extract_id),
+                              deps=deps, stage='extract')
+
+    components = {
+        'cube_manager': cube_manager,
+        'dashboard_generator': dashboard_generator,
+        'report_generator': report_generator,
+        'extract_publisher': extract_publisher
+    }
+    return orchestrator, components
+
+
+def stage_timings(orchestrator):
+    """Summarize a finished run per stage: task counts and wall-clock span in ms"""
+    timings = {}
+    for stage in STAGES:
+        results = [result for result in orchestrator.results.values() if result['stage'] == stage]
+        if not results:
+            continue
+
+        ran = [result for result in results if result['started'] is not None]
+        timings[stage] = {
+            'tasks': len(results),
+            'succeeded': sum(1 for result in results if result['status'] == 'succeeded'),
+            'busy_ms': sum(result['duration_ms'] for result in ran),
+            'span_ms': ((max(result['finished'] for result in ran) - min(result['started'] for result in ran)) * 1000
+                        if ran else 0.0)
+        }
+    return timings
+
+
+def _etl_task(table, full_load):
+    def run():
+        # Imported lazily: extraction needs the source system drivers
+        from src.etl.run_etl_pipeline import run_etl_pipeline
+        return run_etl_pipeline(full_load=full_load, source_systems=ETL_TABLE_SOURCES[table],
+                                target_tables=[table])
+    return run
+
+
+def _cube_task(cube_manager, cube_id):
+    def run():
+        return cube_manager.refresh_cube(cube_id)
+    return run
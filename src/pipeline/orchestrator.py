@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Pipeline Orchestrator"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineOrchestrator:
+    """Run a dependency graph of tasks, starting each one as soon as its inputs are ready
+
+    Tasks are scheduled individually rather than stage by stage, so a cube
+    whose tables are loaded refreshes while other tables are still in ETL.
+    Tasks sharing a lock group (e.g. everything using one non-thread-safe
+    resource) never run at the same time. A failed task skips everything
+    downstream of it.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.tasks = {}
+        self.results = {}
+
+    def add_task(self, name, func, deps=(), stage=None, lock=None):
+        """Add a task; func() runs once every task in deps has succeeded and fails by returning False"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+
+        self.tasks[name] = {
+            'func': func,
+            'deps': list(deps),
+            'stage': stage,
+            'lock': lock
+        }
+
+    def run(self):
+        """Run every task and return {name: result record}"""
+        self._validate()
+        self.results = {}
+        pending = dict(self.tasks)
+        running = {}
+        busy_locks = set()
+        started = time.perf_counter()
+
+        def submit_ready(pool):
+            # Repeat while skips happen, since a skip can cascade to later tasks
+            skipped = True
+            while skipped:
+                skipped = False
+                for name in list(pending):
+                    task = pending[name]
+                    states = [self.results.get(dep, {}).get('status') for dep in task['deps']]
+                    if any(state in ('failed', 'skipped') for state in states):
+                        del pending[name]
+                        self.results[name] = self._record(name, 'skipped', error='upstream task did not succeed')
+                        logger.warning(f"Skipping {name}: upstream task did not succeed")
+                        skipped = True
+                    elif all(state == 'succeeded' for state in states) and task['lock'] not in busy_locks:
+                        del pending[name]
+                        if task['lock'] is not None:
+                            busy_locks.add(task['lock'])
+                        running[pool.submit(self._execute, name)] = name
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline') as pool:
+            submit_ready(pool)
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.results[name] = future.result()
+                    busy_locks.discard(self.tasks[name]['lock'])
+                submit_ready(pool)
+
+        succeeded = sum(1 for result in self.results.values() if result['status'] == 'succeeded')
+        logger.info(f"Pipeline finished: {succeeded}/{len(self.tasks)} tasks succeeded "
+                    f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return self.results
+
+    def end_to_end_latency(self, name):
+        """Seconds from the start of the task's earliest upstream root to its completion"""
+        result = self.results.get(name)
+        if not result or result['status'] != 'succeeded':
+            return None
+
+        roots = [
+            self.results[ancestor]['started'] for ancestor in self._ancestors(name) | {name}
+            if not self.tasks[ancestor]['deps'] and self.results[ancestor]['started'] is not None
+        ]
+        return result['finished'] - min(roots)
+
+    def _execute(self, name):
+        """Run one task on a worker thread and time it"""
+        started = time.perf_counter()
+        try:
+            value = self.tasks[name]['func']()
+        except Exception as e:
+            logger.error(f"Pipeline task {name} failed: {str(e)}")
+            return self._record(name, 'failed', started, time.perf_counter(), error=str(e))
+
+        if value is False:
+            logger.error(f"Pipeline task {name} reported failure")
+            return self._record(name, 'failed', started, time.perf_counter(), value)
+        return self._record(name, 'succeeded', started, time.perf_counter(), value)
+
+    def _record(self, name, status, started=None, finished=None, value=None, error=None):
+        return {
+            'task': name,
+            'stage': self.tasks[name]['stage'],
+            'status': status,
+            'started': started,
+            'finished': finished,
+            'duration_ms': (finished - started) * 1000 if started is not None else None,
+            'result': value,
+            'error': error,
+            'thread': threading.current_thread().name if started is not None else None
+        }
+
+    def _ancestors(self, name):
+        ancestors = set()
+        stack = list(self.tasks[name]['deps'])
+        while stack:
+            dep = stack.pop()
+            if dep not in ancestors:
+                ancestors.add(dep)
+                stack.extend(self.tasks[dep]['deps'])
+        return ancestors
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles"""
+        for name, task in self.tasks.items():
+            for dep in task['deps']:
+                if dep not in self.tasks:
+                    raise ValueError(f"Task {name} depends on unknown task {dep}")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through task {name}")
+            visiting.add(name)
+            for dep in self.tasks[name]['deps']:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.tasks:
+            visit(name)
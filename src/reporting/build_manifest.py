@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Build Manifest for Incremental Report Generation"""
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FORMAT = 1
+
+
+def fingerprint(*parts):
+    """Hash the inputs of a build step"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class BuildManifest:
+    """Fingerprints and outputs of the sections and reports built in an output directory
+
+    A step is fresh when its recorded fingerprint matches the current one
+    and every output file it produced still exists.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {'sections': {}, 'reports': {}}
+
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get('format') == MANIFEST_FORMAT:
+                self.entries = manifest['entries']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def lookup(self, kind, key, current):
+        """Return the recorded output of a step if it is still fresh, else None"""
+        entry = self.entries[kind].get(key)
+        if entry is None or entry['fingerprint'] != current:
+            return None
+        if not all(os.path.exists(path) for path in entry['files']):
+            return None
+        return entry['output']
+
+    def record(self, kind, key, current, output, files):
+        """Record the fingerprint, output and files of a step that was just built"""
+        self.entries[kind][key] = {'fingerprint': current, 'output': output, 'files': list(files)}
+
+    def save(self):
+        """Write the manifest atomically"""
+        temp_path = f"{self.path}.tmp-{os.getpid()}"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({'format': MANIFEST_FORMAT, 'entries': self.entries}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write build manifest {self.path}: {str(e)}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Content-addressed Chart Render Cache"""
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+
+import pandas as pd
+
+from src.telemetry.instrumentation import increment
+
+logger = logging.getLogger(__name__)
+
+# Bump when chart rendering changes so old images are not reused
+CHART_CACHE_FORMAT = 1
+
+# Read from the package metadata so computing keys never imports matplotlib
+try:
+    MATPLOTLIB_VERSION = importlib.metadata.version('matplotlib')
+except importlib.metadata.PackageNotFoundError:
+    MATPLOTLIB_VERSION = None
+
+
+def chart_key(df, spec):
+    """Hash a chart's data and spec into a cache key"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'format': CHART_CACHE_FORMAT,
+        'matplotlib': MATPLOTLIB_VERSION,
+        'spec': spec,
+        'columns': [str(column) for column in df.columns],
+        'dtypes': [str(dtype) for dtype in df.dtypes]
+    }, sort_keys=True, default=str).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ChartCache:
+    """PNG charts stored on disk under the hash of their data and spec
+
+    Lookups touch the file's mtime, and when the cache grows past
+    max_bytes the least recently used images are deleted. Images are
+    written to a temporary file and renamed into place, so report worker
+    processes can share one cache directory.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def get_or_render(self, df, spec, render):
+        """Return the cached image path for a chart, calling render(path) on a miss"""
+        path = os.path.join(self.cache_dir, f"{chart_key(df, spec)}.png")
+
+        try:
+            os.utime(path)
+            self.hits += 1
+            increment('report.chart_cache', result='hit')
+            return path
+        except FileNotFoundError:
+            pass
+
+        self.misses += 1
+        increment('report.chart_cache', result='miss')
+        temp_path = f"{path[:-4]}.tmp-{os.getpid()}.png"
+        render(temp_path)
+        os.replace(temp_path, path)
+        self._evict(keep=path)
+        return path
+
+    def stats(self):
+        """Return cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def _evict(self, keep=None):
+        """Delete least recently used images until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith('.png') and '.tmp-' not in entry.name:
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -2,13 +2,21 @@
 """Executive Report Generator"""
 import argparse
 import logging
+import shutil
 import sys
 import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from fpdf import FPDF
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.reporting.build_manifest import BuildManifest, fingerprint
+from src.reporting.chart_cache import ChartCache
+from src.reporting.html_report import render_html_report
+from src.reporting.section_data import SectionDataProvider
+from src.telemetry.instrumentation import span, traced
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,12 +24,43 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when section or report layout changes so incremental builds redo everything
+TEMPLATE_VERSION = 1
+
+# Generator of the current report worker process
+_worker_generator = None
+
+def _init_worker(output_dir, chart_cache_dir, chart_cache_bytes):
+    """Create the generator used by a report worker process"""
+    global _worker_generator
+    _worker_generator = ExecutiveReportGenerator(output_dir=output_dir, chart_cache_dir=chart_cache_dir,
+                                                 chart_cache_bytes=chart_cache_bytes)
+
+def _render_section(section_id, as_of_date, data, image):
+    """Render one report section in a worker process"""
+    return _worker_generator._generate_section(section_id, as_of_date, data, image)
+
+def _compile_section_report(report_id, report, sections, as_of_date):
+    """Compile one report from rendered sections in a worker process"""
+    return _worker_generator._compile_report(report_id, report, sections, as_of_date)
+
 class ExecutiveReportGenerator:
     """Executive Report Generator for creating business reports"""
     
-    def __init__(self, output_dir='reports'):
+    def __init__(self, output_dir='reports', workers=1, chart_cache_dir=None, chart_cache_bytes=256 * 1024 * 1024,
+                 db_path=None, incremental=False):
         self.output_dir = output_dir
+        # Worker processes for generate_all_reports; matplotlib is not thread-safe
+        self.workers = workers
         os.makedirs(output_dir, exist_ok=True)
+        # Rendered charts keyed by their data and spec, shared across sections and runs
+        self.chart_cache = ChartCache(chart_cache_dir or os.path.join(output_dir, '.chart_cache'), chart_cache_bytes)
+        # Section datasets are fetched once per run and shared; simulated data without a warehouse
+        self.section_data = SectionDataProvider(db_path)
+        # Incremental mode reuses sections and reports whose input fingerprints are unchanged
+        self.build_manifest = BuildManifest(os.path.join(output_dir, '.build_manifest.json')) if incremental else None
+        self.build_summary = self._empty_build_summary()
+        self._in_run = False
         
         self.reports = {
             'ceo': {
@@ -46,6 +85,7 @@ class ExecutiveReportGenerator:
             }
         }
     
+    @traced('report.generate', report='report_id')
     def generate_report(self, report_id, as_of_date=None, email=False):
         """Generate a specific executive report"""
         if report_id not in self.reports:
@@ -59,14 +99,29 @@ class ExecutiveReportGenerator:
         
         logger.info(f"Generating {report['name']} as of {as_of_date.strftime('%Y-%m-%d')}")
         
+        standalone = not self._in_run
+        if standalone:
+            self.build_summary = self._empty_build_summary()
+        
         try:
-            # Create report sections
+            # Create report sections, reusing fresh ones in incremental mode
             sections = {}
-            for section_id in report['sections']:
-                sections[section_id] = self._generate_section(section_id, as_of_date)
+            fingerprints = []
+            with self.section_data.run(report['sections'], as_of_date):
+                image = self._needs_image(report)
+                for section_id in report['sections']:
+                    current, section = self._reuse_section(section_id, as_of_date, image)
+                    if section is None:
+                        section = self._generate_section(section_id, as_of_date, image=image)
+                        self._record_section(section_id, as_of_date, current, section, image)
+                    sections[section_id] = section
+                    fingerprints.append(current)
             
-            # Compile report
-            report_path = self._compile_report(report_id, report, sections, as_of_date)
+            # Compile report unless none of its inputs changed
+            current, report_path = self._reuse_report(report_id, report, fingerprints, as_of_date)
+            if report_path is None:
+                report_path = self._compile_report(report_id, report, sections, as_of_date)
+                self._record_report(report_id, as_of_date, current, report_path)
             
             if email and report_path:
                 self._email_report(report_path, report_id, as_of_date)
@@ -77,13 +132,34 @@ class ExecutiveReportGenerator:
         except Exception as e:
             logger.error(f"Error generating report {report_id}: {str(e)}")
             return False
+        
+        finally:
+            if standalone:
+                self._finish_build()
     
-    def generate_all_reports(self, as_of_date=None, email=False):
+    def generate_all_reports(self, as_of_date=None, email=False, workers=None):
         """Generate all executive reports"""
-        results = {}
+        workers = self.workers if workers is None else workers
         
-        for report_id in self.reports:
-            results[report_id] = self.generate_report(report_id, as_of_date, email)
+        if as_of_date is None:
+            as_of_date = datetime.now()
+        
+        self.build_summary = self._empty_build_summary()
+        self._in_run = True
+        
+        # Datasets shared by several reports are fetched once for the whole run
+        all_sections = [section_id for report in self.reports.values() for section_id in report['sections']]
+        try:
+            with self.section_data.run(all_sections, as_of_date):
+                if workers > 1:
+                    results = self._generate_reports_parallel(list(self.reports), as_of_date, email, workers)
+                else:
+                    results = {}
+                    for report_id in self.reports:
+                        results[report_id] = self.generate_report(report_id, as_of_date, email)
+        finally:
+            self._in_run = False
+            self._finish_build()
         
         success_count = sum(1 for result in results.values() if result)
         total_count = len(results)
@@ -92,91 +168,208 @@ class ExecutiveReportGenerator:
         
         return results
     
-    def _generate_section(self, section_id, as_of_date):
-        """Generate a specific report section"""
-        logger.info(f"Generating section: {section_id}")
+    def _generate_reports_parallel(self, report_ids, as_of_date, email, workers):
+        """Render sections and compile reports on a process pool
         
-        # In a real implementation, this would query the data warehouse
-        # and generate actual visualizations and content
+        Every distinct stale section is rendered once in a worker process;
+        charts are written to disk there, so only the section's shared
+        dataset goes out and the small section dict (summary, data and image
+        path) comes back. Each stale report is compiled in a worker as soon
+        as its own sections are ready.
+        """
+        if as_of_date is None:
+            as_of_date = datetime.now()
         
-        # Simulate data for different sections
-        if section_id in ['company_overview', 'financial_summary', 'revenue_analysis', 'profit_margins']:
-            # Financial data
-            months = pd.date_range(end=as_of_date, periods=12, freq='M').strftime('%b %Y').tolist()
-            revenue = [round(x * 1000) for x in [120, 132, 145, 135, 150, 178, 165, 188, 195, 210, 220, 240]]
-            expenses = [round(x * 1000) for x in [100, 110, 115, 120, 125, 140, 135, 150, 155, 165, 170, 180]]
-            profit = [r - e for r, e in zip(revenue, expenses)]
-            
-            df = pd.DataFrame({
-                'Month': months,
-                'Revenue': revenue,
-                'Expenses': expenses,
-                'Profit': profit
-            })
-            
-            # Create visualization
-            plt.figure(figsize=(10, 6))
-            plt.plot(df['Month'], df['Revenue'], marker='o', label='Revenue')
-            plt.plot(df['Month'], df['Expenses'], marker='s', label='Expenses')
-            plt.plot(df['Month'], df['Profit'], marker='^', label='Profit')
-            plt.title(f'Financial Performance - {section_id.replace("_", " ").title()}')
-            plt.xlabel('Month')
-            plt.ylabel('Amount ($)')
-            plt.xticks(rotation=45)
-            plt.legend()
-            plt.tight_layout()
+        logger.info(f"Generating {len(report_ids)} reports with {workers} worker processes")
+        section_ids = list(dict.fromkeys(
+            section_id for report_id in report_ids for section_id in self.reports[report_id]['sections']
+        ))
+        results = {}
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.output_dir, self.chart_cache.cache_dir,
+                                           self.chart_cache.max_bytes)) as pool:
+            # PNG charts are only rendered for sections of PDF reports
+            image_sections = {
+                section_id for report_id in report_ids if self._needs_image(self.reports[report_id])
+                for section_id in self.reports[report_id]['sections']
+            }
+            fingerprints = {}
+            section_futures = {}
+            for section_id in section_ids:
+                image = section_id in image_sections
+                fingerprints[section_id], section = self._reuse_section(section_id, as_of_date, image)
+                if section is None:
+                    section_futures[section_id] = pool.submit(_render_section, section_id, as_of_date,
+                                                              self.section_data.get(section_id, as_of_date), image)
+                else:
+                    section_futures[section_id] = Future()
+                    section_futures[section_id].set_result(section)
             
-            # Save visualization
-            img_path = os.path.join(self.output_dir, f'{section_id}_{as_of_date.strftime("%Y%m%d")}.png')
-            plt.savefig(img_path)
-            plt.close()
+            recorded = set()
+            report_futures = {}
+            for report_id in report_ids:
+                report = self.reports[report_id]
+                try:
+                    sections = {
+                        section_id: section_futures[section_id].result()
+                        for section_id in report['sections']
+                    }
+                except Exception as e:
+                    logger.error(f"Error generating report {report_id}: {str(e)}")
+                    results[report_id] = False
+                    continue
+                
+                for section_id in report['sections']:
+                    if section_id not in recorded and section_id not in self.build_summary['sections_reused']:
+                        self._record_section(section_id, as_of_date, fingerprints[section_id], sections[section_id],
+                                             section_id in image_sections)
+                    recorded.add(section_id)
+                
+                current, report_path = self._reuse_report(
+                    report_id, report, [fingerprints[section_id] for section_id in report['sections']], as_of_date
+                )
+                if report_path is None:
+                    report_futures[report_id] = (current, pool.submit(_compile_section_report, report_id, report,
+                                                                       sections, as_of_date))
+                else:
+                    report_futures[report_id] = (None, Future())
+                    report_futures[report_id][1].set_result(report_path)
             
-            return {
+            for report_id, (current, future) in report_futures.items():
+                try:
+                    results[report_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Error generating report {report_id}: {str(e)}")
+                    results[report_id] = False
+                    continue
+                
+                if current is not None:
+                    self._record_report(report_id, as_of_date, current, results[report_id])
+                
+                if email and results[report_id]:
+                    self._email_report(results[report_id], report_id, as_of_date)
+                if results[report_id]:
+                    logger.info(f"Report generated successfully: {results[report_id]}")
+        
+        # Keep the requested report order
+        return {report_id: results[report_id] for report_id in report_ids}
+    
+    def _needs_image(self, report):
+        """Whether a report embeds rendered PNG charts"""
+        return report['format'] == 'pdf'
+    
+    def _reuse_section(self, section_id, as_of_date, image=True):
+        """Return (fingerprint, section); section is None unless a fresh build can be reused"""
+        current = fingerprint(TEMPLATE_VERSION, section_id, as_of_date.strftime('%Y-%m-%d'),
+                              self.section_data.version(section_id, as_of_date), image)
+        if self.build_manifest is None:
+            return current, None
+        
+        section = self.build_manifest.lookup('sections', self._section_key(section_id, as_of_date, image), current)
+        if section is None:
+            return current, None
+        
+        section = dict(section)
+        data = self.section_data.get(section_id, as_of_date)
+        if data is not None:
+            section['data'] = data
+        self.build_summary['sections_reused'].append(section_id)
+        return current, section
+    
+    def _record_section(self, section_id, as_of_date, current, section, image=True):
+        """Record a rebuilt section and its output files"""
+        self.build_summary['sections_rebuilt'].append(section_id)
+        if self.build_manifest is not None:
+            files = [section['visualization']] if 'visualization' in section else []
+            output = {key: value for key, value in section.items() if key != 'data'}
+            self.build_manifest.record('sections', self._section_key(section_id, as_of_date, image), current, output, files)
+    
+    def _reuse_report(self, report_id, report, section_fingerprints, as_of_date):
+        """Return (fingerprint, path); path is None unless the compiled report can be reused"""
+        current = fingerprint(TEMPLATE_VERSION, report_id, report, as_of_date.strftime('%Y-%m-%d'), section_fingerprints)
+        if self.build_manifest is None:
+            return current, None
+        
+        report_path = self.build_manifest.lookup('reports', self._report_key(report_id, as_of_date), current)
+        if report_path is not None:
+            self.build_summary['reports_reused'].append(report_id)
+        return current, report_path
+    
+    def _record_report(self, report_id, as_of_date, current, report_path):
+        """Record a recompiled report"""
+        self.build_summary['reports_rebuilt'].append(report_id)
+        if self.build_manifest is not None and report_path:
+            self.build_manifest.record('reports', self._report_key(report_id, as_of_date), current, report_path, [report_path])
+    
+    def _section_key(self, section_id, as_of_date, image):
+        # Sections built with and without PNG charts differ, so each keeps its own entry
+        return self._build_key(section_id, as_of_date, 'png' if image else 'no-png')
+    
+    def _report_key(self, report_id, as_of_date):
+        return self._build_key(report_id, as_of_date, self.reports[report_id]['format'])
+    
+    def _build_key(self, name, as_of_date, variant):
+        return f"{name}@{as_of_date.strftime('%Y%m%d')}/{variant}"
+    
+    def _empty_build_summary(self):
+        return {'sections_rebuilt': [], 'sections_reused': [], 'reports_rebuilt': [], 'reports_reused': []}
+    
+    def _finish_build(self):
+        """Save the build manifest and log what was rebuilt and reused"""
+        if self.build_manifest is not None:
+            self.build_manifest.save()
+        
+        summary = self.build_summary
+        logger.info(f"Rebuilt {len(summary['sections_rebuilt'])} sections "
+                    f"({', '.join(summary['sections_rebuilt']) or 'none'}), "
+                    f"reused {len(summary['sections_reused'])} "
+                    f"({', '.join(summary['sections_reused']) or 'none'})")
+        logger.info(f"Rebuilt {len(summary['reports_rebuilt'])} reports "
+                    f"({', '.join(summary['reports_rebuilt']) or 'none'}), "
+                    f"reused {len(summary['reports_reused'])} "
+                    f"({', '.join(summary['reports_reused']) or 'none'})")
+    
+    def _generate_section(self, section_id, as_of_date, data=None, image=True):
+        """Generate a specific report section
+        
+        The section keeps its chart spec so HTML reports can draw it as SVG;
+        the PNG visualization is only rendered when image is True.
+        """
+        logger.info(f"Generating section: {section_id}")
+        
+        # Section data comes from the run's shared datasets
+        df = data if data is not None else self.section_data.get(section_id, as_of_date)
+        
+        if section_id in ['company_overview', 'financial_summary', 'revenue_analysis', 'profit_margins']:
+            # The financial sections share one chart, so it is rendered once
+            section = {
                 'title': section_id.replace('_', ' ').title(),
                 'data': df,
-                'visualization': img_path,
+                'chart': {
+                    'kind': 'line',
+                    'title': 'Financial Performance',
+                    'x': 'Month',
+                    'series': [('Revenue', 'o'), ('Expenses', 's'), ('Profit', '^')],
+                    'xlabel': 'Month',
+                    'ylabel': 'Amount ($)'
+                },
                 'summary': f"This section shows the {section_id.replace('_', ' ')} for the past 12 months."
             }
         
         elif section_id in ['sales_by_region', 'sales_by_product', 'market_analysis']:
-            # Sales data
-            categories = ['North America', 'Europe', 'Asia', 'Latin America', 'Africa'] if 'region' in section_id else ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
-            values = [round(x * 1000) for x in [240, 180, 160, 120, 80]]
-            growth = [15, 8, 22, 5, 10]
-            
-            df = pd.DataFrame({
-                'Category': categories,
-                'Sales': values,
-                'Growth': growth
-            })
-            
-            # Create visualization
-            plt.figure(figsize=(10, 6))
-            ax = sns.barplot(x='Category', y='Sales', data=df)
-            plt.title(f'Sales Analysis - {section_id.replace("_", " ").title()}')
-            plt.xlabel('Category')
-            plt.ylabel('Sales ($)')
-            plt.xticks(rotation=45)
-            
-            # Add growth labels
-            for i, p in enumerate(ax.patches):
-                ax.annotate(f"{growth[i]}%", 
-                            (p.get_x() + p.get_width() / 2., p.get_height()),
-                            ha = 'center', va = 'center',
-                            xytext = (0, 10),
-                            textcoords = 'offset points')
-            
-            plt.tight_layout()
-            
-            # Save visualization
-            img_path = os.path.join(self.output_dir, f'{section_id}_{as_of_date.strftime("%Y%m%d")}.png')
-            plt.savefig(img_path)
-            plt.close()
-            
-            return {
+            section = {
                 'title': section_id.replace('_', ' ').title(),
                 'data': df,
-                'visualization': img_path,
+                'chart': {
+                    'kind': 'bar',
+                    'title': f'Sales Analysis - {section_id.replace("_", " ").title()}',
+                    'x': 'Category',
+                    'y': 'Sales',
+                    'labels': 'Growth',
+                    'xlabel': 'Category',
+                    'ylabel': 'Sales ($)'
+                },
                 'summary': f"This section shows the {section_id.replace('_', ' ')} with growth percentages."
             }
         
@@ -186,18 +379,71 @@ class ExecutiveReportGenerator:
                 'title': section_id.replace('_', ' ').title(),
                 'summary': f"This section contains information about {section_id.replace('_', ' ')}."
             }
+        
+        if image:
+            section['visualization'] = self._render_chart(df, section['chart'], section_id, as_of_date)
+        return section
+    
+    def _render_chart(self, df, spec, section_id, as_of_date):
+        """Place a section chart in the output directory, rendering it only on a cache miss"""
+        with span('report.render_chart', kind=spec['kind']):
+            cached_path = self.chart_cache.get_or_render(df, spec, lambda path: self._draw_chart(df, spec, path))
+        img_path = os.path.join(self.output_dir, f'{section_id}_{as_of_date.strftime("%Y%m%d")}.png')
+        shutil.copyfile(cached_path, img_path)
+        return img_path
+    
+    def _draw_chart(self, df, spec, path):
+        """Render a chart spec with matplotlib"""
+        # Imported on the first render so cached and HTML-only reports skip matplotlib
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
+        plt.figure(figsize=(10, 6))
+        
+        if spec['kind'] == 'line':
+            for column, marker in spec['series']:
+                plt.plot(df[spec['x']], df[column], marker=marker, label=column)
+            plt.legend()
+        else:
+            ax = sns.barplot(x=spec['x'], y=spec['y'], data=df)
+            
+            # Add growth labels
+            for i, p in enumerate(ax.patches):
+                ax.annotate(f"{df[spec['labels']].iloc[i]}%", 
+                            (p.get_x() + p.get_width() / 2., p.get_height()),
+                            ha = 'center', va = 'center',
+                            xytext = (0, 10),
+                            textcoords = 'offset points')
+        
+        plt.title(spec['title'])
+        plt.xlabel(spec['xlabel'])
+        plt.ylabel(spec['ylabel'])
+        plt.xticks(rotation=45)
+        plt.tight_layout()
+        plt.savefig(path)
+        plt.close()
     
     def _compile_report(self, report_id, report, sections, as_of_date):
         """Compile report sections into a complete report"""
-        if report['format'] == 'pdf':
-            return self._compile_pdf_report(report_id, report, sections, as_of_date)
-        else:
-            logger.error(f"Unsupported report format: {report['format']}")
-            return False
+        with span('report.compile', format=report['format']) as timing:
+            if report['format'] == 'pdf':
+                report_path = self._compile_pdf_report(report_id, report, sections, as_of_date)
+            elif report['format'] == 'html':
+                report_path = self._compile_html_report(report_id, report, sections, as_of_date)
+            else:
+                logger.error(f"Unsupported report format: {report['format']}")
+                return False
+            
+            if report_path:
+                timing.add('bytes', os.path.getsize(report_path))
+            return report_path
     
     def _compile_pdf_report(self, report_id, report, sections, as_of_date):
         """Compile a PDF report"""
         try:
+            from fpdf import FPDF
             pdf = FPDF()
             
             # Add cover page
@@ -270,6 +516,19 @@ class ExecutiveReportGenerator:
             logger.error(f"Error compiling PDF report: {str(e)}")
             return False
     
+    def _compile_html_report(self, report_id, report, sections, as_of_date):
+        """Compile an HTML report with inline SVG charts and full data tables"""
+        try:
+            output_path = os.path.join(self.output_dir, f"{report_id}_{as_of_date.strftime('%Y%m%d')}.html")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(render_html_report(report, sections, as_of_date))
+            
+            return output_path
+        
+        except Exception as e:
+            logger.error(f"Error compiling HTML report: {str(e)}")
+            return False
+    
     def _email_report(self, report_path, report_id, as_of_date):
         """Email the generated report"""
         # In a real implementation, this would use SMTP to send the email
@@ -294,10 +553,19 @@ def main():
     parser.add_argument('--report', type=str, help='Specific report to generate')
     parser.add_argument('--email', action='store_true', help='Email reports after generation')
     parser.add_argument('--output-dir', type=str, default='reports', help='Output directory for reports')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes used with --all')
+    parser.add_argument('--db', type=str, help='Path to the data warehouse database (simulated data if omitted)')
+    parser.add_argument('--format', choices=['pdf', 'html'], help='Override the output format of every report')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only rebuild sections and reports whose inputs changed since the last run')
     
     args = parser.parse_args()
     
-    generator = ExecutiveReportGenerator(output_dir=args.output_dir)
+    generator = ExecutiveReportGenerator(output_dir=args.output_dir, workers=args.workers, db_path=args.db,
+                                         incremental=args.incremental)
+    if args.format:
+        for report in generator.reports.values():
+            report['format'] = args.format
     
     if args.all:
         results = generator.generate_all_reports(email=args.email)
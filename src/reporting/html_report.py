@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""HTML Report Rendering with Inline SVG Charts"""
+import html
+
+import numpy as np
+import pandas as pd
+
+CHART_WIDTH = 720
+CHART_HEIGHT = 360
+# Plot area margins: left, right, top, bottom
+MARGINS = (80, 20, 40, 90)
+COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
+
+STYLE = """
+body { font-family: Arial, Helvetica, sans-serif; margin: 2em auto; max-width: 900px; color: #222; }
+h1 { text-align: center; margin-bottom: 0; }
+.subtitle { text-align: center; color: #666; }
+table { border-collapse: collapse; margin: 0.5em 0 1em; width: 100%; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: center; font-size: 0.9em; }
+th { background: #f0f0f0; }
+details summary { cursor: pointer; color: #555; }
+section { page-break-before: always; }
+"""
+
+
+def render_html_report(report, sections, as_of_date, page_size=50):
+    """Render a report and its sections as a standalone HTML document"""
+    title = html.escape(report['name'])
+    parts = [
+        '<!DOCTYPE html>',
+        f'<html><head><meta charset="utf-8"><title>{title}</title><style>{STYLE}</style></head><body>',
+        f'<h1>{title}</h1>',
+        f'<p class="subtitle">Generated on {as_of_date.strftime("%B %d, %Y")} &middot; CONFIDENTIAL</p>',
+        '<h2>Table of Contents</h2><ol>'
+    ]
+    section_ids = [section_id for section_id in report['sections'] if section_id in sections]
+    parts.extend(
+        f'<li><a href="#{section_id}">{html.escape(sections[section_id]["title"])}</a></li>'
+        for section_id in section_ids
+    )
+    parts.append('</ol>')
+
+    for section_id in section_ids:
+        section = sections[section_id]
+        parts.append(f'<section id="{section_id}"><h2>{html.escape(section["title"])}</h2>')
+        if 'summary' in section:
+            parts.append(f'<p>{html.escape(section["summary"])}</p>')
+        if section.get('chart') and isinstance(section.get('data'), pd.DataFrame):
+            parts.append(render_svg_chart(section['data'], section['chart']))
+        if isinstance(section.get('data'), pd.DataFrame):
+            parts.append('<h3>Data Summary</h3>')
+            parts.append(render_table(section['data'], page_size))
+        parts.append('</section>')
+
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+
+def render_table(df, page_size=50):
+    """Render a full DataFrame as HTML table pages of page_size rows
+
+    Cells are formatted and escaped column by column and rows are joined
+    with vectorized string concatenation, so the cost does not grow with
+    per-cell Python calls. Pages after the first are collapsed.
+    """
+    header = ''.join(f'<th>{html.escape(str(column))}</th>' for column in df.columns)
+    if df.empty:
+        return f'<table><thead><tr>{header}</tr></thead><tbody></tbody></table>'
+
+    rows = pd.Series('<tr>', index=df.index)
+    for column in df.columns:
+        rows = rows + '<td>' + _format_column(df[column]) + '</td>'
+    rows = (rows + '</tr>').tolist()
+
+    pages = []
+    for start in range(0, len(rows), page_size):
+        table = f'<table><thead><tr>{header}</tr></thead><tbody>{"".join(rows[start:start + page_size])}</tbody></table>'
+        if start == 0:
+            pages.append(table)
+        else:
+            end = min(start + page_size, len(rows))
+            pages.append(f'<details><summary>Rows {start + 1}&ndash;{end} of {len(rows)}</summary>{table}</details>')
+    return '\n'.join(pages)
+
+
+def render_svg_chart(df, spec, width=CHART_WIDTH, height=CHART_HEIGHT):
+    """Render a line or bar chart spec as inline SVG"""
+    left, right, top, bottom = MARGINS
+    plot_width = width - left - right
+    plot_height = height - top - bottom
+
+    if spec['kind'] == 'line':
+        columns = [column for column, _ in spec['series']]
+    else:
+        columns = [spec['y']]
+    values = df[columns].to_numpy(dtype=float)
+
+    low = min(0.0, np.nanmin(values)) if values.size else 0.0
+    high = np.nanmax(values) if values.size else 1.0
+    if high <= low:
+        high = low + 1.0
+    high += (high - low) * 0.1
+
+    def y_position(v):
+        return top + plot_height * (1 - (v - low) / (high - low))
+
+    count = len(df)
+    slot = plot_width / max(count, 1)
+    x = left + slot * (np.arange(count) + 0.5)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Arial, sans-serif" font-size="11">',
+        f'<text x="{width / 2:.0f}" y="20" text-anchor="middle" font-size="15">{html.escape(spec["title"])}</text>',
+        f'<line x1="{left}" y1="{top + plot_height}" x2="{left + plot_width}" y2="{top + plot_height}" stroke="#333"/>',
+        f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_height}" stroke="#333"/>'
+    ]
+
+    # Y axis ticks and grid
+    for tick in np.linspace(low, high, 6):
+        y = y_position(tick)
+        parts.append(f'<line x1="{left - 4}" y1="{y:.1f}" x2="{left + plot_width}" y2="{y:.1f}" stroke="#eee"/>')
+        parts.append(f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end">{tick:,.0f}</text>')
+
+    # X axis labels
+    for label, position in zip(df[spec['x']].astype(str), x):
+        parts.append(f'<text x="{position:.1f}" y="{top + plot_height + 14}" text-anchor="end" '
+                     f'transform="rotate(-45 {position:.1f} {top + plot_height + 14})">{html.escape(label)}</text>')
+
+    if spec['kind'] == 'line':
+        for i, column in enumerate(columns):
+            color = COLORS[i % len(COLORS)]
+            y = y_position(values[:, i])
+            points = ' '.join(f'{px:.1f},{py:.1f}' for px, py in zip(x, y))
+            parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2"/>')
+            parts.extend(f'<circle cx="{px:.1f}" cy="{py:.1f}" r="3" fill="{color}"/>' for px, py in zip(x, y))
+            parts.append(f'<rect x="{left + 10 + i * 100}" y="{top - 14}" width="10" height="10" fill="{color}"/>')
+            parts.append(f'<text x="{left + 24 + i * 100}" y="{top - 5}">{html.escape(column)}</text>')
+    else:
+        bar_width = slot * 0.7
+        y = y_position(values[:, 0])
+        base = y_position(0.0)
+        labels = df[spec['labels']].astype(str) if spec.get('labels') else None
+        for i, (px, py) in enumerate(zip(x, y)):
+            parts.append(f'<rect x="{px - bar_width / 2:.1f}" y="{min(py, base):.1f}" width="{bar_width:.1f}" '
+                         f'height="{abs(base - py):.1f}" fill="{COLORS[i % len(COLORS)]}"/>')
+            if labels is not None:
+                parts.append(f'<text x="{px:.1f}" y="{min(py, base) - 4:.1f}" text-anchor="middle">'
+                             f'{html.escape(labels.iloc[i])}%</text>')
+
+    parts.append(f'<text x="{left + plot_width / 2:.0f}" y="{height - 6}" text-anchor="middle">'
+                 f'{html.escape(spec["xlabel"])}</text>')
+    parts.append(f'<text x="14" y="{top + plot_height / 2:.0f}" text-anchor="middle" '
+                 f'transform="rotate(-90 14 {top + plot_height / 2:.0f})">{html.escape(spec["ylabel"])}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _format_column(values):
+    """Format and escape a column as strings"""
+    if pd.api.types.is_float_dtype(values):
+        formatted = pd.Series(np.char.mod('%.2f', values.to_numpy()), index=values.index)
+        return formatted.where(values.notna(), '')
+    formatted = values.astype(str)
+    if pd.api.types.is_numeric_dtype(values):
+        return formatted
+    return (formatted.str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Shared Section Data for Executive Reports"""
+import hashlib
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.telemetry.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+
+def monthly_financials(as_of_date, conn=None):
+    """Revenue, expenses and profit for the 12 months ending before as_of_date"""
+    months = pd.date_range(end=as_of_date, periods=12, freq=pd.offsets.MonthEnd())
+
+    if conn is None:
+        revenue = [round(x * 1000) for x in [120, 132, 145, 135, 150, 178, 165, 188, 195, 210, 220, 240]]
+        expenses = [round(x * 1000) for x in [100, 110, 115, 120, 125, 140, 135, 150, 155, 165, 170, 180]]
+    else:
+        totals = pd.read_sql_query(
+            "SELECT DateKey / 100 AS MonthKey, TOTAL(SalesAmount) AS Revenue, TOTAL(Profit) AS Profit "
+            "FROM FactSales WHERE DateKey BETWEEN ? AND ? GROUP BY 1",
+            conn,
+            params=[int(months[0].strftime('%Y%m01')), int(months[-1].strftime('%Y%m%d'))]
+        ).set_index('MonthKey').reindex(months.year * 100 + months.month, fill_value=0.0)
+        revenue = totals['Revenue'].tolist()
+        expenses = (totals['Revenue'] - totals['Profit']).tolist()
+
+    return pd.DataFrame({
+        'Month': months.strftime('%b %Y').tolist(),
+        'Revenue': revenue,
+        'Expenses': expenses,
+        'Profit': [r - e for r, e in zip(revenue, expenses)]
+    })
+
+
+def _sales_by(column, join, simulated_categories):
+    """Build a dataset of the top five sales categories with year-over-year growth"""
+    def fetch(as_of_date, conn=None):
+        if conn is None:
+            return pd.DataFrame({
+                'Category': simulated_categories,
+                'Sales': [round(x * 1000) for x in [240, 180, 160, 120, 80]],
+                'Growth': [15, 8, 22, 5, 10]
+            })
+
+        current_start = int((as_of_date - pd.DateOffset(years=1)).strftime('%Y%m%d'))
+        prior_start = int((as_of_date - pd.DateOffset(years=2)).strftime('%Y%m%d'))
+        sales = pd.read_sql_query(
+            f"SELECT {column} AS Category, "
+            f"TOTAL(CASE WHEN f.DateKey > ? THEN f.SalesAmount END) AS Sales, "
+            f"TOTAL(CASE WHEN f.DateKey <= ? THEN f.SalesAmount END) AS PriorSales "
+            f"FROM FactSales f {join} WHERE f.DateKey > ? AND f.DateKey <= ? "
+            f"GROUP BY 1 ORDER BY 2 DESC LIMIT 5",
+            conn,
+            params=[current_start, current_start, prior_start, int(as_of_date.strftime('%Y%m%d'))]
+        )
+        growth = (sales['Sales'] / sales['PriorSales'].where(sales['PriorSales'] > 0) - 1) * 100
+        sales['Growth'] = growth.fillna(0).round().astype(int)
+        return sales[['Category', 'Sales', 'Growth']]
+
+    return fetch
+
+
+# Dataset name -> fetch(as_of_date, conn); conn is None when no warehouse is configured
+DATASETS = {
+    'monthly_financials': monthly_financials,
+    'sales_by_region': _sales_by(
+        'c.Region', 'JOIN DimCustomer c ON f.CustomerKey = c.CustomerKey',
+        ['North America', 'Europe', 'Asia', 'Latin America', 'Africa']
+    ),
+    'sales_by_product': _sales_by(
+        'p.ProductName', 'JOIN DimProduct p ON f.ProductKey = p.ProductKey',
+        ['Product A', 'Product B', 'Product C', 'Product D', 'Product E']
+    )
+}
+
+# Dataset each report section is built from; sections not listed need no data
+SECTION_DATASETS = {
+    'company_overview': 'monthly_financials',
+    'financial_summary': 'monthly_financials',
+    'revenue_analysis': 'monthly_financials',
+    'profit_margins': 'monthly_financials',
+    'sales_by_region': 'sales_by_region',
+    'sales_by_product': 'sales_by_product',
+    'market_analysis': 'sales_by_product'
+}
+
+
+class SectionDataProvider:
+    """Fetch each dataset needed by a report run once and share it between sections
+
+    Within run() the datasets required by all requested sections are
+    deduplicated and fetched concurrently, one warehouse connection per
+    fetch. Sections receive their own copies of the shared frames, so a
+    section's changes never reach the shared frame or other sections under
+    any pandas version; the frames are aggregates and cheap to copy.
+    """
+
+    def __init__(self, db_path=None, max_workers=4):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.frames = {}
+        # Content hash of each fetched frame, used as the dataset version
+        self.versions = {}
+        self.fetches = 0
+        self._lock = threading.Lock()
+        self._depth = 0
+
+    def requirements(self, section_ids):
+        """Return the distinct datasets needed by a list of sections"""
+        return list(dict.fromkeys(
+            SECTION_DATASETS[section_id] for section_id in section_ids if section_id in SECTION_DATASETS
+        ))
+
+    @contextmanager
+    def run(self, section_ids, as_of_date):
+        """Prefetch the data of a report run and release it when the outermost run ends"""
+        with self._lock:
+            self._depth += 1
+        try:
+            self.prefetch(section_ids, as_of_date)
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.frames.clear()
+                    self.versions.clear()
+
+    def prefetch(self, section_ids, as_of_date):
+        """Fetch every missing dataset of the sections concurrently"""
+        with self._lock:
+            missing = [
+                name for name in self.requirements(section_ids)
+                if self._key(name, as_of_date) not in self.frames
+            ]
+        if not missing:
+            return
+
+        logger.info(f"Fetching {len(missing)} section datasets: {', '.join(missing)}")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as pool:
+            frames = dict(zip(missing, pool.map(lambda name: self._fetch(name, as_of_date), missing)))
+
+        with self._lock:
+            self.fetches += len(frames)
+            for name, frame in frames.items():
+                key = self._key(name, as_of_date)
+                self.frames[key] = frame
+                self.versions[key] = hashlib.sha256(
+                    pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes()
+                ).hexdigest()
+
+    def get(self, section_id, as_of_date):
+        """Return the shared data of a section, or None if it needs none"""
+        name = SECTION_DATASETS.get(section_id)
+        if name is None:
+            return None
+
+        key = self._key(name, as_of_date)
+        if key not in self.frames:
+            self.prefetch([section_id], as_of_date)
+        return self.frames[key].copy()
+
+    def version(self, section_id, as_of_date):
+        """Return the version of a section's dataset, or None if it needs no data"""
+        name = SECTION_DATASETS.get(section_id)
+        if name is None:
+            return None
+
+        key = self._key(name, as_of_date)
+        if key not in self.versions:
+            self.prefetch([section_id], as_of_date)
+        return self.versions[key]
+
+    def _key(self, name, as_of_date):
+        return (name, as_of_date.strftime('%Y-%m-%d'))
+
+    def _fetch(self, name, as_of_date):
+        """Fetch one dataset on its own connection"""
+        conn = sqlite3.connect(self.db_path) if self.db_path else None
+        try:
+            with span('report.fetch_dataset', dataset=name) as timing:
+                frame = DATASETS[name](as_of_date, conn)
+                timing.add('rows', len(frame))
+            return frame
+        finally:
+            if conn is not None:
+                conn.close()
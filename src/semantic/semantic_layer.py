@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Semantic Layer compiled from the Cognos Framework Manager model"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'cognos_models', 'sales_model.xml'
+)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bi_platform')
+MODEL_CACHE_FORMAT = 1
+
+NUMERIC_TYPES = {'decimal', 'integer', 'float', 'double', 'numeric'}
+AGGREGATES = {'sum': 'SUM', 'avg': 'AVG', 'average': 'AVG', 'min': 'MIN', 'max': 'MAX', 'count': 'COUNT'}
+OPERATORS = {'=', '!=', '<>', '<', '<=', '>', '>=', 'in'}
+
+# Models already loaded by this process, keyed by (path, mtime_ns, size)
+_loaded_models = {}
+
+
+def parse_model(model_path):
+    """Parse a Framework Manager model XML into query subjects and relationships"""
+    root = ET.parse(model_path).getroot()
+    model = {
+        'name': root.findtext('modelInfo/name', ''),
+        'subjects': {},
+        'relationships': []
+    }
+
+    for namespace in root.iter('namespace'):
+        for subject in namespace.findall('querySubject'):
+            table = subject.findtext('source')
+            items = {}
+            for item in subject.findall('queryItem'):
+                data_type = item.findtext('dataType', 'String')
+                is_fact_table = table.lower().startswith('fact')
+                default_usage = 'fact' if is_fact_table and data_type.lower() in NUMERIC_TYPES else 'attribute'
+                usage = item.findtext('usage', default_usage)
+                items[item.findtext('name')] = {
+                    'column': item.findtext('source'),
+                    'data_type': data_type,
+                    'usage': usage,
+                    'aggregate': item.findtext('regularAggregate', 'sum' if usage == 'fact' else None)
+                }
+            model['subjects'][subject.findtext('name')] = {'table': table, 'items': items}
+
+        for relationship in namespace.findall('relationship'):
+            model['relationships'].append({
+                'name': relationship.findtext('name'),
+                'source': relationship.findtext('source'),
+                'target': relationship.findtext('target'),
+                'keys': [
+                    [key.findtext('source'), key.findtext('target')]
+                    for key in relationship.findall('keyColumn')
+                ]
+            })
+
+    return model
+
+
+def load_model(model_path=DEFAULT_MODEL_PATH, cache_dir=None):
+    """Load a parsed model, reusing the in-process copy or, when cache_dir is given, the on-disk cache"""
+    model_path = os.path.abspath(model_path)
+    stat = os.stat(model_path)
+    memo_key = (model_path, stat.st_mtime_ns, stat.st_size)
+
+    if memo_key in _loaded_models:
+        return _loaded_models[memo_key]
+
+    cache_path = None
+    if cache_dir:
+        digest = hashlib.sha1(model_path.encode()).hexdigest()[:12]
+        cache_path = os.path.join(cache_dir, f"{os.path.basename(model_path)}.{digest}.json")
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if (cached['format'], cached['mtime_ns'], cached['size']) == (MODEL_CACHE_FORMAT, stat.st_mtime_ns, stat.st_size):
+                _loaded_models[memo_key] = cached['model']
+                return cached['model']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    logger.info(f"Parsing semantic model {model_path}")
+    model = parse_model(model_path)
+    _loaded_models[memo_key] = model
+
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.tmp-{os.getpid()}"
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'format': MODEL_CACHE_FORMAT,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'size': stat.st_size,
+                    'model': model
+                }, f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write semantic model cache {cache_path}: {str(e)}")
+
+    return model
+
+
+class SemanticLayer:
+    """Semantic layer mapping business names to star-join SQL over the warehouse"""
+
+    def __init__(self, model_path=DEFAULT_MODEL_PATH, db_path=None, cache_dir=None,
+                 plan_cache_size=128):
+        self.model = load_model(model_path, cache_dir)
+        self._items = self._index_items()
+        self._plan = functools.lru_cache(maxsize=plan_cache_size)(self._build_plan)
+        # sqlite keeps a per-connection cache of prepared statements keyed by SQL text;
+        # compiled plans produce stable SQL so repeated requests reuse them
+        self.conn = sqlite3.connect(db_path, cached_statements=plan_cache_size) if db_path else None
+
+    def measures(self):
+        """Return the business names of all measures"""
+        return self._names(lambda item: item['usage'] == 'fact')
+
+    def attributes(self):
+        """Return the business names of all attributes and identifiers"""
+        return self._names(lambda item: item['usage'] != 'fact')
+
+    def source(self, name):
+        """Return the table, column, data type and SQL aggregate behind a business name"""
+        subject, item = self._resolve(name)
+        return {
+            'subject': subject,
+            'table': self.model['subjects'][subject]['table'],
+            'column': item['column'],
+            'data_type': item['data_type'],
+            'function': AGGREGATES[item['aggregate'].lower()] if item['aggregate'] else None
+        }
+
+    def compile(self, measures, attributes=None, filters=None):
+        """Compile a request into (sql, params)
+
+        filters maps a business name to a value, a list of values, or an
+        (operator, value) tuple such as ('>=', 20240101).
+        """
+        filters = filters or {}
+        filter_spec = []
+        params = []
+
+        for name, condition in sorted(filters.items()):
+            if isinstance(condition, tuple):
+                operator, value = condition
+            elif isinstance(condition, (list, set)):
+                operator, value = 'in', list(condition)
+            else:
+                operator, value = '=', condition
+
+            if operator not in OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+
+            if operator == 'in':
+                filter_spec.append((name, operator, len(value)))
+                params.extend(value)
+            else:
+                filter_spec.append((name, operator, 1))
+                params.append(value)
+
+        sql = self._plan(tuple(measures), tuple(attributes or []), tuple(filter_spec))
+        return sql, params
+
+    def query(self, measures, attributes=None, filters=None, conn=None):
+        """Run a request against the warehouse and return a DataFrame"""
+        conn = conn or self.conn
+        if conn is None:
+            raise ValueError("No database connection available for the semantic layer")
+
+        sql, params = self.compile(measures, attributes, filters)
+        # Imported here so resolving business names does not load pandas
+        import pandas as pd
+        return pd.read_sql_query(sql, conn, params=params)
+
+    def plan_cache_stats(self):
+        """Return compiled plan cache counters"""
+        info = self._plan.cache_info()
+        return {'hits': info.hits, 'misses': info.misses, 'entries': info.currsize, 'max_entries': info.maxsize}
+
+    def _build_plan(self, measures, attributes, filter_spec):
+        """Build the star-join SQL for a normalized request"""
+        if not measures:
+            raise ValueError("At least one measure is required")
+
+        resolved_measures = [self._resolve(name) for name in measures]
+        fact_subjects = {subject for subject, _ in resolved_measures}
+        if len(fact_subjects) != 1:
+            raise ValueError(f"Measures must come from a single query subject: {', '.join(measures)}")
+
+        fact_subject = fact_subjects.pop()
+        aliases = {fact_subject: 'f'}
+        joins = []
+
+        def column(name):
+            subject, item = self._resolve(name)
+            if subject not in aliases:
+                aliases[subject] = f"d{len(aliases)}"
+                joins.append(self._join_clause(fact_subject, subject, aliases[subject]))
+            return f"{aliases[subject]}.{item['column']}"
+
+        select = [f'{column(name)} AS "{name}"' for name in attributes]
+        group_by = [str(position) for position in range(1, len(attributes) + 1)]
+
+        for name, (_, item) in zip(measures, resolved_measures):
+            if item['usage'] != 'fact':
+                raise ValueError(f"{name} is not a measure")
+            select.append(f'{AGGREGATES[item["aggregate"].lower()]}(f.{item["column"]}) AS "{name}"')
+
+        conditions = []
+        for name, operator, count in filter_spec:
+            if operator == 'in':
+                conditions.append(f"{column(name)} IN ({', '.join('?' * count)})")
+            else:
+                conditions.append(f"{column(name)} {operator} ?")
+
+        sql = f"SELECT {', '.join(select)} FROM {self.model['subjects'][fact_subject]['table']} f"
+        if joins:
+            sql += ' ' + ' '.join(joins)
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        if group_by:
+            sql += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+
+        return sql
+
+    def _join_clause(self, fact_subject, subject, alias):
+        """Build the join from the fact subject to a dimension subject"""
+        for relationship in self.model['relationships']:
+            if relationship['source'] == fact_subject and relationship['target'] == subject:
+                keys = [(fact_key, dimension_key) for fact_key, dimension_key in relationship['keys']]
+            elif relationship['source'] == subject and relationship['target'] == fact_subject:
+                keys = [(fact_key, dimension_key) for dimension_key, fact_key in relationship['keys']]
+            else:
+                continue
+
+            table = self.model['subjects'][subject]['table']
+            on = ' AND '.join(f"f.{fact_key} = {alias}.{dimension_key}" for fact_key, dimension_key in keys)
+            return f"JOIN {table} {alias} ON {on}"
+
+        raise ValueError(f"No relationship between {fact_subject} and {subject}")
+
+    def _resolve(self, name):
+        """Resolve a business name to (query subject, query item)"""
+        if name not in self._items:
+            raise ValueError(f"Unknown query item: {name}")
+        if self._items[name] is None:
+            raise ValueError(f"Ambiguous query item {name}; qualify it as 'Query Subject.{name}'")
+        return self._items[name]
+
+    def _names(self, predicate):
+        """Return item names matching a predicate, qualified only when ambiguous"""
+        names = []
+        for subject_name, subject in self.model['subjects'].items():
+            for item_name, item in subject['items'].items():
+                if predicate(item):
+                    names.append(item_name if self._items[item_name] else f"{subject_name}.{item_name}")
+        return names
+
+    def _index_items(self):
+        """Index query items by plain and subject-qualified name"""
+        items = {}
+        for subject_name, subject in self.model['subjects'].items():
+            for item_name, item in subject['items'].items():
+                items[f"{subject_name}.{item_name}"] = (subject_name, item)
+                items[item_name] = None if item_name in items else (subject_name, item)
+        return items
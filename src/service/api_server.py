@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Local HTTP Query API for a Long-Running BI Platform"""
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from src.telemetry.instrumentation import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BIService:
+    """Serve KPI, cube and report requests from a started BusinessIntelligencePlatform
+
+    Requests are parsed on the event loop and the platform calls run on a
+    thread pool. At most max_concurrency calls run at once; further
+    requests wait up to a total of max_queue outstanding requests, after
+    which the service answers 503 instead of queueing without bound.
+
+    Endpoints:
+        GET  /health
+        GET  /metrics
+        GET  /metrics/prometheus
+        GET  /kpis?ids=a,b&date=YYYY-MM-DD
+        GET  /cubes/<cube>?measures=a,b&dimensions=x,y&<level>=<member>
+        POST /cubes/refresh
+        GET  /reports/<report>?date=YYYY-MM-DD
+    """
+
+    def __init__(self, platform, host='127.0.0.1', port=8050, max_concurrency=8, max_queue=64):
+        self.platform = platform
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.metrics = {
+            'requests': 0,
+            'rejected': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'max_in_flight': 0
+        }
+        self.ready = threading.Event()
+        self._executor = None
+        self._semaphore = None
+        self._loop = None
+        self._stopping = None
+
+    async def serve(self):
+        """Serve until stop() is called"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='bi-service')
+
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Resolve the bound port when port 0 asked for any free one
+        self.port = server.sockets[0].getsockname()[1]
+        logger.info(f"BI service listening on http://{self.host}:{self.port}")
+        self.ready.set()
+
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+            self.ready.clear()
+            logger.info("BI service stopped")
+
+    def run(self):
+        """Serve on the current thread until interrupted"""
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            logger.info("BI service interrupted")
+
+    def stop(self):
+        """Stop serving; safe to call from any thread"""
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def _handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection, keeping it alive between requests"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'invalid content-length'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'body too large'}, False)
+                    break
+                if length:
+                    await reader.readexactly(length)
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self._dispatch(method, target)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        # Text payloads (the Prometheus exposition) are sent as is, everything else as JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(_json_safe(payload), default=str, allow_nan=False).encode(), 'application/json'
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, target):
+        """Route a request and run its platform call under the concurrency limits"""
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split('/') if part]
+        self.metrics['requests'] += 1
+
+        if method == 'GET' and parts == ['health']:
+            if self.platform.started_at is None:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {'status': 'starting'}
+            return HTTPStatus.OK, {'status': 'ok', 'uptime_seconds': time.time() - self.platform.started_at}
+        if method == 'GET' and parts == ['metrics']:
+            return HTTPStatus.OK, dict(self.metrics, cube_cache=self.platform.cube_manager.cache_stats(),
+                                       spans=REGISTRY.snapshot()['spans'])
+        if method == 'GET' and parts == ['metrics', 'prometheus']:
+            return HTTPStatus.OK, REGISTRY.to_prometheus()
+
+        try:
+            handler = self._route(method, parts, params)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {'error': f"No route for {method} {url.path}"}
+
+        if self.metrics['in_flight'] >= self.max_queue:
+            self.metrics['rejected'] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'service busy, retry later'}
+
+        self.metrics['in_flight'] += 1
+        self.metrics['max_in_flight'] = max(self.metrics['max_in_flight'], self.metrics['in_flight'])
+        try:
+            async with self._semaphore:
+                return await self._loop.run_in_executor(self._executor, handler)
+        except Exception as e:
+            self.metrics['errors'] += 1
+            logger.exception(f"Error serving {method} {target}: {str(e)}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        finally:
+            self.metrics['in_flight'] -= 1
+
+    def _route(self, method, parts, params):
+        """Return a blocking handler for a request, or None if no route matches"""
+        platform = self.platform
+
+        if method == 'GET' and parts == ['kpis']:
+            kpi_ids = _split(params.get('ids')) or None
+            as_of_date = _parse_date(params.get('date'))
+
+            def handler():
+                results = platform.get_kpis(kpi_ids, as_of_date)
+                if results is None:
+                    return HTTPStatus.NOT_FOUND, {'error': 'unknown KPI requested'}
+                return HTTPStatus.OK, {'kpis': results}
+            return handler
+
+        if method == 'POST' and parts == ['cubes', 'refresh']:
+            def handler():
+                if not platform.refresh_cubes():
+                    return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'cube refresh failed'}
+                return HTTPStatus.OK, {'refreshed': list(platform.cube_manager.cubes)}
+            return handler
+
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'cubes':
+            cube_id = parts[1]
+            if cube_id not in platform.cube_manager.cubes:
+                return lambda: (HTTPStatus.NOT_FOUND, {'error': f"Cube {cube_id} not found"})
+            measures = _split(params.pop('measures', None))
+            if not measures:
+                raise ValueError("measures is required")
+            dimensions = _split(params.pop('dimensions', None))
+            filters = {level: _parse_member(value) for level, value in params.items()}
+
+            def handler():
+                data = platform.query_cube(cube_id, measures, dimensions, filters or None)
+                if data is None:
+                    return HTTPStatus.BAD_REQUEST, {'error': f"Query on cube {cube_id} failed"}
+                return HTTPStatus.OK, {'columns': list(data.columns), 'rows': json.loads(data.to_json(orient='values'))}
+            return handler
+
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'reports':
+            report_id = parts[1]
+            if report_id not in platform.report_generator.reports:
+                return lambda: (HTTPStatus.NOT_FOUND, {'error': f"Report {report_id} not found"})
+            as_of_date = _parse_date(params.get('date'))
+
+            def handler():
+                report_path = platform.generate_report(report_id, as_of_date)
+                if not report_path:
+                    return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"Report {report_id} failed"}
+                return HTTPStatus.OK, {'report': report_id, 'path': report_path}
+            return handler
+
+        return None
+
+
+def _json_safe(value):
+    """Replace NaN and infinite floats, which JSON cannot represent, with None"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def _split(value):
+    return [item for item in (value or '').split(',') if item]
+
+
+def _parse_date(value):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid date {value}, expected YYYY-MM-DD")
+
+
+def _parse_member(value):
+    """Parse a filter value: comma-separated members, integers for numeric levels"""
+    members = [int(member) if member.lstrip('-').isdigit() else member for member in _split(value)]
+    return members[0] if len(members) == 1 else members
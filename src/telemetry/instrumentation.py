@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Lightweight Spans and Metrics Shared by the BI Modules"""
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_PREFIX = 'bi'
+
+
+class Span:
+    """One timed operation; add() accumulates counts such as rows or bytes"""
+
+    def __init__(self, name, labels, parent):
+        self.name = name
+        self.labels = labels
+        self.parent = parent
+        self.attributes = {}
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def add(self, key, value=1):
+        """Add to a numeric attribute of the span"""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+class MetricsRegistry:
+    """Thread-safe collection of span timings and counters
+
+    Span durations are aggregated per name and label set (count, total,
+    max) and their attributes are summed, so memory stays constant however
+    long the process runs. The most recent spans are also kept individually,
+    with their parent span, to show where time went in one run.
+    """
+
+    def __init__(self, recent_spans=1000):
+        self.spans = {}
+        self.counters = {}
+        self.recent = deque(maxlen=recent_spans)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time a block; the yielded Span takes attributes via add()"""
+        stack = self._stack()
+        span = Span(name, _label_key(labels), stack[-1].name if stack else None)
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.duration = time.perf_counter() - span.started
+            self._record(span)
+
+    def current(self):
+        """Return the innermost open span of the calling thread, or None"""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def increment(self, name, value=1, **labels):
+        """Add to a counter, e.g. cache hits"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self.recent.clear()
+
+    def snapshot(self):
+        """Return the metrics as plain data"""
+        with self._lock:
+            return {
+                'spans': [
+                    dict(stats, name=name, labels=dict(labels), attributes=dict(stats['attributes']))
+                    for (name, labels), stats in sorted(self.spans.items())
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                'recent_spans': list(self.recent)
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, default=str)
+
+    def to_prometheus(self):
+        """Render the metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        duration = f"{PROMETHEUS_PREFIX}_span_duration_seconds"
+
+        if snapshot['spans']:
+            lines.append(f"# TYPE {duration} summary")
+            for span in snapshot['spans']:
+                labels = _prometheus_labels(dict(span['labels'], span=span['name']))
+                lines.append(f"{duration}_count{labels} {span['count']}")
+                lines.append(f"{duration}_sum{labels} {span['total_seconds']:.6f}")
+
+            lines.append(f"# TYPE {duration}_max gauge")
+            for span in snapshot['spans']:
+                labels = _prometheus_labels(dict(span['labels'], span=span['name']))
+                lines.append(f"{duration}_max{labels} {span['max_seconds']:.6f}")
+
+            attributes = sorted({key for span in snapshot['spans'] for key in span['attributes']})
+            for key in attributes:
+                metric = f"{PROMETHEUS_PREFIX}_span_{_metric_name(key)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for span in snapshot['spans']:
+                    if key in span['attributes']:
+                        labels = _prometheus_labels(dict(span['labels'], span=span['name']))
+                        lines.append(f"{metric}{labels} {span['attributes'][key]}")
+
+        names = list(dict.fromkeys(counter['name'] for counter in snapshot['counters']))
+        for name in names:
+            metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for counter in snapshot['counters']:
+                if counter['name'] == name:
+                    lines.append(f"{metric}{_prometheus_labels(counter['labels'])} {counter['value']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _record(self, span):
+        key = (span.name, span.labels)
+        with self._lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'attributes': {}}
+            stats['count'] += 1
+            stats['total_seconds'] += span.duration
+            stats['max_seconds'] = max(stats['max_seconds'], span.duration)
+            for attribute, value in span.attributes.items():
+                stats['attributes'][attribute] = stats['attributes'].get(attribute, 0) + value
+
+            self.recent.append({
+                'name': span.name,
+                'labels': dict(span.labels),
+                'parent': span.parent,
+                'thread': threading.current_thread().name,
+                'duration_ms': span.duration * 1000,
+                'attributes': dict(span.attributes)
+            })
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{_metric_name(name)}="{_escape_label(value)}"' for name, value in sorted(labels.items()))
+    return '{' + pairs + '}'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide registry used by the instrumented modules
+REGISTRY = MetricsRegistry()
+
+
+def span(name, **labels):
+    """Time a block in the process-wide registry"""
+    return REGISTRY.span(name, **labels)
+
+
+def traced(name, **labels):
+    """Decorator timing every call of a function as a span in the process-wide registry
+
+    Each label names the parameter supplying its value, e.g.
+    @traced('olap.refresh_cube', cube='cube_id'); the function reaches its
+    span through current_span().
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            with REGISTRY.span(name, **{label: arguments.get(param) for label, param in labels.items()}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span():
+    """Return the innermost open span of the calling thread in the process-wide registry"""
+    return REGISTRY.current()
+
+
+def increment(name, value=1, **labels):
+    """Add to a counter in the process-wide registry"""
+    REGISTRY.increment(name, value, **labels)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""CPU and Memory Profiling of a Platform Run"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+from src.telemetry.instrumentation import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def profile_run(output_dir, top=30):
+    """Profile the block with cProfile and tracemalloc and write the results to output_dir
+
+    Writes profile.pstats (load with pstats or snakeviz), profile.txt with
+    the top functions by cumulative time, memory.txt with the top
+    allocation sites and the peak, and the span metrics of the run as
+    metrics.json and metrics.prom.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    REGISTRY.reset()
+    tracemalloc.start()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(os.path.join(output_dir, 'profile.pstats'))
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+        with open(os.path.join(output_dir, 'profile.txt'), 'w') as f:
+            f.write(stream.getvalue())
+
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+        ])
+        with open(os.path.join(output_dir, 'memory.txt'), 'w') as f:
+            f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB, at exit: {current / 1024 / 1024:.1f} MiB\n\n")
+            for stat in snapshot.statistics('lineno')[:top]:
+                f.write(f"{stat}\n")
+
+        with open(os.path.join(output_dir, 'metrics.json'), 'w') as f:
+            f.write(REGISTRY.to_json())
+        with open(os.path.join(output_dir, 'metrics.prom'), 'w') as f:
+            f.write(REGISTRY.to_prometheus())
+
+        logger.info(f"Profile written to {output_dir} (peak traced memory {peak / 1024 / 1024:.1f} MiB)")
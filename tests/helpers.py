@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Shared test fixtures
+"""
+
+import os
+import sqlite3
+
+SQL_DIR = os.path.join(os.path.dirname(__file__), '..', 'sql', 'datawarehouse')
+
+
+def build_warehouse(db_path):
+    """Create the warehouse schema with a small amount of sales data"""
+    conn = sqlite3.connect(db_path)
+    for script in ('create_dimensions.sql', 'create_facts.sql'):
+        with open(os.path.join(SQL_DIR, script)) as f:
+            conn.executescript(f.read())
+
+    conn.executemany(
+        "INSERT INTO DimProduct (ProductKey, ProductName, ProductCategory, ProductSubcategory) VALUES (?, ?, ?, ?)",
+        [(1, 'Laptop', 'Electronics', 'Computers'), (2, 'Desk', 'Furniture', 'Office')]
+    )
+    conn.executemany(
+        "INSERT INTO DimCustomer (CustomerKey, CustomerName, CustomerSegment, Country, Region, City) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1, 'Acme', 'Enterprise', 'USA', 'North America', 'Boston'),
+         (2, 'Globex', 'SMB', 'Germany', 'Europe', 'Berlin')]
+    )
+    conn.executemany(
+        "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(1, 20240115, 1, 1, 1000.0, 1, 0.0, 200.0),
+         (2, 20240120, 2, 2, 500.0, 2, 0.0, 100.0),
+         (3, 20240210, 1, 2, 250.0, 1, 0.0, 50.0),
+         (4, 20240405, 2, 1, 2000.0, 2, 0.0, 300.0)]
+    )
+    conn.commit()
+    return conn
+
+
+def add_inventory_and_customers(conn):
+    """Add inventory snapshots and customer start dates used by the KPIs"""
+    conn.executemany(
+        "INSERT INTO FactInventory (InventoryKey, DateKey, ProductKey, QuantityOnHand, QuantityOnOrder) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(1, 20240401, 1, 2, 0), (2, 20240401, 2, 4, 1)]
+    )
+    conn.execute("UPDATE DimCustomer SET StartDate = '2024-04-05' WHERE CustomerKey = 2")
+    conn.commit()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Load Test for the BI Service API
+
+Measures p50/p99 latency and throughput at increasing client concurrency.
+Point it at a running service with --url, or pass --db to start one
+in-process against a warehouse:
+
+    python tests/load_benchmark.py --db warehouse.db --concurrency 1 4 16 64
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DEFAULT_PATHS = [
+    '/kpis',
+    '/cubes/sales?measures=SalesAmount,Profit&dimensions=Year,Region',
+    '/cubes/finance?measures=Profit&dimensions=Month',
+    '/cubes/customer?measures=SalesAmount,DistinctCustomers&dimensions=CustomerSegment'
+]
+
+
+def run_level(url, paths, concurrency, requests):
+    """Send requests over concurrency keep-alive connections; returns the level's statistics"""
+    target = urlsplit(url)
+    local = threading.local()
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def send(i):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection(target.hostname, target.port, timeout=60)
+        started = time.perf_counter()
+        try:
+            local.conn.request('GET', paths[i % len(paths)])
+            response = local.conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            del local.conn
+            status = 'error'
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(requests)))
+    wall = time.perf_counter() - started
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'throughput_rps': requests / wall,
+        'statuses': statuses
+    }
+
+
+def main():
+    """Run the load test"""
+    parser = argparse.ArgumentParser(description='Load test the BI service API')
+    parser.add_argument('--url', type=str, default='http://127.0.0.1:8050', help='Base URL of a running service')
+    parser.add_argument('--db', type=str, help='Start an in-process service on this warehouse instead')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                        help='Client concurrency levels to test')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per concurrency level')
+    parser.add_argument('--path', action='append', help='Request path (repeatable); defaults to KPI and cube queries')
+    args = parser.parse_args()
+
+    service = None
+    if args.db:
+        from src.bi_platform import BusinessIntelligencePlatform
+        from src.service.api_server import BIService
+
+        platform = BusinessIntelligencePlatform(db_path=args.db)
+        platform.start()
+        service = BIService(platform, port=0, max_queue=max(args.concurrency) * 2)
+        thread = threading.Thread(target=service.run, daemon=True)
+        thread.start()
+        service.ready.wait()
+        args.url = f"http://127.0.0.1:{service.port}"
+
+    paths = args.path or DEFAULT_PATHS
+    print(f"Load testing {args.url} with {len(paths)} request paths")
+    print(f"{'concurrency':>11} {'requests':>8} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}  statuses")
+    try:
+        for concurrency in args.concurrency:
+            result = run_level(args.url, paths, concurrency, args.requests)
+            print(f"{result['concurrency']:>11} {result['requests']:>8} {result['p50_ms']:>9.2f} "
+                  f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f}  {result['statuses']}")
+    finally:
+        if service is not None:
+            service.stop()
+            thread.join()
+            platform.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,453 @@
 #!/usr/bin/env python3
 """
 Performance Tests for IBM Business Intelligence (BI) Analyst
+
+Scale-factor benchmark suite. Generates a synthetic warehouse at each
+scale factor (scale 1 = 100,000 sales rows) and measures every stage of
+a platform run: extraction, load, cube refresh, KPI evaluation, cube
+queries and report generation. Each stage reports its best time over
+--repeat runs, rows/s and its peak memory, measured as the resident set
+growth of one extra run in a freshly spawned process.
+
+Everything runs offline against SQLite and local files:
+
+    python tests/performance_test.py run --scales 0.1 1 --output results.json
+    python tests/performance_test.py run --save-baseline
+    python tests/performance_test.py compare tests/baselines/benchmark.json results.json --threshold 0.2
+
+Baselines are only comparable on the machine that recorded them.
 """
 
+import argparse
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sqlite3
+import sys
+import tempfile
 import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+SQL_DIR = os.path.join(os.path.dirname(__file__), '..', 'sql', 'datawarehouse')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'benchmark.json')
+
+STAGES = ['extract', 'load', 'refresh', 'kpi', 'query', 'report']
+
+# Rows per table at scale 1
+SCALE_ROWS = {
+    'FactSales': 100000,
+    'DimCustomer': 2000,
+    'DimProduct': 500
+}
+DAYS = 730
+START_DATE = '2023-01-01'
+AS_OF_DATE = datetime(2024, 12, 31)
+
+# Ignore differences smaller than these; they are timer and allocator noise
+MIN_SECONDS_DELTA = 0.005
+MIN_MEMORY_DELTA_MB = 1.0
+
+BENCHMARK_QUERIES = [
+    ('sales', ['SalesAmount', 'Profit'], ['Year', 'Region']),
+    ('sales', ['SalesAmount'], ['ProductCategory', 'Month']),
+    ('sales', ['Quantity'], ['Country', 'ProductSubcategory']),
+    ('finance', ['Profit', 'Discount'], ['Quarter', 'ProductCategory']),
+    ('finance', ['SalesAmount'], ['DateKey']),
+    ('inventory', ['QuantityOnHand', 'QuantityOnOrder'], ['Month', 'ProductCategory']),
+    ('customer', ['SalesAmount', 'DistinctCustomers'], ['Region', 'CustomerSegment']),
+    ('customer', ['SalesAmount'], ['City'])
+]
+
+
+def generate_sources(source_dir, scale, seed=42):
+    """Write the synthetic source system exports for a scale factor as CSV files"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(source_dir, exist_ok=True)
+    dates = pd.date_range(START_DATE, periods=DAYS, freq='D')
+    customers = max(int(SCALE_ROWS['DimCustomer'] * scale), 10)
+    products = max(int(SCALE_ROWS['DimProduct'] * scale), 10)
+    sales = max(int(SCALE_ROWS['FactSales'] * scale), 100)
+
+    regions = np.array(['North America', 'Europe', 'Asia', 'Latin America', 'Africa'])
+    region = rng.integers(0, len(regions), customers)
+    frames = {
+        'DimDate': pd.DataFrame({
+            'DateKey': dates.strftime('%Y%m%d').astype(int),
+            'FullDate': dates.strftime('%Y-%m-%d'),
+            'DayOfWeek': dates.day_name(),
+            'DayOfMonth': dates.day,
+            'Month': dates.month,
+            'MonthName': dates.month_name(),
+            'Quarter': dates.quarter,
+            'Year': dates.year,
+            'IsWeekend': (dates.dayofweek >= 5).astype(int)
+        }),
+        'DimCustomer': pd.DataFrame({
+            'CustomerKey': np.arange(1, customers + 1),
+            'CustomerID': [f"C{i:06d}" for i in range(1, customers + 1)],
+            'CustomerName': [f"Customer {i}" for i in range(1, customers + 1)],
+            'CustomerType': np.where(rng.random(customers) < 0.3, 'Business', 'Consumer'),
+            'CustomerSegment': np.array(['Enterprise', 'SMB', 'Consumer'])[rng.integers(0, 3, customers)],
+            'Country': [f"{regions[r]} Country {rng.integers(1, 6)}" for r in region],
+            'Region': regions[region],
+            'City': [f"City {i}" for i in rng.integers(1, 200, customers)],
+            'StartDate': dates[rng.integers(0, DAYS, customers)].strftime('%Y-%m-%d'),
+            'IsCurrent': 1
+        }),
+        'DimProduct': pd.DataFrame({
+            'ProductKey': np.arange(1, products + 1),
+            'ProductID': [f"P{i:06d}" for i in range(1, products + 1)],
+            'ProductName': [f"Product {i}" for i in range(1, products + 1)],
+            'ProductCategory': [f"Category {i % 8}" for i in range(products)],
+            'ProductSubcategory': [f"Subcategory {i % 40}" for i in range(products)],
+            'Brand': [f"Brand {i % 25}" for i in range(products)],
+            'UnitPrice': rng.uniform(5, 500, products).round(2),
+            'IsCurrent': 1
+        })
+    }
+
+    quantity = rng.integers(1, 10, sales)
+    amount = (rng.uniform(5, 500, sales) * quantity).round(2)
+    frames['FactSales'] = pd.DataFrame({
+        'SalesKey': np.arange(1, sales + 1),
+        'DateKey': frames['DimDate']['DateKey'].to_numpy()[rng.integers(0, DAYS, sales)],
+        'CustomerKey': rng.integers(1, customers + 1, sales),
+        'ProductKey': rng.integers(1, products + 1, sales),
+        'SalesAmount': amount,
+        'Quantity': quantity,
+        'Discount': rng.choice([0.0, 0.05, 0.1, 0.2], sales),
+        'Profit': (amount * rng.uniform(0.05, 0.35, sales)).round(2)
+    })
+
+    # Weekly stock snapshot of every product
+    weeks = frames['DimDate']['DateKey'].to_numpy()[::7]
+    frames['FactInventory'] = pd.DataFrame({
+        'InventoryKey': np.arange(1, len(weeks) * products + 1),
+        'DateKey': np.repeat(weeks, products),
+        'ProductKey': np.tile(np.arange(1, products + 1), len(weeks)),
+        'QuantityOnHand': rng.integers(0, 500, len(weeks) * products),
+        'QuantityOnOrder': rng.integers(0, 100, len(weeks) * products)
+    })
+
+    for table, frame in frames.items():
+        frame.to_csv(os.path.join(source_dir, f"{table}.csv"), index=False)
+    return {table: len(frame) for table, frame in frames.items()}
+
+
+class ScaleBenchmark:
+    """The stages of a platform run against one synthetic warehouse
+
+    Each stage method can be repeated and returns the number of rows it
+    processed. extract and load must run first to build the warehouse.
+    """
+
+    def __init__(self, scale, work_dir, row_counts=None):
+        self.scale = scale
+        self.work_dir = work_dir
+        self.source_dir = os.path.join(work_dir, 'sources')
+        self.db_path = os.path.join(work_dir, 'warehouse.db')
+        self.extracted = {}
+        self.cube_manager = None
+
+        # Given row_counts, attach to the sources and warehouse already built in work_dir
+        if row_counts is not None:
+            self.row_counts = row_counts
+            return
+
+        self.row_counts = generate_sources(self.source_dir, scale)
+        conn = sqlite3.connect(self.db_path)
+        for script in ('create_dimensions.sql', 'create_facts.sql'):
+            with open(os.path.join(SQL_DIR, script)) as f:
+                conn.executescript(f.read())
+        conn.close()
+
+    @property
+    def warehouse_rows(self):
+        return sum(self.row_counts.values())
+
+    def extract(self):
+        """Read every source export, as DataExtractor.extract_from_file does"""
+        self.extracted = {
+            table: pd.read_csv(os.path.join(self.source_dir, f"{table}.csv")) for table in self.row_counts
+        }
+        return sum(len(frame) for frame in self.extracted.values())
+
+    def load(self):
+        """Fully reload the warehouse tables from the extracted data"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table, frame in self.extracted.items():
+                conn.execute(f"DELETE FROM {table}")
+                columns = ', '.join(frame.columns)
+                placeholders = ', '.join('?' * len(frame.columns))
+                conn.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                                 frame.itertuples(index=False, name=None))
+            conn.commit()
+        finally:
+            conn.close()
+        return sum(len(frame) for frame in self.extracted.values())
+
+    def refresh(self):
+        """Fully refresh every cube on a cold cube manager"""
+        from src.olap.refresh_cubes import OLAPCubeManager
+
+        if self.cube_manager is not None:
+            self.cube_manager.conn.close()
+        self.cube_manager = OLAPCubeManager(db_path=self.db_path)
+        if not self.cube_manager.refresh_all_cubes(force_full=True):
+            raise RuntimeError("Cube refresh failed")
+        return self.warehouse_rows
+
+    def kpi(self):
+        """Evaluate every KPI at the end of each of the last 12 months"""
+        from src.kpi.kpi_monitor import KPIMonitor
+
+        monitor = KPIMonitor(db_path=self.db_path)
+        try:
+            for as_of_date in pd.date_range(end=AS_OF_DATE, periods=12, freq=pd.offsets.MonthEnd()):
+                monitor.calculate_all_kpis(as_of_date.to_pydatetime())
+        finally:
+            monitor.close()
+        return self.warehouse_rows
+
+    def query(self):
+        """Answer the benchmark queries from refreshed cubes with a cold result cache"""
+        if self.cube_manager is None:
+            self.refresh()
+        self.cube_manager.cache.clear()
+        for cube_id, measures, dimensions in BENCHMARK_QUERIES:
+            if self.cube_manager.query(cube_id, measures, dimensions) is None:
+                raise RuntimeError(f"Query on cube {cube_id} failed")
+        return self.warehouse_rows
+
+    def report(self):
+        """Generate the CFO report from the warehouse with cold chart and data caches"""
+        from src.reporting.generate_executive_reports import ExecutiveReportGenerator
+
+        output_dir = tempfile.mkdtemp(dir=self.work_dir)
+        try:
+            generator = ExecutiveReportGenerator(output_dir=output_dir, db_path=self.db_path)
+            if not generator.generate_report('cfo', AS_OF_DATE):
+                raise RuntimeError("Report generation failed")
+        finally:
+            shutil.rmtree(output_dir)
+        return self.warehouse_rows
+
+    def close(self):
+        if self.cube_manager is not None:
+            self.cube_manager.conn.close()
+
+
+def measure(benchmark, stage, repeat):
+    """Time a stage repeat times and measure the peak memory of one more run"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = getattr(benchmark, stage)()
+        timings.append(time.perf_counter() - started)
+
+    seconds = min(timings)
+    return {
+        'seconds': seconds,
+        'rows': rows,
+        'rows_per_second': rows / seconds if seconds > 0 else None,
+        'peak_memory_mb': peak_memory_mb(benchmark, stage)
+    }
+
+
+def peak_memory_mb(benchmark, stage):
+    """Run a stage in a freshly spawned process and return its peak resident set growth in MiB
+
+    Unlike tracemalloc this covers SQLite, numpy and image buffers and adds
+    no overhead. The process attaches to the benchmark's warehouse, rebuilds
+    the state the stage reads, resets its peak RSS counter and reports how
+    far the stage raises it, so the result is the memory the stage needs,
+    including the modules it loads.
+    """
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        growth = pool.apply(_stage_peak_rss_kb, (benchmark.scale, benchmark.work_dir, benchmark.row_counts, stage))
+    return growth / 1024
+
+
+def _stage_peak_rss_kb(scale, work_dir, row_counts, stage):
+    # A spawned process does not inherit the logging setup of main()
+    logging.basicConfig(level=logging.WARNING)
+    benchmark = ScaleBenchmark(scale, work_dir, row_counts)
+    try:
+        if stage == 'load':
+            benchmark.extract()
+        elif stage == 'query':
+            benchmark.refresh()
+        gc.collect()
+        _reset_peak_rss()
+        baseline = _peak_rss_kb()
+        getattr(benchmark, stage)()
+        return _peak_rss_kb() - baseline
+    finally:
+        benchmark.close()
+
+
+def _reset_peak_rss():
+    # Linux lets a process lower its peak RSS (VmHWM) to its current RSS
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_kb():
+    # Linux keeps ru_maxrss across execve, so a spawned process would report its parent's
+    # peak; VmHWM belongs to the process's own address space
+    if os.path.exists('/proc/self/status'):
+        return _proc_status_kb('VmHWM')
+    # ru_maxrss is in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024 if sys.platform == 'darwin' else max_rss
+
+
+def _proc_status_kb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def run_suite(scales, stages=STAGES, repeat=3, work_dir=None):
+    """Benchmark the stages at every scale factor and return the results"""
+    results = {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count()
+        },
+        'repeat': repeat,
+        'scales': {}
+    }
+
+    root = tempfile.mkdtemp(dir=work_dir)
+    try:
+        for scale in scales:
+            benchmark = ScaleBenchmark(scale, os.path.join(root, f"scale_{scale}"))
+            scale_results = {'row_counts': benchmark.row_counts, 'stages': {}}
+            try:
+                # extract and load build the warehouse the later stages read
+                for stage in STAGES:
+                    if stage in stages:
+                        scale_results['stages'][stage] = measure(benchmark, stage, repeat)
+                        print_result(scale, stage, scale_results['stages'][stage])
+                    elif stage in ('extract', 'load'):
+                        getattr(benchmark, stage)()
+            finally:
+                benchmark.close()
+            results['scales'][str(scale)] = scale_results
+    finally:
+        shutil.rmtree(root)
+
+    return results
+
+
+def compare(baseline, current, threshold=0.2):
+    """Return the (scale, stage, metric, baseline, current) entries that regressed beyond threshold"""
+    regressions = []
+    for scale, scale_results in current['scales'].items():
+        baseline_stages = baseline['scales'].get(scale, {}).get('stages', {})
+        for stage, result in scale_results['stages'].items():
+            previous = baseline_stages.get(stage)
+            if previous is None:
+                continue
+            for metric, min_delta in (('seconds', MIN_SECONDS_DELTA), ('peak_memory_mb', MIN_MEMORY_DELTA_MB)):
+                if (result[metric] > previous[metric] * (1 + threshold)
+                        and result[metric] - previous[metric] > min_delta):
+                    regressions.append((scale, stage, metric, previous[metric], result[metric]))
+    return regressions
+
+
+def print_result(scale, stage, result):
+    rate = f"{result['rows_per_second']:>12,.0f}" if result['rows_per_second'] else f"{'-':>12}"
+    print(f"scale {scale:<6} {stage:<8} {result['seconds'] * 1000:>10.1f} ms {rate} rows/s "
+          f"{result['peak_memory_mb']:>8.1f} MiB peak")
+
+
+def test_benchmark_suite_smoke():
+    """Run every stage once at a tiny scale factor"""
+    results = run_suite([0.01], repeat=1)
+    stages = results['scales']['0.01']['stages']
+    assert list(stages) == STAGES
+    assert all(result['seconds'] > 0 and result['rows'] > 0 for result in stages.values())
+
+    slower = json.loads(json.dumps(results))
+    slower['scales']['0.01']['stages']['query']['seconds'] = stages['query']['seconds'] * 2 + 1
+    assert compare(results, slower) == [('0.01', 'query', 'seconds', stages['query']['seconds'],
+                                         slower['scales']['0.01']['stages']['query']['seconds'])]
+    assert compare(results, results) == []
 
-def test_basic_performance():
-    """Basic performance test"""
-    start_time = time.time()
-    result = sum(range(10000))
-    end_time = time.time()
-    execution_time = end_time - start_time
-    
-    print(f"✅ IBM Business Intelligence (BI) Analyst test completed in {execution_time:.4f}s")
-    return execution_time < 1.0
 
 def main():
     """Run performance tests"""
-    print("🚀 Starting IBM Business Intelligence (BI) Analyst Performance Tests")
-    success = test_basic_performance()
-    
-    if success:
-        print("✅ All tests passed!")
+    parser = argparse.ArgumentParser(description='Scale-factor benchmarks for the BI platform')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the benchmarks')
+    run.add_argument('--scales', type=float, nargs='+', default=[0.1, 1.0], help='Scale factors (1 = 100k sales rows)')
+    run.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='Stages to measure')
+    run.add_argument('--repeat', type=int, default=3, help='Timed runs per stage; the best is kept')
+    run.add_argument('--output', type=str, help='Write the results to this JSON file')
+    run.add_argument('--save-baseline', action='store_true', help=f'Write the results as the baseline ({DEFAULT_BASELINE})')
+    run.add_argument('--baseline', type=str, help='Compare the results against this baseline')
+    run.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as a regression')
+
+    check = commands.add_parser('compare', help='Compare a results file against a baseline')
+    check.add_argument('baseline', type=str, help='Baseline results JSON')
+    check.add_argument('current', type=str, help='Current results JSON')
+    check.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as a regression')
+
+    args = parser.parse_args()
+    # Configured before the platform modules are imported so their INFO logging stays off
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == 'run':
+        print("🚀 Starting IBM Business Intelligence (BI) Analyst Performance Tests")
+        results = run_suite([int(scale) if scale.is_integer() else scale for scale in args.scales],
+                            args.stages, args.repeat)
+        paths = ([args.output] if args.output else []) + ([DEFAULT_BASELINE] if args.save_baseline else [])
+        for path in paths:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written to {path}")
+        if not args.baseline:
+            return
+        with open(args.baseline) as f:
+            baseline = json.load(f)
     else:
-        print("❌ Some tests failed!")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            results = json.load(f)
+
+    regressions = compare(baseline, results, args.threshold)
+    for scale, stage, metric, previous, current in regressions:
+        print(f"❌ Regression at scale {scale}, {stage} {metric}: {previous:.3f} -> {current:.3f} "
+              f"(+{(current / previous - 1) * 100:.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"✅ No regressions beyond {args.threshold * 100:.0f}%")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Tableau and Power BI workbook extracts
+"""
+
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.extracts.extract_publisher import TABLEAU_WORKBOOKS, ExtractPublisher, parse_tableau_workbook
+from tests.helpers import build_warehouse
+
+SALES_EXTRACT = 'tableau_executive_dashboard_sales_dashboard'
+MONTHLY_EXTRACT = 'powerbi_financial_revenue_by_month'
+CATEGORY_EXTRACT = 'powerbi_financial_margin_by_category'
+
+
+class TestExtractPublisher(unittest.TestCase):
+    """Test cases for publishing and incrementally refreshing workbook extracts"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.add_dates(20240115, 20240120, 20240210, 20240405, 20250105)
+        self.publisher = ExtractPublisher(self.db_path, os.path.join(self.temp_dir, 'extracts'), file_format='csv')
+
+    def tearDown(self):
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def add_dates(self, *date_keys):
+        self.warehouse.executemany(
+            "INSERT INTO DimDate (DateKey, Year, Month) VALUES (?, ?, ?)",
+            [(key, key // 10000, key // 100 % 100) for key in date_keys]
+        )
+        self.warehouse.commit()
+
+    def add_sale(self, sales_key, date_key, product_key, amount, profit):
+        self.warehouse.execute(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+            "VALUES (?, ?, 1, ?, ?, 1, 0.0, ?)",
+            (sales_key, date_key, product_key, amount, profit)
+        )
+        self.warehouse.commit()
+
+    def expected_by_category(self):
+        """Aggregate the margin extract directly from the warehouse"""
+        return pd.read_sql_query(
+            "SELECT d.Year, p.ProductCategory, SUM(f.SalesAmount) AS sum_SalesAmount, SUM(f.Profit) AS sum_Profit, "
+            "AVG(f.SalesAmount) AS avg_SalesAmount FROM FactSales f JOIN DimDate d ON f.DateKey = d.DateKey "
+            "JOIN DimProduct p ON f.ProductKey = p.ProductKey GROUP BY 1, 2 ORDER BY 1, 2",
+            self.warehouse
+        )
+
+    def test_tableau_worksheet_becomes_extract_spec(self):
+        """Test the workbook's data source join and column instances define the extract"""
+        spec = parse_tableau_workbook(TABLEAU_WORKBOOKS[0])[SALES_EXTRACT]
+
+        self.assertEqual(spec['fact_table'], 'FactSales')
+        self.assertEqual(spec['joins'], {'DimDate': [['DateKey', 'DateKey']]})
+        self.assertEqual(spec['dimensions'], ['Year'])
+        self.assertEqual(spec['measures'], [['SalesAmount', 'sum']])
+
+    def test_publish_writes_sorted_compressed_extracts(self):
+        """Test every extract matches the warehouse aggregate, sorted by its dimensions"""
+        results = self.publisher.publish_all_extracts()
+
+        self.assertTrue(all(results.values()))
+        with gzip.open(results[SALES_EXTRACT], 'rt') as f:
+            self.assertEqual(f.readline().strip(), 'Year,sum_SalesAmount')
+        sales = self.publisher.read_extract(SALES_EXTRACT)
+        self.assertEqual(sales.values.tolist(), [[2024, 3750.0]])
+        pd.testing.assert_frame_equal(self.publisher.read_extract(CATEGORY_EXTRACT), self.expected_by_category(),
+                                      check_dtype=False)
+
+        manifest = self.publisher.manifest()
+        self.assertEqual(manifest[MONTHLY_EXTRACT]['sort_order'], ['Year', 'Month'])
+        self.assertEqual(manifest[MONTHLY_EXTRACT]['last_refresh']['mode'], 'full')
+        self.assertEqual(sorted(manifest[MONTHLY_EXTRACT]['fingerprints']), ['202401', '202402', '202404'])
+        self.assertFalse([name for name in os.listdir(self.publisher.output_dir) if '.tmp-' in name])
+
+    def test_incremental_refresh_reaggregates_changed_months(self):
+        """Test only changed months are re-read and the result equals a full rebuild"""
+        self.publisher.publish_all_extracts()
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+        self.assertEqual(self.publisher.manifest()[CATEGORY_EXTRACT]['last_refresh']['mode'], 'unchanged')
+
+        self.add_sale(5, 20240210, 1, 400.0, 40.0)
+        self.add_sale(6, 20250105, 2, 80.0, 8.0)
+        self.warehouse.execute("DELETE FROM FactSales WHERE DateKey = 20240405")
+        self.warehouse.commit()
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+
+        refresh = self.publisher.manifest()[CATEGORY_EXTRACT]['last_refresh']
+        self.assertEqual((refresh['mode'], refresh['partitions']), ('incremental', 2))
+        pd.testing.assert_frame_equal(self.publisher.read_extract(CATEGORY_EXTRACT), self.expected_by_category(),
+                                      check_dtype=False)
+
+    def test_foreign_key_correction_is_refreshed(self):
+        """Test a fact row moved to another product re-aggregates its month"""
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+        self.warehouse.execute("UPDATE FactSales SET ProductKey = 2 WHERE SalesKey = 1")
+        self.warehouse.commit()
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+
+        refresh = self.publisher.manifest()[CATEGORY_EXTRACT]['last_refresh']
+        self.assertEqual((refresh['mode'], refresh['partitions']), ('incremental', 1))
+        extract = self.publisher.read_extract(CATEGORY_EXTRACT)
+        self.assertEqual(dict(zip(extract['ProductCategory'], extract['sum_SalesAmount'])),
+                         {'Electronics': 2000.0, 'Furniture': 1750.0})
+
+    def test_dimension_change_forces_full_rebuild(self):
+        """Test a changed dimension attribute rebuilds the extract instead of reusing stale partials"""
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+        self.warehouse.execute("UPDATE DimProduct SET ProductCategory = 'Office' WHERE ProductKey = 2")
+        self.warehouse.commit()
+        self.publisher.publish_extract(CATEGORY_EXTRACT)
+
+        self.assertEqual(self.publisher.manifest()[CATEGORY_EXTRACT]['last_refresh']['mode'], 'full')
+        extract = self.publisher.read_extract(CATEGORY_EXTRACT)
+        self.assertEqual(extract['ProductCategory'].tolist(), ['Electronics', 'Office'])
+
+    def test_unknown_extract_fails(self):
+        """Test publishing an unknown extract reports failure"""
+        self.assertFalse(self.publisher.publish_extract('missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the KPI monitor
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.kpi.kpi_alerts import AlertDispatcher, WebhookNotifier
+from src.kpi.kpi_engine import IncrementalKPIEngine
+from src.kpi.kpi_history import KPIHistoryStore
+from src.kpi.kpi_monitor import KPIMonitor
+from src.kpi.kpi_scheduler import KPIScheduler
+from tests.helpers import add_inventory_and_customers, build_warehouse
+
+
+class TestBatchedKPIs(unittest.TestCase):
+    """Test cases for batched KPI evaluation"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        add_inventory_and_customers(self.warehouse)
+        self.monitor = KPIMonitor(db_path=self.db_path)
+        self.as_of_date = datetime(2024, 4, 5, 12, 0)
+
+    def tearDown(self):
+        self.monitor.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_values_from_warehouse(self):
+        """Test KPIs are computed from warehouse data for their periods"""
+        results = self.monitor.calculate_all_kpis(self.as_of_date)
+        self.assertEqual(results['revenue']['value'], 2000.0)
+        self.assertEqual(results['new_customers']['value'], 1)
+        self.assertEqual(results['inventory_turnover']['value'], 2 / 3)
+        self.assertEqual(results['profit_margin']['value'], 15.0)
+        self.assertEqual(results['revenue']['period_start'], '2024-04-05')
+        self.assertEqual(results['profit_margin']['period_start'], '2024-04-01')
+
+    def test_inputs_resolved_through_semantic_model(self):
+        """Test KPI inputs and period columns come from the business names of the semantic model"""
+        self.assertEqual(self.monitor.kpis['inventory_turnover']['inputs']['avg_on_hand'],
+                         {'measure': 'Quantity On Hand', 'period_filter': False,
+                          'table': 'FactInventory', 'column': 'QuantityOnHand', 'function': 'AVG'})
+        self.assertEqual(self.monitor.period_columns['DimCustomer'], ('StartDate', '%Y-%m-%d'))
+        with self.assertRaises(ValueError):
+            self.monitor.compile_input({'measure': 'Customer Segment'})
+
+    def test_one_scan_per_table(self):
+        """Test all KPIs cost one query per distinct source table"""
+        statements = []
+        self.monitor.conn.set_trace_callback(
+            lambda sql: statements.append(sql) if sql.startswith('SELECT') else None
+        )
+        self.monitor.calculate_all_kpis(self.as_of_date)
+        self.assertEqual(len(statements), 3)
+
+        plans = self.monitor.plan_kpi_batch({
+            kpi_id: datetime(2024, 4, 1) for kpi_id in ['revenue', 'profit_margin']
+        })
+        self.assertEqual(len(plans), 1)
+        self.assertEqual(len(plans[0]['aliases']), 2)
+
+    def test_missing_tables_yield_no_result(self):
+        """Test KPIs reading unavailable tables return None"""
+        monitor = KPIMonitor()
+        self.assertIsNone(monitor.calculate_kpi('revenue', self.as_of_date))
+
+    def test_journal_mode_and_memory_databases(self):
+        """Test WAL is opt-in, a missing warehouse is reported and :memory: is shared across threads"""
+        self.assertEqual(self.warehouse.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        with self.assertRaises(FileNotFoundError):
+            KPIMonitor(db_path=os.path.join(self.temp_dir, 'missing.db'))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'missing.db')))
+
+        monitor = KPIMonitor()
+        monitor.conn.execute("CREATE TABLE FactSales (DateKey INTEGER, SalesAmount REAL)")
+        monitor.conn.executemany("INSERT INTO FactSales VALUES (20240405, 0.5)", [()] * 20000)
+        monitor.conn.commit()
+        values = []
+
+        def evaluate():
+            for _ in range(50):
+                try:
+                    values.append(monitor.calculate_kpis(['revenue'], self.as_of_date, monitor.connection())['revenue']['value'])
+                except sqlite3.Error as e:
+                    values.append(e)
+
+        workers = [threading.Thread(target=evaluate) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(values, [10000.0] * 200)
+        monitor.close()
+
+    def test_backfill_matches_point_calculations(self):
+        """Test a backfill agrees with calculate_kpi using one scan per table"""
+        statements = []
+        self.monitor.conn.set_trace_callback(
+            lambda sql: statements.append(sql) if sql.startswith('SELECT') else None
+        )
+        backfill = self.monitor.backfill_kpi('revenue', datetime(2024, 1, 1), datetime(2024, 12, 31))
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(len(backfill), 366)
+
+        by_day = backfill.set_index('as_of_date')['value']
+        self.assertEqual(by_day[datetime(2024, 1, 15)], 1000.0)
+        self.assertEqual(by_day[datetime(2024, 1, 16)], 0.0)
+        self.assertEqual(by_day[datetime(2024, 4, 5)], self.monitor.calculate_kpi('revenue', self.as_of_date)['value'])
+
+    def test_backfill_resets_at_period_starts(self):
+        """Test weekly and monthly windows accumulate within their period only"""
+        margin = self.monitor.backfill_kpi('profit_margin', datetime(2024, 1, 14), datetime(2024, 4, 7))
+        by_day = margin.set_index('as_of_date')
+        self.assertTrue(pd.isna(by_day.loc[datetime(2024, 1, 14), 'value']))
+        self.assertEqual(by_day.loc[datetime(2024, 1, 20), 'value'], 20.0)
+        self.assertEqual(by_day.loc[datetime(2024, 1, 20), 'period_start'], datetime(2024, 1, 15))
+        self.assertEqual(by_day.loc[datetime(2024, 4, 7), 'value'], 15.0)
+        self.assertEqual(by_day.loc[datetime(2024, 4, 7), 'status'], 'warning')
+
+        turnover = self.monitor.backfill_kpi('inventory_turnover', datetime(2024, 1, 1), datetime(2024, 2, 29))
+        by_day = turnover.set_index('as_of_date')['value']
+        self.assertEqual(by_day[datetime(2024, 1, 31)], 3 / 3)
+        self.assertEqual(by_day[datetime(2024, 2, 1)], 0.0)
+        self.assertEqual(by_day[datetime(2024, 2, 29)], 1 / 3)
+
+    def test_backfill_zero_divisor_gives_no_value(self):
+        """Test a formula dividing by a zero whole-table input reports None instead of failing"""
+        self.warehouse.execute("DELETE FROM FactInventory")
+        self.warehouse.commit()
+        self.monitor.kpis['on_hand_ratio'] = dict(
+            self.monitor.kpis['inventory_turnover'],
+            inputs={'on_hand': self.monitor.kpis['inventory_turnover']['inputs']['avg_on_hand']},
+            formula=lambda v: v['on_hand'] / v['on_hand']
+        )
+
+        backfill = self.monitor.backfill_kpi('on_hand_ratio', datetime(2024, 1, 1), datetime(2024, 1, 3))
+        self.assertEqual(backfill['value'].tolist(), [None, None, None])
+
+    def test_reads_from_worker_threads_see_one_snapshot(self):
+        """Test pooled read connections work off-thread and a snapshot ignores concurrent loads"""
+        self.monitor.close()
+        self.monitor = KPIMonitor(db_path=self.db_path, enable_wal=True)
+        results = {}
+        worker = threading.Thread(target=lambda: results.update(self.monitor.calculate_all_kpis(self.as_of_date)))
+        worker.start()
+        worker.join()
+        self.assertEqual(results['revenue']['value'], 2000.0)
+
+        with self.monitor.snapshot() as conn:
+            before = conn.execute("SELECT TOTAL(SalesAmount) FROM FactSales").fetchone()[0]
+            self.warehouse.execute(
+                "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+                "VALUES (10, 20240405, 1, 1, 100.0, 1, 0, 10.0)"
+            )
+            self.warehouse.commit()
+            self.assertEqual(conn.execute("SELECT TOTAL(SalesAmount) FROM FactSales").fetchone()[0], before)
+
+        self.assertEqual(self.monitor.calculate_kpi('revenue', self.as_of_date)['value'], 2100.0)
+        with self.assertRaises(sqlite3.OperationalError):
+            self.monitor.conn.execute("DELETE FROM FactSales")
+
+
+class TestIncrementalKPIEngine(unittest.TestCase):
+    """Test cases for the running-aggregate KPI engine"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        add_inventory_and_customers(self.warehouse)
+        self.monitor = KPIMonitor(db_path=self.db_path)
+        self.engine = IncrementalKPIEngine(self.monitor)
+
+    def tearDown(self):
+        self.monitor.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def add_sale(self, sales_key, date_key, amount):
+        self.warehouse.execute(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+            "VALUES (?, ?, 1, 1, ?, 1, 0, ?)",
+            (sales_key, date_key, amount, amount / 10)
+        )
+        self.warehouse.commit()
+
+    def assert_matches_full_recompute(self, as_of_date):
+        results = self.engine.tick(as_of_date)
+        expected = self.monitor.calculate_all_kpis(as_of_date)
+        for kpi_id, result in results.items():
+            self.assertAlmostEqual(result['value'], expected[kpi_id]['value'])
+
+    def test_ticks_apply_only_new_rows(self):
+        """Test later ticks aggregate only rows loaded since the previous tick"""
+        as_of_date = datetime(2024, 4, 5, 12, 0)
+        self.assert_matches_full_recompute(as_of_date)
+        self.assertEqual(self.engine.last_tick['rows_applied'], 0)
+
+        self.add_sale(10, 20240405, 500.0)
+        self.add_sale(11, 20240403, 100.0)
+        self.assert_matches_full_recompute(as_of_date)
+        self.assertEqual(self.engine.last_tick['rows_applied'], 2)
+        # Only the DimCustomer input is rescanned
+        self.assertEqual(self.engine.last_tick['recomputed_inputs'], 1)
+
+    def test_dimension_updates_are_seen(self):
+        """Test KPIs over dimension tables pick up rows updated in place"""
+        as_of_date = datetime(2024, 4, 5, 12, 0)
+        self.assert_matches_full_recompute(as_of_date)
+        self.warehouse.execute("UPDATE DimCustomer SET StartDate = '2024-04-05' WHERE CustomerKey = 1")
+        self.warehouse.commit()
+
+        self.assert_matches_full_recompute(as_of_date)
+        self.assertEqual(self.engine.tick(as_of_date)['new_customers']['value'], 2)
+
+    def test_state_rolls_over_at_period_boundaries(self):
+        """Test a new day resets daily inputs while monthly inputs keep running"""
+        self.assert_matches_full_recompute(datetime(2024, 4, 5, 23, 59))
+        self.add_sale(10, 20240406, 700.0)
+        statements = []
+        self.monitor.connection().set_trace_callback(statements.append)
+        self.assert_matches_full_recompute(datetime(2024, 4, 6, 0, 1))
+        # Daily revenue and daily new customers start a new period
+        self.assertEqual(self.engine.last_tick['recomputed_inputs'], 2)
+        # and only the new day's sales are scanned to start it
+        self.assertTrue(any(
+            'FROM FactSales' in statement and statement.endswith('AND DateKey >= 20240406') for statement in statements
+        ))
+
+
+class TestKPIScheduler(unittest.TestCase):
+    """Test cases for the asyncio KPI scheduler"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.monitor = KPIMonitor(db_path=self.db_path)
+        for kpi in self.monitor.kpis.values():
+            kpi['cadence_seconds'] = 0.05
+
+    def tearDown(self):
+        self.monitor.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_each_kpi_runs_on_its_cadence(self):
+        """Test KPIs are evaluated concurrently and report latency"""
+        self.monitor.kpis['inventory_turnover']['cadence_seconds'] = 10
+        results = []
+        scheduler = KPIScheduler(self.monitor, max_workers=2, on_result=results.append)
+        asyncio.run(scheduler.run(duration=0.22))
+
+        stats = scheduler.latency_stats()
+        self.assertGreaterEqual(stats['revenue']['evaluations'], 4)
+        self.assertEqual(stats['inventory_turnover']['evaluations'], 1)
+        self.assertGreater(stats['revenue']['p50_ms'], 0)
+        self.assertTrue(all(result['status'] for result in results))
+
+    def test_slow_evaluations_skip_ticks(self):
+        """Test a tick is skipped while the previous evaluation is still running"""
+        calculate = self.monitor.calculate_kpis
+
+        def slow_calculate(kpi_ids, as_of_date=None, conn=None):
+            time.sleep(0.12)
+            return calculate(kpi_ids, as_of_date, conn)
+
+        self.monitor.calculate_kpis = slow_calculate
+        self.monitor.kpis['revenue']['timeout_seconds'] = 0.05
+        scheduler = KPIScheduler(self.monitor, kpi_ids=['revenue'])
+        asyncio.run(scheduler.run(duration=0.2))
+
+        stats = scheduler.latency_stats()['revenue']
+        self.assertGreaterEqual(stats['skipped'], 1)
+        self.assertGreaterEqual(stats['timeouts'], 1)
+
+
+class TestKPIHistoryStore(unittest.TestCase):
+    """Test cases for the KPI history store"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = KPIHistoryStore(os.path.join(self.temp_dir, 'history.db'), flush_interval=0.05)
+        self.start = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_raw_values_and_rollups(self):
+        """Test per-second values are downsampled into hourly and daily buckets"""
+        for second in range(0, 7200, 10):
+            self.store.record('revenue', second % 100, self.start + timedelta(seconds=second))
+        self.store.flush()
+
+        end = self.start + timedelta(hours=2)
+        raw = self.store.query('revenue', self.start, end, resolution='raw')
+        self.assertEqual(len(raw), 720)
+        hourly = self.store.query('revenue', self.start, end, resolution='hourly')
+        self.assertEqual(hourly['count'].tolist(), [360, 360])
+        self.assertEqual(hourly['max'].tolist(), [90.0, 90.0])
+        daily = self.store.query('revenue', self.start - timedelta(days=1), end, resolution='daily')
+        self.assertEqual(daily['count'].sum(), 720)
+        self.assertEqual(len(self.store.query('revenue', self.start, end)), 720)
+
+    def test_rollups_match_raw_values(self):
+        """Test values recorded in the same second are all kept, as the rollups count them"""
+        moment = self.start + timedelta(minutes=5)
+        for value in (1.0, 2.0, 4.0):
+            self.store.record('revenue', value, moment)
+        self.store.record('revenue', 8.0, moment + timedelta(seconds=1))
+        self.store.flush()
+
+        end = self.start + timedelta(hours=1)
+        raw = self.store.query('revenue', self.start, end, resolution='raw')
+        for resolution in ('hourly', 'daily'):
+            rollup = self.store.query('revenue', self.start - timedelta(days=1), end, resolution=resolution)
+            self.assertEqual(rollup['count'].sum(), len(raw))
+            self.assertEqual((rollup['value'] * rollup['count']).sum(), raw['value'].sum())
+        self.assertEqual(raw['value'].tolist(), [1.0, 2.0, 4.0, 8.0])
+
+    def test_local_time_round_trip(self):
+        """Test values come back at their local time and roll up into their local day"""
+        previous_tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'America/New_York'
+        time.tzset()
+        try:
+            evening = (datetime.now() - timedelta(days=1)).replace(hour=22, minute=0, second=0, microsecond=0)
+            self.store.record_results({'revenue': {'value': 5.0, 'as_of_date': evening.strftime('%Y-%m-%d %H:%M:%S')}})
+            self.store.flush()
+
+            day = evening.replace(hour=0)
+            raw = self.store.query('revenue', day, day + timedelta(days=1), resolution='raw')
+            self.assertEqual(raw['timestamp'].tolist(), [evening])
+            daily = self.store.query('revenue', day, day + timedelta(days=1), resolution='daily')
+            self.assertEqual(daily['timestamp'].tolist(), [day])
+        finally:
+            if previous_tz is None:
+                del os.environ['TZ']
+            else:
+                os.environ['TZ'] = previous_tz
+            time.tzset()
+
+    def test_retention(self):
+        """Test expired raw values are removed while rollups remain"""
+        old = datetime.now() - timedelta(days=30)
+        self.store.record('revenue', 1.0, old)
+        self.store.record('revenue', 2.0)
+        self.store.apply_retention()
+
+        since = old - timedelta(days=1)
+        self.assertEqual(len(self.store.query('revenue', since, datetime.now() + timedelta(seconds=1), 'raw')), 1)
+        self.assertEqual(len(self.store.query('revenue', since, datetime.now(), 'hourly')), 2)
+
+    def test_record_does_not_block(self):
+        """Test recording thousands of values returns immediately"""
+        started = time.perf_counter()
+        for second in range(5000):
+            self.store.record('profit_margin', 15.0, second)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.store.flush()
+
+
+class SlowNotifier:
+    """Notifier standing in for a slow notification endpoint"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.batches = []
+
+    def send(self, alert_level, alerts):
+        time.sleep(self.delay)
+        self.batches.append((alert_level, [alert['kpi_id'] for alert in alerts]))
+
+
+class BlockingNotifier:
+    """Notifier that holds its worker in send() until released"""
+
+    def __init__(self):
+        self.sending = threading.Event()
+        self.release = threading.Event()
+
+    def send(self, alert_level, alerts):
+        self.sending.set()
+        self.release.wait(5)
+
+
+class FailingNotifier:
+    """Notifier whose every send raises"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send(self, alert_level, alerts):
+        self.calls += 1
+        raise ConnectionError('notifier unavailable')
+
+
+class TestAlertDispatcher(unittest.TestCase):
+    """Test cases for the background alert pipeline"""
+
+    def alert(self, kpi_id, status='critical'):
+        return {'kpi_id': kpi_id, 'name': kpi_id, 'value': 1.0, 'threshold': 2.0, 'comparison': '>',
+                'status': status, 'as_of_date': '2024-01-15 12:00:00'}
+
+    def test_submit_does_not_wait_for_notifiers(self):
+        """Test a slow notifier does not block submitters and alerts are batched"""
+        notifier = SlowNotifier(0.2)
+        dispatcher = AlertDispatcher([notifier], workers=1, batch_window=0.05)
+        started = time.perf_counter()
+        for i in range(10):
+            dispatcher.submit(self.alert(f'kpi_{i}'), 'high')
+        self.assertLess(time.perf_counter() - started, 0.1)
+
+        dispatcher.close()
+        metrics = dispatcher.metrics()
+        self.assertEqual(metrics['dispatched'], 10)
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertGreater(metrics['max_queue_depth'], 0)
+        self.assertGreaterEqual(metrics['latency_max_ms'], 200)
+        self.assertEqual(len(notifier.batches), 1)
+
+    def test_dedup_and_rate_limits(self):
+        """Test repeated statuses are deduplicated and per-level limits apply"""
+        notifier = SlowNotifier(0)
+        dispatcher = AlertDispatcher([notifier], rate_limits={'low': 1}, batch_window=0)
+
+        self.assertTrue(dispatcher.submit(self.alert('revenue'), 'high'))
+        self.assertFalse(dispatcher.submit(self.alert('revenue'), 'high'))
+        self.assertTrue(dispatcher.submit(self.alert('revenue', 'warning'), 'high'))
+        dispatcher.resolve('revenue')
+        self.assertTrue(dispatcher.submit(self.alert('revenue', 'warning'), 'high'))
+        dispatcher.flush()
+
+        dispatcher.submit(self.alert('a'), 'low')
+        dispatcher.flush()
+        dispatcher.submit(self.alert('b'), 'low')
+        dispatcher.flush()
+        # A rate-limited alert was never sent, so it must not deduplicate its retry
+        self.assertTrue(dispatcher.submit(self.alert('b'), 'low'))
+        dispatcher.close()
+
+        metrics = dispatcher.metrics()
+        self.assertEqual(metrics['deduplicated'], 1)
+        self.assertEqual(metrics['rate_limited'], 2)
+        self.assertEqual(metrics['dispatched'], 4)
+
+    def test_dropped_alert_is_not_deduplicated(self):
+        """Test an alert dropped on a full queue is accepted when resubmitted"""
+        notifier = BlockingNotifier()
+        dispatcher = AlertDispatcher([notifier], workers=1, max_queue=1, batch_size=1, batch_window=0)
+
+        self.assertTrue(dispatcher.submit(self.alert('revenue'), 'high'))
+        self.assertTrue(notifier.sending.wait(5))
+        self.assertTrue(dispatcher.submit(self.alert('profit_margin'), 'high'))
+        self.assertFalse(dispatcher.submit(self.alert('new_customers'), 'high'))
+
+        notifier.release.set()
+        dispatcher.flush()
+        self.assertTrue(dispatcher.submit(self.alert('new_customers'), 'high'))
+        dispatcher.close()
+
+        metrics = dispatcher.metrics()
+        self.assertEqual(metrics['dropped'], 1)
+        self.assertEqual(metrics['deduplicated'], 0)
+        self.assertEqual(metrics['dispatched'], 3)
+
+    def test_failed_alert_is_not_deduplicated(self):
+        """Test an alert whose send failed is sent again when resubmitted"""
+        notifier = FailingNotifier()
+        dispatcher = AlertDispatcher([notifier], batch_window=0)
+
+        self.assertTrue(dispatcher.submit(self.alert('revenue'), 'high'))
+        dispatcher.flush()
+        self.assertTrue(dispatcher.submit(self.alert('revenue'), 'high'))
+        dispatcher.close()
+
+        metrics = dispatcher.metrics()
+        self.assertEqual(notifier.calls, 2)
+        self.assertEqual(metrics['deduplicated'], 0)
+        self.assertEqual(metrics['failures'], 2)
+
+    def test_webhook_sink(self):
+        """Test alert batches are posted to a local HTTP sink"""
+        received = []
+
+        class Sink(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Sink)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/alerts"
+            dispatcher = AlertDispatcher({'high': [WebhookNotifier(url)]}, batch_window=0)
+            dispatcher.submit(self.alert('revenue'), 'high')
+            dispatcher.submit(self.alert('new_customers'), 'medium')
+            dispatcher.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0]['alert_level'], 'high')
+        self.assertEqual(received[0]['alerts'][0]['kpi_id'], 'revenue')
+
+    def test_monitor_routes_alerting_statuses(self):
+        """Test the monitor only submits warning and critical results"""
+        notifier = SlowNotifier(0)
+        monitor = KPIMonitor(alerts=AlertDispatcher([notifier], batch_window=0))
+        monitor._handle_alerts({
+            'revenue': self.alert('revenue', 'critical'),
+            'profit_margin': self.alert('profit_margin', 'excellent'),
+            'new_customers': None
+        })
+        monitor.alerts.close()
+        self.assertEqual(notifier.batches, [('high', ['revenue'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
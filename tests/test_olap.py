@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the OLAP cube manager
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.olap import refresh_cubes
+from src.olap.refresh_cubes import OLAPCubeManager
+from tests.helpers import build_warehouse
+
+class TestCubeQuery(unittest.TestCase):
+    """Test cases for cube queries and the result cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.manager = OLAPCubeManager(db_path=self.db_path)
+        self.assertTrue(self.manager.refresh_cube('sales'))
+
+    def tearDown(self):
+        self.manager.conn.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_query_aggregates_by_level(self):
+        """Test measures are summed per dimension member"""
+        result = self.manager.query('sales', ['SalesAmount'], ['ProductCategory'])
+        totals = dict(zip(result['ProductCategory'], result['SalesAmount']))
+        self.assertEqual(totals, {'Electronics': 3000.0, 'Furniture': 750.0})
+
+    def test_drill_down_and_roll_up(self):
+        """Test drilling from Year into the quarters of one year and back"""
+        query = {'measures': ['SalesAmount'], 'dimensions': ['Year']}
+        drilled = self.manager.drill_down('sales', query, 'date', member=2024)
+        self.assertEqual(drilled['dimensions'], ['Quarter'])
+        result = self.manager.query('sales', **drilled)
+        self.assertEqual(result['Quarter'].tolist(), [20241, 20242])
+        rolled = self.manager.roll_up('sales', drilled, 'date')
+        self.assertEqual(rolled, {'measures': ['SalesAmount'], 'dimensions': ['Year'], 'filters': {}})
+
+    def test_cache_hits_and_precise_invalidation(self):
+        """Test repeated queries hit the cache and only affected entries are invalidated"""
+        self.manager.query('sales', ['SalesAmount'], filters={'Month': 202401})
+        self.manager.query('sales', ['SalesAmount'], filters={'Month': 202404})
+        self.manager.query('sales', ['SalesAmount'], filters={'Month': [202404]})
+        stats = self.manager.cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+        self.warehouse.execute(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+            "VALUES (5, 20240125, 1, 1, 100.0, 1, 0.0, 10.0)"
+        )
+        self.warehouse.commit()
+        self.assertTrue(self.manager.refresh_cube('sales'))
+        self.assertEqual(self.manager.cache_stats()['invalidations'], 1)
+
+        result = self.manager.query('sales', ['SalesAmount'], filters={'Month': 202401})
+        self.assertEqual(result['SalesAmount'].iloc[0], 1600.0)
+        self.manager.query('sales', ['SalesAmount'], filters={'Month': 202404})
+        self.assertEqual(self.manager.cache_stats()['hits'], 2)
+
+    def test_foreign_key_correction_is_refreshed(self):
+        """Test a fact row moved to another member invalidates its partition and cached results"""
+        self.manager.query('sales', ['SalesAmount'], ['ProductCategory'])
+        self.warehouse.execute("UPDATE FactSales SET ProductKey = 2 WHERE SalesKey = 1")
+        self.warehouse.commit()
+        self.assertTrue(self.manager.refresh_cube('sales'))
+
+        result = self.manager.query('sales', ['SalesAmount'], ['ProductCategory'])
+        totals = dict(zip(result['ProductCategory'], result['SalesAmount']))
+        self.assertEqual(totals, {'Electronics': 2000.0, 'Furniture': 1750.0})
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache stays within its bound"""
+        self.manager.cache.max_entries = 1
+        self.manager.query('sales', ['SalesAmount'], ['Year'])
+        self.manager.query('sales', ['Quantity'], ['Year'])
+        self.assertEqual(self.manager.cache_stats()['evictions'], 1)
+
+
+class TestViewMaterialization(unittest.TestCase):
+    """Test cases for greedy partial materialization"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.manager = OLAPCubeManager(db_path=self.db_path, cache_size=0)
+        self.assertTrue(self.manager.refresh_cube('sales'))
+
+    def tearDown(self):
+        self.manager.conn.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_greedy_selection_respects_budget(self):
+        """Test chosen views fit the storage budget and follow the workload"""
+        self.manager.query('sales', ['SalesAmount'], ['Year', 'ProductCategory'])
+        report = self.manager.materialize_views('sales', storage_budget=3)
+        self.assertLessEqual(sum(v['estimated_rows'] for v in report['views']), 3)
+        self.assertEqual(report['views'][0]['levels'], 'Year x ProductCategory')
+        self.assertGreater(report['expected_speedup'], 1.0)
+
+    def test_views_answer_queries_consistently(self):
+        """Test results served from materialized views match the base data"""
+        expected = self.manager.query('sales', ['Profit'], ['Quarter'], {'Region': 'Europe'})
+        self.manager.materialize_views('sales', storage_budget=100, use_workload=False)
+        self.assertTrue(self.manager._cube_state['sales']['views'])
+        result = self.manager.query('sales', ['Profit'], ['Quarter'], {'Region': 'Europe'})
+        self.assertEqual(result.to_dict('list'), expected.to_dict('list'))
+
+
+class TestCubeStorage(unittest.TestCase):
+    """Test cases for memory-mapped persistent cube files"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.storage_dir = os.path.join(self.temp_dir, 'cubes')
+        self.warehouse = build_warehouse(self.db_path)
+        self.writer = OLAPCubeManager(db_path=self.db_path, storage_dir=self.storage_dir)
+        self.assertTrue(self.writer.refresh_cube('sales'))
+
+    def tearDown(self):
+        self.writer.conn.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_reader_opens_cube_without_warehouse(self):
+        """Test a separate process-like manager serves queries from the cube files"""
+        self.writer.materialize_views('sales', storage_budget=100, use_workload=False)
+        reader = OLAPCubeManager(storage_dir=self.storage_dir)
+        self.assertTrue(os.path.exists(os.path.join(self.storage_dir, 'ssas', 'Sales.cube', 'CURRENT')))
+
+        expected = self.writer.query('sales', ['SalesAmount'], ['Region', 'Month'])
+        result = reader.query('sales', ['SalesAmount'], ['Region', 'Month'])
+        self.assertEqual(result.astype(object).to_dict('list'), expected.astype(object).to_dict('list'))
+        self.assertTrue(reader._cube_state['sales']['views'])
+
+    def test_reader_switches_to_new_version(self):
+        """Test readers pick up a newly refreshed version and drop stale results"""
+        reader = OLAPCubeManager(storage_dir=self.storage_dir)
+        before = reader.query('sales', ['Quantity'])
+        self.warehouse.execute("UPDATE FactSales SET Quantity = 10 WHERE SalesKey = 4")
+        self.warehouse.commit()
+        self.assertTrue(self.writer.refresh_cube('sales'))
+
+        after = reader.query('sales', ['Quantity'])
+        self.assertEqual(after['Quantity'].iloc[0] - before['Quantity'].iloc[0], 8)
+        self.assertEqual(reader._cube_state['sales']['version'], 'v00000002')
+
+
+    def test_current_pointer_read_only_when_replaced(self):
+        """Test repeated queries do not re-read an unchanged CURRENT pointer"""
+        reader = OLAPCubeManager(storage_dir=self.storage_dir)
+        reader.query('sales', ['Quantity'])
+        reads = []
+        original = refresh_cubes.read_current_version
+        refresh_cubes.read_current_version = lambda directory: reads.append(directory) or original(directory)
+        try:
+            reader.query('sales', ['Quantity'])
+            reader.query('sales', ['SalesAmount'])
+            self.assertEqual(reads, [])
+
+            self.warehouse.execute("UPDATE FactSales SET Quantity = 10 WHERE SalesKey = 4")
+            self.warehouse.commit()
+            self.assertTrue(self.writer.refresh_cube('sales'))
+            reader.query('sales', ['Quantity'])
+        finally:
+            refresh_cubes.read_current_version = original
+        self.assertEqual(len(reads), 1)
+        self.assertEqual(reader._cube_state['sales']['version'], 'v00000002')
+
+class TestSketchMeasures(unittest.TestCase):
+    """Test cases for distinct count and quantile sketch measures"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.warehouse.execute("DELETE FROM FactSales")
+        self.warehouse.executemany(
+            "INSERT INTO DimCustomer (CustomerKey, CustomerSegment, Region) VALUES (?, ?, ?)",
+            [(key, ['SMB', 'Enterprise'][key % 2], ['Europe', 'Asia'][key % 3 == 0]) for key in range(3, 3001)]
+        )
+        self.warehouse.executemany(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity) "
+            "VALUES (?, ?, ?, 1, ?, 1)",
+            [(key, 20240101 + 100 * (key % 6), 1 + key % 3000, float(key % 1000)) for key in range(20000)]
+        )
+        self.warehouse.commit()
+        self.manager = OLAPCubeManager(db_path=self.db_path)
+        self.assertTrue(self.manager.refresh_cube('customer'))
+
+    def tearDown(self):
+        self.manager.conn.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_distinct_customers_within_error_bound(self):
+        """Test HyperLogLog estimates roll up close to the exact distinct counts"""
+        measures = ['DistinctCustomers']
+        estimate = self.manager.query('customer', measures, ['CustomerSegment'])
+        exact = self.manager.query('customer', measures, ['CustomerSegment'], exact=True)
+        self.assertEqual(exact['DistinctCustomers'].tolist(), [1500, 1500])
+        for approx, truth in zip(estimate['DistinctCustomers'], exact['DistinctCustomers']):
+            self.assertLess(abs(approx - truth) / truth, 0.06)
+
+        total = self.manager.query('customer', measures, filters={'Year': 2024})
+        self.assertLess(abs(total['DistinctCustomers'].iloc[0] - 3000) / 3000, 0.06)
+
+    def test_spend_percentiles_within_rank_error(self):
+        """Test KLL quantiles are close to the exact percentiles"""
+        measures = ['SpendPercentiles']
+        estimate = self.manager.query('customer', measures, ['Region'])
+        exact = self.manager.query('customer', measures, ['Region'], exact=True)
+        self.assertIn('SpendPercentiles_p99', estimate.columns)
+        for column in ['SpendPercentiles_p25', 'SpendPercentiles_p50', 'SpendPercentiles_p90']:
+            for approx, truth in zip(estimate[column], exact[column]):
+                self.assertLess(abs(approx - truth), 50)
+
+    def test_sketch_queries_below_grain_are_rejected(self):
+        """Test sketch measures cannot be queried below the sketch grain"""
+        self.assertIsNone(self.manager.query('customer', ['DistinctCustomers'], ['City']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the BI pipeline orchestrator
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import main_platform
+from src.pipeline.bi_pipeline import build_bi_pipeline, stage_timings
+from src.pipeline.orchestrator import PipelineOrchestrator
+from tests.helpers import add_inventory_and_customers, build_warehouse
+
+
+class TestPipelineOrchestrator(unittest.TestCase):
+    """Test cases for the dependency-driven task runner"""
+
+    def test_downstream_starts_before_unrelated_upstream_finishes(self):
+        """Test a task runs as soon as its own inputs are done, not its whole stage"""
+        orchestrator = PipelineOrchestrator(max_workers=4)
+        slow_done = threading.Event()
+        observed = {}
+
+        orchestrator.add_task('etl:fast', lambda: True, stage='etl')
+        orchestrator.add_task('etl:slow', lambda: time.sleep(0.3) or slow_done.set(), stage='etl')
+        orchestrator.add_task('cube:fast', lambda: observed.update(slow_done=slow_done.is_set()),
+                              deps=['etl:fast'], stage='olap')
+
+        results = orchestrator.run()
+
+        self.assertTrue(all(result['status'] == 'succeeded' for result in results.values()))
+        self.assertFalse(observed['slow_done'])
+        self.assertLess(results['cube:fast']['finished'], results['etl:slow']['finished'])
+        self.assertGreaterEqual(results['cube:fast']['started'], results['etl:fast']['finished'])
+        self.assertAlmostEqual(
+            orchestrator.end_to_end_latency('cube:fast'),
+            results['cube:fast']['finished'] - results['etl:fast']['started']
+        )
+
+    def test_failure_skips_downstream(self):
+        """Test a failed task skips its dependents transitively but not unrelated tasks"""
+        orchestrator = PipelineOrchestrator()
+        orchestrator.add_task('a', lambda: False)
+        orchestrator.add_task('b', lambda: 1 / 0)
+        orchestrator.add_task('c', lambda: True, deps=['a'])
+        orchestrator.add_task('d', lambda: True, deps=['c'])
+        orchestrator.add_task('e', lambda: True)
+
+        results = orchestrator.run()
+
+        self.assertEqual(results['a']['status'], 'failed')
+        self.assertEqual(results['b']['status'], 'failed')
+        self.assertIn('division by zero', results['b']['error'])
+        self.assertEqual(results['c']['status'], 'skipped')
+        self.assertEqual(results['d']['status'], 'skipped')
+        self.assertEqual(results['e']['status'], 'succeeded')
+        self.assertIsNone(orchestrator.end_to_end_latency('d'))
+
+    def test_lock_group_is_exclusive(self):
+        """Test tasks sharing a lock never overlap"""
+        orchestrator = PipelineOrchestrator(max_workers=4)
+        active = []
+        peak = []
+        guard = threading.Lock()
+
+        def task():
+            with guard:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with guard:
+                active.pop()
+            return True
+
+        for i in range(4):
+            orchestrator.add_task(f"t{i}", task, lock='render')
+
+        orchestrator.run()
+
+        self.assertEqual(max(peak), 1)
+
+    def test_invalid_graphs_rejected(self):
+        """Test duplicate tasks, unknown dependencies and cycles raise ValueError"""
+        orchestrator = PipelineOrchestrator()
+        orchestrator.add_task('a', lambda: True)
+        with self.assertRaises(ValueError):
+            orchestrator.add_task('a', lambda: True)
+
+        orchestrator.add_task('b', lambda: True, deps=['missing'])
+        with self.assertRaises(ValueError):
+            orchestrator.run()
+
+        cyclic = PipelineOrchestrator()
+        cyclic.add_task('a', lambda: True, deps=['b'])
+        cyclic.add_task('b', lambda: True, deps=['a'])
+        with self.assertRaises(ValueError):
+            cyclic.run()
+
+
+class TestBIPipeline(unittest.TestCase):
+    """Test cases for the end-to-end cube, dashboard and report pipeline"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        add_inventory_and_customers(self.warehouse)
+
+    def tearDown(self):
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_pipeline_publishes_dashboards_and_reports(self):
+        """Test every report is published from its refreshed cubes and dashboard feed"""
+        orchestrator, _ = build_bi_pipeline(
+            self.db_path, os.path.join(self.temp_dir, 'output'), as_of_date=datetime(2024, 4, 5)
+        )
+
+        self.assertEqual(orchestrator.tasks['dashboard:executive']['deps'], ['cube:sales', 'cube:finance'])
+        self.assertEqual(orchestrator.tasks['report:cfo']['deps'], ['dashboard:finance'])
+
+        results = orchestrator.run()
+
+        self.assertTrue(all(result['status'] == 'succeeded' for result in results.values()))
+        for report_id in ('ceo', 'cfo', 'sales', 'operations'):
+            self.assertTrue(os.path.exists(results[f"report:{report_id}"]['result']))
+            self.assertGreater(orchestrator.end_to_end_latency(f"report:{report_id}"), 0)
+
+        with open(results['dashboard:finance']['result']) as f:
+            feed = json.load(f)
+        by_month = feed['visuals'][0]
+        self.assertEqual(by_month['columns'], ['Month', 'SalesAmount', 'Profit', 'Discount'])
+        self.assertEqual(by_month['rows'][0][:2], [202401, 1500.0])
+
+        timings = stage_timings(orchestrator)
+        self.assertEqual(list(timings), ['olap', 'dashboard', 'report'])
+        self.assertEqual(timings['olap']['tasks'], 4)
+
+    def test_etl_failure_skips_dependent_items(self):
+        """Test ETL tasks gate the cubes reading their tables"""
+        orchestrator, _ = build_bi_pipeline(
+            self.db_path, os.path.join(self.temp_dir, 'output'), etl_type='incremental',
+            dashboards=['operations'], reports=['operations']
+        )
+        self.assertEqual(orchestrator.tasks['cube:inventory']['deps'], ['etl:FactInventory', 'etl:DimProduct'])
+
+        orchestrator.tasks['etl:FactInventory']['func'] = lambda: False
+        orchestrator.tasks['etl:DimProduct']['func'] = lambda: True
+        results = orchestrator.run()
+
+        self.assertEqual(results['etl:FactInventory']['status'], 'failed')
+        for name in ('cube:inventory', 'dashboard:operations', 'report:operations'):
+            self.assertEqual(results[name]['status'], 'skipped')
+
+    def test_extracts_refresh_after_their_tables_load(self):
+        """Test workbook extracts are published once the ETL loads the tables they read"""
+        orchestrator, components = build_bi_pipeline(
+            self.db_path, os.path.join(self.temp_dir, 'output'), etl_type='incremental',
+            cubes=[], dashboards=[], reports=[]
+        )
+        extract_tasks = [name for name in orchestrator.tasks if name.startswith('extract:')]
+        self.assertEqual(len(extract_tasks), len(components['extract_publisher'].extracts))
+        self.assertEqual(orchestrator.tasks['extract:powerbi_financial_margin_by_category']['deps'],
+                         ['etl:FactSales', 'etl:DimProduct'])
+
+        for name in orchestrator.tasks:
+            if name.startswith('etl:'):
+                orchestrator.tasks[name]['func'] = lambda: True
+        results = orchestrator.run()
+
+        for name in extract_tasks:
+            self.assertEqual(results[name]['status'], 'succeeded')
+            self.assertTrue(os.path.exists(results[name]['result']))
+
+    def test_unavailable_etl_fails_before_running(self):
+        """Test an ETL run stops up front when the ETL modules cannot be imported"""
+        output_dir = os.path.join(self.temp_dir, 'output')
+        with mock.patch.dict(sys.modules, {'src.etl.run_etl_pipeline': None}):
+            self.assertIn('src.etl.run_etl_pipeline', main_platform.etl_unavailable())
+            self.assertFalse(main_platform.run_etl_process('full'))
+            self.assertFalse(main_platform.run_pipeline(self.db_path, output_dir, etl_type='full'))
+        self.assertFalse(os.path.exists(output_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
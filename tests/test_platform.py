@@ -6,9 +6,19 @@ Unit Tests for IBM Business Intelligence (BI) Analyst
 import unittest
 import sys
 import os
+import shutil
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.bi_platform import BusinessIntelligencePlatform
 
 class TestPlatform(unittest.TestCase):
     """Test cases for the platform"""
@@ -29,5 +39,79 @@ class TestPlatform(unittest.TestCase):
         text = "IBM Business Intelligence (BI) Analyst"
         self.assertTrue(len(text) > 0)
 
+class TestChunkedKPIs(unittest.TestCase):
+    """Test cases for out-of-core, grouped KPI computation"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.platform = BusinessIntelligencePlatform()
+        rng = np.random.default_rng(7)
+        self.data = pd.DataFrame({
+            'region': rng.choice(['North', 'South', 'East'], 1000),
+            'segment': rng.choice(['SMB', 'Enterprise'], 1000),
+            'revenue': rng.uniform(10, 1000, 1000),
+            'units': rng.integers(1, 20, 1000)
+        })
+        self.data.loc[::17, 'revenue'] = np.nan
+        self.measures = {
+            'total_revenue': ('revenue', 'sum'),
+            'avg_revenue': ('revenue', 'mean'),
+            'revenue_std': ('revenue', 'std'),
+            'orders': ('revenue', 'count'),
+            'max_units': ('units', 'max'),
+            'min_units': ('units', 'min'),
+            'units_var': ('units', 'var')
+        }
+    
+    def tearDown(self):
+        self.platform.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def expected(self):
+        return self.data.groupby(['region', 'segment']).agg(**{
+            kpi: (column, function) for kpi, (column, function) in self.measures.items()
+        })
+    
+    def test_default_kpis(self):
+        """Test the default measures still return total and average revenue"""
+        kpis = self.platform.calculate_kpis(pd.DataFrame({'revenue': [100.0, 200.0, 300.0]}))
+        self.assertEqual(kpis, {'total_revenue': 600.0, 'avg_revenue': 200.0})
+    
+    def test_chunks_match_in_memory_groupby(self):
+        """Test merged partial aggregates over chunks equal a groupby over all rows"""
+        chunks = (self.data.iloc[start:start + 64] for start in range(0, len(self.data), 64))
+        result = self.platform.calculate_kpis(chunks, self.measures, group_by=['region', 'segment'])
+        pd.testing.assert_frame_equal(result, self.expected(), check_dtype=False)
+        
+        totals = self.platform.calculate_kpis(iter([self.data.iloc[:500], self.data.iloc[500:]]), self.measures)
+        self.assertAlmostEqual(totals['revenue_std'], self.data['revenue'].std())
+        self.assertEqual(totals['orders'], self.data['revenue'].count())
+    
+    def test_worker_processes(self):
+        """Test aggregating chunks in worker processes gives the same result"""
+        result = self.platform.calculate_kpis(self.data, self.measures, group_by=['region', 'segment'],
+                                              chunksize=100, workers=2)
+        pd.testing.assert_frame_equal(result, self.expected(), check_dtype=False)
+    
+    def test_file_and_table_sources(self):
+        """Test CSV files and warehouse tables are read in chunks of the needed columns"""
+        csv_path = os.path.join(self.temp_dir, 'sales.csv')
+        self.data.to_csv(csv_path, index=False)
+        result = self.platform.calculate_kpis(csv_path, self.measures, group_by=['region', 'segment'], chunksize=128)
+        pd.testing.assert_frame_equal(result, self.expected(), check_dtype=False)
+        
+        db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        conn = sqlite3.connect(db_path)
+        self.data.to_sql('sales', conn, index=False)
+        conn.close()
+        self.platform.connect_database(db_path)
+        result = self.platform.calculate_kpis('sales', self.measures, group_by=['region', 'segment'], chunksize=128)
+        pd.testing.assert_frame_equal(result, self.expected(), check_dtype=False)
+        
+        with self.assertRaises(ValueError):
+            self.platform.calculate_kpis('missing_table', self.measures)
+        with self.assertRaises(ValueError):
+            self.platform.calculate_kpis(self.data, {'median': ('revenue', 'median')})
+
 if __name__ == '__main__':
     unittest.main()
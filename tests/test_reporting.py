@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for executive report generation
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.reporting.chart_cache import ChartCache
+from src.reporting.generate_executive_reports import ExecutiveReportGenerator
+from src.reporting.html_report import render_svg_chart, render_table
+from src.reporting.section_data import SectionDataProvider
+from tests.helpers import build_warehouse
+
+
+class TestParallelReports(unittest.TestCase):
+    """Test cases for process-parallel report generation"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.as_of_date = datetime(2024, 4, 5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_parallel_matches_sequential(self):
+        """Test the process pool produces the same reports as the sequential path"""
+        sequential = ExecutiveReportGenerator(os.path.join(self.temp_dir, 'sequential'))
+        parallel = ExecutiveReportGenerator(os.path.join(self.temp_dir, 'parallel'), workers=2)
+
+        expected = sequential.generate_all_reports(self.as_of_date)
+        results = parallel.generate_all_reports(self.as_of_date)
+
+        self.assertEqual(list(results), list(expected))
+        for report_id, path in results.items():
+            self.assertTrue(path and os.path.exists(path))
+            self.assertEqual(os.path.basename(path), os.path.basename(expected[report_id]))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'parallel', 'revenue_analysis_20240405.png')))
+
+
+class TestChartCache(unittest.TestCase):
+    """Test cases for the chart render cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.as_of_date = datetime(2024, 4, 5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_duplicate_and_unchanged_charts_are_not_rerendered(self):
+        """Test identical section charts render once and a rerun renders nothing"""
+        generator = ExecutiveReportGenerator(os.path.join(self.temp_dir, 'reports'))
+        generator.generate_report('cfo', self.as_of_date)
+        self.assertEqual(generator.chart_cache.stats()['misses'], 1)
+        self.assertEqual(generator.chart_cache.stats()['hits'], 1)
+
+        rerun = ExecutiveReportGenerator(os.path.join(self.temp_dir, 'reports'))
+        rerun.generate_report('cfo', self.as_of_date)
+        self.assertEqual(rerun.chart_cache.stats()['misses'], 0)
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'reports', 'profit_margins_20240405.png')))
+
+    def test_key_depends_on_data_and_spec(self):
+        """Test changed data or spec misses and the cache stays within its size bound"""
+        cache = ChartCache(os.path.join(self.temp_dir, 'cache'), max_bytes=10)
+        renders = []
+
+        def render(path):
+            renders.append(path)
+            with open(path, 'wb') as f:
+                f.write(b'x' * 8)
+
+        df = pd.DataFrame({'Month': ['Jan', 'Feb'], 'Revenue': [1, 2]})
+        first = cache.get_or_render(df, {'kind': 'line'}, render)
+        self.assertEqual(cache.get_or_render(df.copy(), {'kind': 'line'}, render), first)
+        cache.get_or_render(df, {'kind': 'bar'}, render)
+        cache.get_or_render(df.assign(Revenue=[1, 3]), {'kind': 'line'}, render)
+
+        self.assertEqual(len(renders), 3)
+        self.assertEqual(cache.stats()['evictions'], 2)
+        self.assertFalse(os.path.exists(first))
+
+
+class TestSectionData(unittest.TestCase):
+    """Test cases for the shared section data layer"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        build_warehouse(self.db_path).close()
+        self.as_of_date = datetime(2024, 4, 5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_run_fetches_each_dataset_once(self):
+        """Test all reports in a run share three warehouse datasets"""
+        generator = ExecutiveReportGenerator(os.path.join(self.temp_dir, 'reports'), db_path=self.db_path)
+        results = generator.generate_all_reports(self.as_of_date)
+
+        self.assertTrue(all(results.values()))
+        self.assertEqual(generator.section_data.fetches, 3)
+        self.assertEqual(generator.section_data.frames, {})
+
+    def test_sections_get_isolated_shared_frames(self):
+        """Test warehouse data is shared without sections seeing each other's changes"""
+        provider = SectionDataProvider(self.db_path)
+        with provider.run(['revenue_analysis', 'profit_margins', 'cash_flow'], self.as_of_date):
+            revenue = provider.get('revenue_analysis', self.as_of_date)
+            margins = provider.get('profit_margins', self.as_of_date)
+            self.assertIsNone(provider.get('cash_flow', self.as_of_date))
+
+            revenue['Revenue'] = 0.0
+            margins.loc[margins['Month'] == 'Feb 2024', 'Expenses'] = 0.0
+            self.assertNotEqual(provider.get('profit_margins', self.as_of_date)
+                                .set_index('Month').loc['Feb 2024', 'Expenses'], 0.0)
+            self.assertEqual(margins.set_index('Month').loc['Jan 2024', 'Revenue'], 1500.0)
+            self.assertEqual(margins.set_index('Month').loc['Jan 2024', 'Expenses'], 1200.0)
+        self.assertEqual(provider.fetches, 1)
+
+
+class TestIncrementalReports(unittest.TestCase):
+    """Test cases for fingerprint-driven incremental report builds"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.output_dir = os.path.join(self.temp_dir, 'reports')
+        self.as_of_date = datetime(2024, 4, 5)
+
+    def tearDown(self):
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def build(self):
+        generator = ExecutiveReportGenerator(self.output_dir, db_path=self.db_path, incremental=True)
+        results = generator.generate_all_reports(self.as_of_date)
+        self.assertTrue(all(results.values()))
+        return generator.build_summary
+
+    def test_only_stale_sections_and_reports_rebuild(self):
+        """Test a rerun reuses everything and a data change rebuilds only its dependents"""
+        self.assertEqual(len(self.build()['sections_rebuilt']), 16)
+        summary = self.build()
+        self.assertEqual(summary['sections_rebuilt'], [])
+        self.assertEqual(len(summary['reports_reused']), 4)
+
+        # A sale in the prior year changes sales growth but not the monthly financials
+        self.warehouse.execute(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+            "VALUES (10, 20221201, 1, 1, 100.0, 1, 0, 10.0)"
+        )
+        self.warehouse.commit()
+        summary = self.build()
+        self.assertEqual(summary['sections_rebuilt'], ['market_analysis', 'sales_by_region', 'sales_by_product'])
+        self.assertEqual(summary['reports_rebuilt'], ['ceo', 'sales'])
+        self.assertEqual(summary['reports_reused'], ['cfo', 'operations'])
+
+    def test_image_and_html_builds_keep_separate_entries(self):
+        """Test switching a report between PDF and HTML reuses the sections built for each"""
+        self.build()
+        generator = ExecutiveReportGenerator(self.output_dir, db_path=self.db_path, incremental=True)
+        generator.reports['cfo']['format'] = 'html'
+        self.assertTrue(generator.generate_report('cfo', self.as_of_date).endswith('.html'))
+        self.assertEqual(len(generator.build_summary['sections_rebuilt']), 4)
+
+        summary = self.build()
+        self.assertEqual(summary['sections_rebuilt'], [])
+        self.assertEqual(summary['reports_rebuilt'], [])
+
+    def test_missing_outputs_are_rebuilt(self):
+        """Test a deleted report is recompiled from reused sections"""
+        self.build()
+        os.remove(os.path.join(self.output_dir, 'cfo_20240405.pdf'))
+        summary = self.build()
+        self.assertEqual(summary['sections_rebuilt'], [])
+        self.assertEqual(summary['reports_rebuilt'], ['cfo'])
+
+
+class TestHTMLReports(unittest.TestCase):
+    """Test cases for the HTML/SVG report format"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.as_of_date = datetime(2024, 4, 5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_html_report_without_png_rendering(self):
+        """Test an HTML report inlines SVG charts and renders no PNGs"""
+        generator = ExecutiveReportGenerator(self.temp_dir)
+        generator.reports['cfo']['format'] = 'html'
+        path = generator.generate_report('cfo', self.as_of_date)
+
+        self.assertTrue(path.endswith('cfo_20240405.html'))
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(content.count('<svg'), 2)
+        self.assertIn('<td>Mar 2024</td>', content)
+        self.assertEqual(generator.chart_cache.stats()['misses'], 0)
+        self.assertFalse(any(name.endswith('.png') for name in os.listdir(self.temp_dir)))
+
+    def test_svg_charts_are_well_formed(self):
+        """Test line and bar charts produce parseable SVG"""
+        df = pd.DataFrame({'Category': ['A & B', 'C'], 'Sales': [100.0, 50.0], 'Growth': [5, -2]})
+        bar = ET.fromstring(render_svg_chart(df, {
+            'kind': 'bar', 'title': 'Sales', 'x': 'Category', 'y': 'Sales', 'labels': 'Growth',
+            'xlabel': 'Category', 'ylabel': 'Sales ($)'
+        }))
+        self.assertEqual(len(bar.findall('{http://www.w3.org/2000/svg}rect')), 2)
+
+        line = ET.fromstring(render_svg_chart(df, {
+            'kind': 'line', 'title': 'Sales', 'x': 'Category', 'series': [('Sales', 'o'), ('Growth', 's')],
+            'xlabel': 'Category', 'ylabel': 'Amount'
+        }))
+        self.assertEqual(len(line.findall('{http://www.w3.org/2000/svg}polyline')), 2)
+
+    def test_tables_are_escaped_and_paginated(self):
+        """Test full tables are rendered in pages with escaped cells"""
+        df = pd.DataFrame({'Name': ['<b>'] * 120, 'Value': [1.5] * 120})
+        table = render_table(df, page_size=50)
+        self.assertEqual(table.count('<tr><td>'), 120)
+        self.assertEqual(table.count('<details>'), 2)
+        self.assertIn('<td>&lt;b&gt;</td><td>1.50</td>', table)
+        self.assertIn('Rows 101&ndash;120 of 120', table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the semantic layer
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.semantic import semantic_layer
+from src.semantic.semantic_layer import SemanticLayer
+from tests.helpers import build_warehouse
+
+
+class TestSemanticLayer(unittest.TestCase):
+    """Test cases for compiling business-named requests"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        self.layer = SemanticLayer(db_path=self.db_path, cache_dir=self.temp_dir)
+
+    def tearDown(self):
+        self.layer.conn.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_model_items(self):
+        """Test measures and attributes are read from the model XML"""
+        self.assertEqual(self.layer.measures(), ['Sales Amount', 'Quantity', 'Profit', 'Customer Count',
+                                                 'Quantity On Hand', 'Quantity On Order'])
+        self.assertIn('Customer Segment', self.layer.attributes())
+
+    def test_compile_star_join(self):
+        """Test only the dimensions a request needs are joined"""
+        sql, params = self.layer.compile(['Profit'], filters={'Date Key': ('>=', 20240201)})
+        self.assertNotIn('JOIN', sql)
+        self.assertEqual(params, [20240201])
+
+        sql, params = self.layer.compile(['Sales Amount'], ['Region'], {'Customer Segment': ['SMB']})
+        self.assertIn('JOIN DimCustomer d1 ON f.CustomerKey = d1.CustomerKey', sql)
+        self.assertIn('d1.CustomerSegment IN (?)', sql)
+
+    def test_query_and_plan_cache(self):
+        """Test results and plan reuse across filter values"""
+        result = self.layer.query(['Sales Amount', 'Quantity'], ['Region'])
+        self.assertEqual(result['Region'].tolist(), ['Europe', 'North America'])
+        self.assertEqual(result['Sales Amount'].tolist(), [2500.0, 1250.0])
+
+        self.layer.query(['Profit'], filters={'Date Key': ('>=', 20240201)})
+        self.layer.query(['Profit'], filters={'Date Key': ('>=', 20240301)})
+        self.assertEqual(self.layer.plan_cache_stats()['hits'], 1)
+
+    def test_model_cached_on_disk(self):
+        """Test a fresh process loads the parsed model from the disk cache"""
+        semantic_layer._loaded_models.clear()
+        SemanticLayer(cache_dir=self.temp_dir)
+        semantic_layer._loaded_models.clear()
+        original_parse = semantic_layer.parse_model
+        semantic_layer.parse_model = None
+        try:
+            layer = SemanticLayer(cache_dir=self.temp_dir)
+        finally:
+            semantic_layer.parse_model = original_parse
+        self.assertEqual(layer.model, self.layer.model)
+
+    def test_unknown_item(self):
+        """Test unknown business names are rejected"""
+        with self.assertRaises(ValueError):
+            self.layer.compile(['Revenue'])
+
+
+if __name__ == '__main__':
+    unittest.main()
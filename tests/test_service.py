@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the long-running BI service
+"""
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.bi_platform import BusinessIntelligencePlatform
+from src.service.api_server import BIService
+from tests.helpers import add_inventory_and_customers, build_warehouse
+
+
+class TestBIService(unittest.TestCase):
+    """Test cases for the local query API"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+        add_inventory_and_customers(self.warehouse)
+
+        self.platform = BusinessIntelligencePlatform(db_path=self.db_path,
+                                                     output_dir=os.path.join(self.temp_dir, 'output'))
+        self.platform.start()
+        self.service = BIService(self.platform, port=0, max_concurrency=2, max_queue=3)
+        self.thread = threading.Thread(target=self.service.run)
+        self.thread.start()
+        self.service.ready.wait()
+
+    def tearDown(self):
+        self.service.stop()
+        self.thread.join()
+        self.platform.close()
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, path, method='GET'):
+        request = urllib.request.Request(f"http://127.0.0.1:{self.service.port}{path}", method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_cube_queries_served_from_warm_cache(self):
+        """Test cube queries answer from the refreshed cube and repeat from its result cache"""
+        path = '/cubes/sales?measures=SalesAmount&dimensions=Region&Year=2024'
+        status, body = self.request(path)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body['columns'], ['Region', 'SalesAmount'])
+        self.assertEqual(sorted(body['rows']), [['Europe', 2500.0], ['North America', 1250.0]])
+
+        self.request(path)
+        _, metrics = self.request('/metrics')
+        self.assertEqual(metrics['cube_cache']['hits'], 1)
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.service.port}/metrics/prometheus") as response:
+            self.assertIn('bi_olap_query_cache_total{cube="sales",result="hit"}', response.read().decode())
+
+        status, _ = self.request('/cubes/sales?dimensions=Region')
+        self.assertEqual(status, 400)
+        status, _ = self.request('/cubes/unknown?measures=SalesAmount')
+        self.assertEqual(status, 404)
+
+    def test_kpis_and_reports(self):
+        """Test KPI and report endpoints and refreshing cubes after a load"""
+        status, body = self.request('/kpis?ids=revenue,profit_margin&date=2024-04-05')
+        self.assertEqual(status, 200)
+        self.assertEqual(sorted(body['kpis']), ['profit_margin', 'revenue'])
+        self.assertEqual(self.request('/kpis?ids=missing')[0], 404)
+        self.assertEqual(self.request('/kpis?date=April')[0], 400)
+
+        status, body = self.request('/reports/cfo?date=2024-04-05')
+        self.assertEqual(status, 200)
+        self.assertTrue(os.path.exists(body['path']))
+
+        self.warehouse.execute(
+            "INSERT INTO FactSales (SalesKey, DateKey, CustomerKey, ProductKey, SalesAmount, Quantity, Discount, Profit) "
+            "VALUES (5, 20240406, 1, 1, 100.0, 1, 0.0, 10.0)"
+        )
+        self.warehouse.commit()
+        self.assertEqual(self.request('/cubes/refresh', method='POST')[0], 200)
+        _, body = self.request('/cubes/finance?measures=SalesAmount&Month=202404')
+        self.assertEqual(body['rows'], [[2100.0]])
+
+    def test_health_and_non_finite_values(self):
+        """Test /health before start-up and that NaN or infinite values are sent as null"""
+        started_at, self.platform.started_at = self.platform.started_at, None
+        try:
+            self.assertEqual(self.request('/health'), (503, {'status': 'starting'}))
+        finally:
+            self.platform.started_at = started_at
+        self.assertEqual(self.request('/health')[0], 200)
+
+        get_kpis = self.platform.get_kpis
+        self.platform.get_kpis = lambda kpi_ids, as_of_date: {'margin': {'value': float('nan'), 'target': float('inf')}}
+        try:
+            status, body = self.request('/kpis')
+        finally:
+            self.platform.get_kpis = get_kpis
+        self.assertEqual(status, 200)
+        self.assertEqual(body['kpis'], {'margin': {'value': None, 'target': None}})
+
+    def test_malformed_content_length_rejected(self):
+        """Test a non-numeric or negative Content-Length gets 400 and the service keeps serving"""
+        for value in ('abc', '-5'):
+            with socket.create_connection(('127.0.0.1', self.service.port), timeout=30) as client:
+                client.sendall(f"POST /cubes/refresh HTTP/1.1\r\nContent-Length: {value}\r\n\r\n".encode())
+                self.assertTrue(client.recv(1024).startswith(b'HTTP/1.1 400'))
+        self.assertEqual(self.request('/metrics')[0], 200)
+
+    def test_overload_rejected(self):
+        """Test requests beyond the queue limit get 503 instead of queueing without bound"""
+        release = threading.Event()
+        query_cube = self.platform.query_cube
+
+        def slow_query(*args, **kwargs):
+            release.wait(10)
+            return query_cube(*args, **kwargs)
+
+        self.platform.query_cube = slow_query
+        results = []
+        clients = [
+            threading.Thread(target=lambda: results.append(self.request('/cubes/sales?measures=SalesAmount')))
+            for _ in range(5)
+        ]
+        for client in clients:
+            client.start()
+
+        deadline = time.time() + 10
+        while self.service.metrics['rejected'] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for client in clients:
+            client.join()
+
+        statuses = sorted(status for status, _ in results)
+        self.assertEqual(statuses, [200, 200, 200, 503, 503])
+        self.assertEqual(self.service.metrics['max_in_flight'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark of the platform entry points
+
+Runs the entry points under ``python -X importtime`` and checks that short
+commands load no heavy libraries and import in a fraction of what pandas
+alone costs.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import build_warehouse
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+MAIN_PLATFORM = os.path.join(PROJECT_ROOT, 'src', 'main_platform.py')
+
+# Libraries only the modes that analyse data or draw reports should load
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'seaborn', 'fpdf')
+
+
+def import_times(args, cwd=None):
+    """Run python -X importtime with args
+
+    Returns the completed process, {module: cumulative microseconds} and the
+    total import time of the run, the sum over its top-level imports.
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + list(args),
+        cwd=cwd or PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+    times = {}
+    total = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+        # Nested imports are indented below the module that triggered them
+        if not module[1:].startswith(' '):
+            total += int(cumulative)
+    return completed, times, total
+
+
+class TestStartupImports(unittest.TestCase):
+    """Test cases for the import cost of short commands"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        build_warehouse(self.db_path).close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_kpi_check_skips_heavy_libraries(self):
+        """Test a single KPI check loads no data or charting library"""
+        completed, times, _ = import_times(
+            [MAIN_PLATFORM, '--mode', 'kpi', '--kpi', 'revenue', '--db', self.db_path], cwd=self.temp_dir
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn('Total Revenue', completed.stdout)
+        self.assertIn('src.kpi.kpi_monitor', times)
+        self.assertEqual([module for module in HEAVY_MODULES if module in times], [])
+
+    def test_kpi_check_imports_in_fraction_of_pandas(self):
+        """Test the KPI check imports take under half of what importing pandas alone does"""
+        _, _, pandas_total = import_times(['-c', 'import pandas'])
+        _, _, total = import_times(
+            [MAIN_PLATFORM, '--mode', 'kpi', '--kpi', 'revenue', '--db', self.db_path], cwd=self.temp_dir
+        )
+
+        self.assertLess(total, pandas_total / 2)
+
+    def test_help_opens_no_log_file(self):
+        """Test parsing arguments happens before the log file is created"""
+        completed, times, _ = import_times([MAIN_PLATFORM, '--help'], cwd=self.temp_dir)
+
+        self.assertEqual(completed.returncode, 0)
+        self.assertIn('--mode', completed.stdout)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'bi_platform.log')))
+        self.assertEqual([module for module in HEAVY_MODULES if module in times], [])
+
+    def test_report_generator_defers_charting_libraries(self):
+        """Test importing the report generator leaves matplotlib, seaborn and fpdf to the first chart or PDF"""
+        completed, times, _ = import_times(['-c', 'import src.reporting.generate_executive_reports'])
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        self.assertIn('pandas', times)
+        self.assertEqual([module for module in ('matplotlib', 'seaborn', 'fpdf') if module in times], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for span metrics and run profiling
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.olap.refresh_cubes import OLAPCubeManager
+from src.telemetry.instrumentation import REGISTRY, MetricsRegistry
+from src.telemetry.profiling import profile_run
+from tests.helpers import build_warehouse
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for spans, counters and their exports"""
+
+    def test_spans_aggregate_and_nest(self):
+        """Test span durations and attributes aggregate per label set and record their parent"""
+        registry = MetricsRegistry()
+        for rows in (3, 4):
+            with registry.span('etl.stage', stage='load') as outer:
+                outer.add('rows', rows)
+                with registry.span('etl.extract', source='sales'):
+                    pass
+        registry.increment('olap.query_cache', result='hit')
+        registry.increment('olap.query_cache', 2, result='hit')
+
+        snapshot = registry.snapshot()
+        stage = next(span for span in snapshot['spans'] if span['name'] == 'etl.stage')
+        self.assertEqual(stage['count'], 2)
+        self.assertEqual(stage['labels'], {'stage': 'load'})
+        self.assertEqual(stage['attributes'], {'rows': 7})
+        self.assertGreaterEqual(stage['max_seconds'], 0.0)
+        self.assertEqual(snapshot['recent_spans'][0]['name'], 'etl.extract')
+        self.assertEqual(snapshot['recent_spans'][0]['parent'], 'etl.stage')
+        self.assertEqual(snapshot['counters'], [{'name': 'olap.query_cache', 'labels': {'result': 'hit'}, 'value': 3}])
+        self.assertEqual(json.loads(registry.to_json())['spans'][0]['name'], 'etl.extract')
+
+    def test_prometheus_export(self):
+        """Test the Prometheus text format names, labels and escaping"""
+        registry = MetricsRegistry()
+        with registry.span('report.compile', format='pdf') as timing:
+            timing.add('bytes', 1024)
+        registry.increment('report.chart_cache', result='miss', chart='a "quoted" name')
+
+        text = registry.to_prometheus()
+
+        self.assertIn('# TYPE bi_span_duration_seconds summary', text)
+        self.assertIn('bi_span_duration_seconds_count{format="pdf",span="report.compile"} 1', text)
+        self.assertIn('bi_span_bytes_total{format="pdf",span="report.compile"} 1024', text)
+        self.assertIn('bi_report_chart_cache_total{chart="a \\"quoted\\" name",result="miss"} 1', text)
+
+
+class TestInstrumentedRun(unittest.TestCase):
+    """Test cases for instrumentation of the platform modules"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'warehouse.db')
+        self.warehouse = build_warehouse(self.db_path)
+
+    def tearDown(self):
+        self.warehouse.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_profile_run_captures_cube_spans(self):
+        """Test a profiled cube refresh and query write profiles and span metrics"""
+        output_dir = os.path.join(self.temp_dir, 'profile')
+        with profile_run(output_dir):
+            manager = OLAPCubeManager(db_path=self.db_path)
+            manager.refresh_cube('sales')
+            manager.query('sales', ['SalesAmount'], ['Year'])
+            manager.query('sales', ['SalesAmount'], ['Year'])
+            manager.conn.close()
+
+        for name in ('profile.pstats', 'profile.txt', 'memory.txt', 'metrics.json', 'metrics.prom'):
+            self.assertTrue(os.path.exists(os.path.join(output_dir, name)), name)
+
+        with open(os.path.join(output_dir, 'metrics.json')) as f:
+            metrics = json.load(f)
+        refresh = next(span for span in metrics['spans'] if span['name'] == 'olap.refresh_cube')
+        self.assertEqual(refresh['labels'], {'cube': 'sales'})
+        self.assertEqual(refresh['attributes'], {'rows': 4, 'partitions': 3})
+        cache = {counter['labels']['result']: counter['value'] for counter in metrics['counters']}
+        self.assertEqual(cache, {'hit': 1, 'miss': 1})
+
+        with open(os.path.join(output_dir, 'profile.txt')) as f:
+            self.assertIn('refresh_cube', f.read())
+        self.assertIn('olap.query', REGISTRY.to_prometheus())
+
+
+if __name__ == '__main__':
+    unittest.main()